@@ -1,5 +1,6 @@
 # api\app\config.py
 from functools import lru_cache
+from typing import Dict, List, Literal
 
 from pydantic_settings import BaseSettings
 
@@ -14,7 +15,106 @@ class Settings(BaseSettings):
     supabase_jwt_secret: str | None = None
     disable_role_checks_local: bool = True
 
-    gemini_api_key: str
+    gemini_api_key: str | None = None
+    gemini_model: str = "gemini-2.5-flash"
+    # Extra attempts when a Gemini reply fails schema validation (each one is another paid call).
+    gemini_reply_retries: int = 1
+
+    # Scoring backend for MatchingService: "gemini", "local" (deterministic, offline) or
+    # "fake" (Gemini stand-in with injected latency, for load tests).
+    scorer_backend: Literal["gemini", "local", "fake"] = "gemini"
+    fake_scorer_latency_ms: int = 800
+
+    # Seconds between keep-alive comments on the notifications SSE stream.
+    notification_heartbeat_seconds: int = 15
+
+    # Notification outbox dispatcher (see services/outbox.py).
+    outbox_dispatcher_enabled: bool = True
+    outbox_poll_seconds: float = 5.0
+    outbox_batch_size: int = 100
+    outbox_max_attempts: int = 8
+    # Processed and dead-lettered outbox rows are deleted after this many days, in batches, at
+    # most every prune interval (0 turns pruning off).
+    outbox_retention_days: int = 7
+    outbox_prune_batch_size: int = 5000
+    outbox_prune_interval_seconds: float = 3600.0
+
+    # Local embedding index used for candidate sourcing.
+    embedding_dim: int = 512
+    vector_index_refresh_seconds: int = 600
+    job_index_refresh_seconds: int = 120
+
+    # Batch match-check: max items per request and concurrent Gemini calls per request.
+    match_check_batch_max: int = 10
+    match_check_concurrency: int = 4
+
+    # How long a stored Idempotency-Key response can be replayed.
+    idempotency_ttl_seconds: int = 86400
+    # How often (at most) expired idempotency_keys rows are deleted.
+    idempotency_purge_interval_seconds: float = 3600.0
+
+    # Per-route / per-dependency latency histograms, served on /metrics in Prometheus format.
+    metrics_enabled: bool = True
+
+    # On-demand request profiling. When enabled, requests sent with `X-Profile: <profiling_token>`
+    # are stack-sampled and the collapsed stacks written to profile_dir/<X-Profile-Id>.folded.
+    profiling_enabled: bool = False
+    profiling_token: str | None = None
+    profile_dir: str = "/tmp/hirematch-profiles"
+    profile_sample_interval_ms: float = 1.0
+
+    # Response compression (middleware/compression.py). Brotli is used when the `brotli` package is
+    # installed and the client accepts it, gzip otherwise; SSE streams are never compressed.
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_content_types: List[str] = [
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+        "text/plain",
+        "text/html",
+    ]
+
+    # Admission control for model calls (services/admission.py): per-user and global token
+    # buckets, then llm_max_concurrency slots shared by weighted fair queuing (weights by role).
+    llm_admission_enabled: bool = True
+    llm_user_rate_per_minute: float = 20
+    llm_user_burst: int = 10
+    llm_global_rate_per_minute: float = 300
+    llm_global_burst: int = 60
+    llm_max_concurrency: int = 8
+    llm_queue_max: int = 64
+    llm_queue_timeout_seconds: float = 10.0
+    # Most model calls one batch (score-all) reserves; larger jobs are scored over several calls.
+    llm_batch_max_calls: int = 50
+    llm_role_weights: Dict[str, float] = {"admin": 4.0, "recruiter": 2.0, "candidate": 1.0}
+
+    # Admin overview counters (public.platform_stats) are cached in process for this long.
+    platform_stats_cache_seconds: float = 30.0
+
+    # Bulk job import (POST /recruiter/jobs/import): rows per INSERT and rows per upload.
+    job_import_batch_size: int = 500
+    job_import_max_rows: int = 20000
+
+    # Applications fetched per page by the streaming pipeline export.
+    pipeline_export_page_size: int = 500
+
+    # Shared cache of the first page of /candidate/feed.
+    feed_cache_seconds: float = 5.0
+
+    # Scoring-run history (public.match_history): rows older than the retention window are pruned
+    # in batches every prune interval by MatchHistoryPruner (0 turns the background loop off).
+    match_history_retention_days: int = 180
+    match_history_prune_batch_size: int = 5000
+    match_history_prune_interval_seconds: float = 3600.0
+
+    # Ids per admin_set_*_status call for the admin bulk endpoints (keeps each UPDATE short).
+    admin_bulk_chunk_size: int = 200
+
+    # Import heavy modules and create clients on a background thread after startup.
+    warm_up_on_startup: bool = True
 
     class Config:
         env_file = ".env"
@@ -1,20 +1,27 @@
 # api\app\dependencies.py
-from typing import Literal, Optional
+from typing import TYPE_CHECKING, Any, Literal, Optional
 
 import httpx
-import jwt
 from fastapi import Depends, Header, HTTPException, status
-from supabase import Client, ClientOptions, create_client
 
 from .config import Settings, get_settings
 from .schemas import AuthUser
+from .services.metrics import instrumented
+
+if TYPE_CHECKING:
+    import jwt
+    from supabase import Client
+else:
+    # supabase (gotrue, storage3, realtime) and jwt/cryptography are imported on first use to keep
+    # them off the cold-start path; route signatures only use Client as an annotation.
+    Client = Any
 
 # Use a valid UUID string for the fake local dev user
 LOCAL_DEV_USER_ID = "00000000-0000-0000-0000-000000000001"
 
 
-_supabase_service_client: Client | None = None
-_jwk_client: jwt.PyJWKClient | None = None
+_supabase_service_client: Optional["Client"] = None
+_jwk_client: Optional["jwt.PyJWKClient"] = None
 
 # Patch httpx.Client to accept `proxy` kwarg used by supabase library
 _orig_httpx_client_init = httpx.Client.__init__
@@ -32,6 +39,8 @@ httpx.Client.__init__ = _httpx_client_init_proxy_safe
 def supabase_service_client(settings: Settings) -> Client:
     global _supabase_service_client
     if _supabase_service_client is None:
+        from supabase import create_client
+
         _supabase_service_client = create_client(settings.supabase_url, settings.supabase_service_key)
     return _supabase_service_client
 
@@ -41,6 +50,8 @@ def get_supabase_service_client(settings: Settings = Depends(get_settings)) -> C
 
 
 def _decode_supabase_jwt(token: str, settings: Settings) -> dict:
+    import jwt
+
     global _jwk_client
     # If a JWT secret is provided (HS256), try that first to avoid network hiccups on jwks fetch.
     if settings.supabase_jwt_secret:
@@ -70,6 +81,7 @@ def _decode_supabase_jwt(token: str, settings: Settings) -> dict:
         ) from exc
 
 
+@instrumented("auth", "ensure_user_records")
 def _ensure_user_records(user_id: str, role: str, settings: Settings) -> None:
     """
     Make sure a corresponding users row (and role-specific profile) exists to avoid FK/RLS issues.
@@ -166,6 +178,8 @@ def get_supabase_user_client(
     # In local/dev without JWT, fall back to service client to avoid RLS blocking development
     if settings.app_env.lower() == "local" and not user.token:
         return supabase_service_client(settings)
+    from supabase import ClientOptions, create_client
+
     headers = {"Authorization": f"Bearer {user.token}"} if user.token else {}
     return create_client(
         settings.supabase_url,
@@ -1,9 +1,45 @@
 # api/app/main.py
-from fastapi import FastAPI
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from .config import get_settings
+from .middleware import CompressionMiddleware, MetricsMiddleware, ProfilingMiddleware
 from .routers import admin, candidate, public, recruiter, notifications
+from .services.admission import RateLimited
+from .services.match_history import get_match_history_pruner
+from .services.metrics import get_metrics_registry, instrument_postgrest
+from .services.outbox import get_outbox_dispatcher
+from .services.scorers import ScorerReplyError
+from .services.warmup import warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    if settings.warm_up_on_startup:
+        # Off the event loop and not awaited, so startup completes immediately.
+        threading.Thread(target=warm_up, args=(settings,), name="warm-up", daemon=True).start()
+    dispatcher_task = None
+    if settings.outbox_dispatcher_enabled:
+        dispatcher = get_outbox_dispatcher()
+        dispatcher_task = asyncio.create_task(dispatcher.run())
+    pruner_task = None
+    if settings.match_history_prune_interval_seconds > 0:
+        pruner_task = asyncio.create_task(get_match_history_pruner().run())
+    try:
+        yield
+    finally:
+        if dispatcher_task is not None:
+            get_outbox_dispatcher().stop()
+            dispatcher_task.cancel()
+        if pruner_task is not None:
+            get_match_history_pruner().stop()
+            pruner_task.cancel()
 
 
 def create_app() -> FastAPI:
@@ -12,6 +48,7 @@ def create_app() -> FastAPI:
         title="HireMatch API",
         version="0.1.0",
         description="Role-based API for recruiters, candidates, and admins.",
+        lifespan=lifespan,
     )
     # Allow frontend on Vercel (and local) to call the API without CORS issues.
     app.add_middleware(
@@ -21,6 +58,24 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.compression_enabled:
+        app.add_middleware(CompressionMiddleware, settings=settings)
+    if settings.metrics_enabled:
+        instrument_postgrest()
+        app.add_middleware(MetricsMiddleware)
+    if settings.profiling_enabled:
+        # Not installed at all unless enabled, so normal requests pay nothing for it.
+        app.add_middleware(ProfilingMiddleware, settings=settings)
+
+    @app.exception_handler(RateLimited)
+    async def rate_limited_handler(request: Request, exc: RateLimited) -> JSONResponse:
+        return JSONResponse(
+            status_code=429, content={"detail": exc.reason}, headers={"Retry-After": exc.retry_after_header}
+        )
+
+    @app.exception_handler(ScorerReplyError)
+    async def scorer_reply_handler(request: Request, exc: ScorerReplyError) -> JSONResponse:
+        return JSONResponse(status_code=502, content={"detail": "AI model returned an unusable reply. Try again later."})
 
     @app.get("/", tags=["meta"])
     def root() -> dict:
@@ -32,6 +87,15 @@ def create_app() -> FastAPI:
         """Basic health probe for uptime checks."""
         return {"status": "healthy"}
 
+    if settings.metrics_enabled:
+
+        @app.get("/metrics", tags=["meta"], response_class=PlainTextResponse)
+        def metrics() -> PlainTextResponse:
+            """Latency histograms, call counts and errors in Prometheus text format."""
+            return PlainTextResponse(
+                get_metrics_registry().render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+            )
+
     app.include_router(public.router)
     app.include_router(candidate.router)
     app.include_router(recruiter.router)
@@ -42,7 +106,3 @@ def create_app() -> FastAPI:
 
 app = create_app()
 
-
-@app.get("/")
-def root():
-    return {"status": "ok", "message": "HireMatch API running on Vercel"}
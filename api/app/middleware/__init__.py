@@ -0,0 +1,4 @@
+"""ASGI middleware (metrics, and other cross-cutting request handling)."""
+from .compression import CompressionMiddleware  # noqa: F401
+from .metrics import MetricsMiddleware  # noqa: F401
+from .profiling import ProfilingMiddleware  # noqa: F401
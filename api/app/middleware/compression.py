@@ -0,0 +1,150 @@
+# api\app\middleware\compression.py
+import zlib
+from typing import List, Optional, Tuple
+
+from ..config import Settings
+
+
+def _accepted_encodings(scope) -> List[str]:
+    """Codings from Accept-Encoding with a non-zero q-value."""
+    for name, value in scope.get("headers") or []:
+        if name != b"accept-encoding":
+            continue
+        accepted = []
+        for part in value.decode("latin-1").lower().split(","):
+            coding, _, params = part.partition(";")
+            q = params.strip()
+            if q.startswith("q="):
+                try:
+                    if float(q[2:]) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.append(coding.strip())
+        return accepted
+    return []
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, brotli, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies chunk by chunk as they are sent, so a large list or export is never
+    held in memory a second time. Only the response start is delayed until the first body chunk,
+    which is when a single-chunk response below COMPRESSION_MIN_SIZE can be sent as is.
+
+    Responses are compressed only when the content type is in COMPRESSION_CONTENT_TYPES, the
+    response isn't already encoded and the client accepts br or gzip. text/event-stream is never
+    compressed: an SSE client needs each event as soon as it is written.
+    """
+
+    def __init__(self, app, settings: Settings):
+        self.app = app
+        self.min_size = settings.compression_min_size
+        self.gzip_level = settings.compression_gzip_level
+        self.brotli_quality = settings.compression_brotli_quality
+        self.content_types = {t.lower() for t in settings.compression_content_types} - {"text/event-stream"}
+        try:
+            import brotli  # optional: pip install brotli
+        except ImportError:
+            brotli = None
+        self.brotli = brotli
+
+    def _pick_encoding(self, scope) -> Optional[str]:
+        accepted = _accepted_encodings(scope)
+        if self.brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    def _compressor(self, encoding: str):
+        if encoding == "br":
+            return _Brotli(self.brotli, self.brotli_quality)
+        return _Gzip(self.gzip_level)
+
+    def _eligible(self, headers: List[Tuple[bytes, bytes]], status: int) -> bool:
+        if status < 200 or status in (204, 304):
+            return False
+        content_type = b""
+        for name, value in headers:
+            lowered = name.lower()
+            if lowered == b"content-encoding":
+                return False
+            if lowered == b"content-type":
+                content_type = value
+        media_type = content_type.decode("latin-1").split(";", 1)[0].strip().lower()
+        return media_type in self.content_types
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._pick_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                if not self._eligible(headers, message["status"]):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Hold the start until the first chunk shows whether compressing is worth it.
+                start_message = {**message, "headers": [*headers, (b"vary", b"Accept-Encoding")]}
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.min_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = self._compressor(encoding)
+                headers = [(k, v) for k, v in start_message["headers"] if k.lower() != b"content-length"]
+                headers.append((b"content-encoding", encoding.encode()))
+                await send({**start_message, "headers": headers})
+
+            chunk = compressor.process(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            # Compressors buffer internally; skip empty intermediate chunks rather than sending them.
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,48 @@
+# api\app\middleware\metrics.py
+import time
+
+from ..services.metrics import observe_request
+
+
+class MetricsMiddleware:
+    """
+    Records latency per (method, route template, status class). Plain ASGI rather than
+    BaseHTTPMiddleware so streaming responses pass through untouched; an SSE stream is timed
+    until its response starts, not for the lifetime of the connection.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            # FastAPI puts the matched APIRoute in the scope; unmatched paths share one label
+            # so random URLs can't blow up the number of series.
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            observe_request(scope["method"], template, status_code, time.perf_counter() - start)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = dict(message.get("headers") or [])
+                if headers.get(b"content-type", b"").startswith(b"text/event-stream"):
+                    record()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record()
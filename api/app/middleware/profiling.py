@@ -0,0 +1,115 @@
+# api\app\middleware\profiling.py
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from ..config import Settings
+
+# Frames from these files mean the event loop is waiting for I/O, not running a handler.
+_IDLE_MARKERS = ("selectors.py", "base_events.py")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples one thread's Python stack every `interval` seconds and counts identical stacks.
+
+    Targets the event-loop thread: async handlers run there, and so do the sync supabase calls
+    they make, so time blocked in PostgREST shows up under the handler that made the call.
+    Samples taken while the loop is idle in select() - awaiting network I/O or a worker thread
+    such as a scorer call - are counted as "(event loop idle)".
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            names.reverse()
+            self.samples += 1
+            if names and any(marker in names[-1] for marker in _IDLE_MARKERS):
+                self.stacks["(event loop idle)"] += 1
+            else:
+                self.stacks[";".join(names)] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format, readable by flamegraph.pl and speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests on demand. Only installed when PROFILING_ENABLED is set, so it costs
+    nothing otherwise; when installed, only requests carrying `X-Profile: <PROFILING_TOKEN>` are
+    sampled. The collapsed stacks are written to PROFILE_DIR/<id>.folded and the id is returned in
+    the X-Profile-Id response header.
+
+    Other requests running concurrently on the same event loop can appear in the samples; profile
+    on an otherwise quiet instance for a clean picture.
+    """
+
+    def __init__(self, app, settings: Settings):
+        self.app = app
+        self.token = settings.profiling_token
+        self.directory = settings.profile_dir
+        self.interval = settings.profile_sample_interval_ms / 1000.0
+
+    def _requested(self, scope) -> bool:
+        for name, value in scope.get("headers") or []:
+            if name == b"x-profile":
+                return bool(self.token) and value.decode("latin-1") == self.token
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+        profile_id = uuid.uuid4().hex
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            self._store(profile_id, scope, sampler, time.perf_counter() - started)
+
+    def _store(self, profile_id: str, scope, sampler: StackSampler, elapsed: float) -> None:
+        path = os.path.join(self.directory, f"{profile_id}.folded")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(sampler.collapsed())
+        except OSError as exc:
+            print("Could not store request profile:", exc)
+            return
+        print(f"Profiled {scope['method']} {scope['path']} ({elapsed * 1000:.1f}ms, {sampler.samples} samples): {path}")
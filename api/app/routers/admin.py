@@ -1,30 +1,97 @@
 #api\app\routers\admin.py
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import anyio
 from fastapi import APIRouter, Depends, HTTPException
-from supabase import Client
 
-from ..dependencies import get_supabase_service_client, require_role
-from ..schemas import AuthUser, DashboardStat
+from ..config import get_settings
+from ..dependencies import Client, get_supabase_service_client, require_role
+from ..schemas import (
+    AuthUser,
+    BulkPostModerationRequest,
+    BulkUpdateResult,
+    BulkUserStatusRequest,
+    DashboardStat,
+    PostFilter,
+    UserFilter,
+)
+from ..services.feed import invalidate_feed
+from ..services.match_history import get_match_history_pruner
+from ..services.outbox import get_outbox_dispatcher
+from ..services.platform_stats import get_platform_stats
 
 router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_role("admin"))])
 
 
+def _bulk_set_status(client: Client, rpc: str, status: str, ids: List[str], params: Dict[str, Any]) -> int:
+    """
+    Set `status` on the rows selected by `ids` and/or the filter `params` through the admin_set_*
+    RPC and return how many changed. A filter alone is one UPDATE; ids go in chunks of
+    ADMIN_BULK_CHUNK_SIZE per call (with the filter applied to each chunk). Rows already in
+    `status` are skipped, so the count is the number of rows actually changed.
+    """
+
+    def run(id_chunk: Optional[List[str]]) -> int:
+        args = {"p_status": status, **params}
+        if id_chunk is not None:
+            args["p_ids"] = id_chunk
+        return int(client.rpc(rpc, args).execute().data or 0)
+
+    if not ids:
+        return run(None)
+    chunk_size = max(1, get_settings().admin_bulk_chunk_size)
+    unique_ids = list(dict.fromkeys(ids))
+    return sum(run(unique_ids[i : i + chunk_size]) for i in range(0, len(unique_ids), chunk_size))
+
+
+def _filter_params(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v.isoformat() if isinstance(v, datetime) else v for k, v in values.items() if v is not None}
+
+
+def _user_filter(f: Optional[UserFilter]) -> Dict[str, Any]:
+    if f is None:
+        return {}
+    return _filter_params(
+        {
+            "p_role": f.role,
+            "p_current_status": f.status,
+            "p_created_after": f.created_after,
+            "p_created_before": f.created_before,
+        }
+    )
+
+
+def _post_filter(f: Optional[PostFilter]) -> Dict[str, Any]:
+    if f is None:
+        return {}
+    return _filter_params(
+        {
+            "p_candidate_id": f.candidate_id,
+            "p_current_status": f.status,
+            "p_visibility": f.visibility,
+            "p_body_contains": f.body_contains,
+            "p_created_after": f.created_after,
+            "p_created_before": f.created_before,
+        }
+    )
+
+
 @router.get("/overview", response_model=list[DashboardStat])
 async def admin_overview(client: Client = Depends(get_supabase_service_client)):
     try:
-        users = client.rpc("count_by_role").execute()
-        jobs = client.rpc("count_jobs").execute()
-        matches = client.rpc("count_matches").execute()
-    except Exception:
-        # RPCs might not exist yet; return placeholders.
-        users = type("obj", (), {"data": {"admin": 1, "recruiter": 4, "candidate": 20}})
-        jobs = type("obj", (), {"data": {"open": 12}})
-        matches = type("obj", (), {"data": {"month": 140}})
+        stats = get_platform_stats().overview(client)
+    except Exception as exc:
+        print("Error loading platform stats:", exc)
+        raise HTTPException(status_code=503, detail="Platform stats unavailable. Check Supabase tables/keys.")
+    users = stats.get("users") or {}
     return [
-        DashboardStat(label="Admins", value=str(users.data.get("admin", 0))),
-        DashboardStat(label="Recruiters", value=str(users.data.get("recruiter", 0))),
-        DashboardStat(label="Candidates", value=str(users.data.get("candidate", 0))),
-        DashboardStat(label="Open Jobs", value=str(jobs.data.get("open", 0))),
-        DashboardStat(label="Matches This Month", value=str(matches.data.get("month", 0))),
+        DashboardStat(label="Admins", value=str(users.get("admin", 0))),
+        DashboardStat(label="Recruiters", value=str(users.get("recruiter", 0))),
+        DashboardStat(label="Candidates", value=str(users.get("candidate", 0))),
+        DashboardStat(label="Open Jobs", value=str(stats.get("open_jobs", 0))),
+        DashboardStat(label="Matches This Month", value=str(stats.get("matches_this_month", 0))),
     ]
 
 
@@ -47,6 +114,28 @@ async def update_user_status(
         raise HTTPException(status_code=400, detail=str(exc))
 
 
+@router.post("/users/bulk-status", response_model=BulkUpdateResult)
+async def bulk_update_user_status(
+    body: BulkUserStatusRequest,
+    user: AuthUser = Depends(require_role("admin")),
+    client: Client = Depends(get_supabase_service_client),
+):
+    params = _user_filter(body.filter)
+    if not body.ids and not params:
+        raise HTTPException(status_code=400, detail="ids or a non-empty filter required")
+    # The calling admin is never included, so a broad filter can't lock them out. (A non-UUID
+    # dev user can't match any row anyway.)
+    try:
+        params["p_exclude_id"] = str(UUID(str(user.user_id)))
+    except ValueError:
+        pass
+    try:
+        affected = _bulk_set_status(client, "admin_set_user_status", body.status, body.ids, params)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return BulkUpdateResult(status=body.status, affected=affected)
+
+
 @router.get("/companies")
 async def list_companies(client: Client = Depends(get_supabase_service_client)):
     return client.table("companies").select("*").execute().data
@@ -66,4 +155,39 @@ async def list_posts(client: Client = Depends(get_supabase_service_client)):
 async def moderate_post(
     post_id: str, status: str = "hidden", client: Client = Depends(get_supabase_service_client)
 ):
-    return client.table("posts").update({"status": status}).eq("id", post_id).execute().data
+    data = client.table("posts").update({"status": status}).eq("id", post_id).execute().data
+    invalidate_feed()
+    return data
+
+
+@router.post("/posts/bulk-moderate", response_model=BulkUpdateResult)
+async def bulk_moderate_posts(
+    body: BulkPostModerationRequest, client: Client = Depends(get_supabase_service_client)
+):
+    params = _post_filter(body.filter)
+    if not body.ids and not params:
+        raise HTTPException(status_code=400, detail="ids or a non-empty filter required")
+    try:
+        affected = _bulk_set_status(client, "admin_set_post_status", body.status, body.ids, params)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        # Earlier chunks may have applied even if a later one failed.
+        invalidate_feed()
+    return BulkUpdateResult(status=body.status, affected=affected)
+
+
+@router.post("/maintenance/prune-match-history")
+async def prune_match_history():
+    """Run one prune pass now (for deployments where the background loop doesn't run, e.g. Vercel)."""
+    pruner = get_match_history_pruner()
+    deleted = await anyio.to_thread.run_sync(pruner.prune_once)
+    return {"deleted": deleted, "retention_days": pruner.retention_days}
+
+
+@router.post("/maintenance/prune-outbox")
+async def prune_notification_outbox():
+    """Delete processed and dead notification_outbox rows past retention, now."""
+    dispatcher = get_outbox_dispatcher()
+    deleted = await anyio.to_thread.run_sync(dispatcher.prune_once)
+    return {"deleted": deleted, "retention_days": dispatcher.retention_days}
@@ -1,50 +1,40 @@
 # api\app\routers\candidate.py
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Body, Depends, File, HTTPException, UploadFile
-from supabase import Client
+import anyio
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, File, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import ORJSONResponse
 from postgrest.exceptions import APIError
-import io
-from PyPDF2 import PdfReader
-from docx import Document
 
-from ..dependencies import get_supabase_user_client, require_role, supabase_service_client
+from ..dependencies import Client, get_supabase_user_client, require_role, supabase_service_client
 from ..schemas import (
     Application,
     AuthUser,
     CandidateProfile,
     DashboardStat,
+    MatchCheckBatchItem,
+    MatchCheckBatchRequest,
     MatchCheckRequest,
     MatchCheckResponse,
     MatchResult,
     PostCreate,
 )
+from ..services.admission import RateLimited
+from ..services.documents import DOCX_CONTENT_TYPES, extract_text_from_docx, extract_text_from_pdf
 from ..services.matching import MatchingService, build_candidate_payload
-from ..config import get_settings
-from ..config import Settings
+from ..services.outbox import get_outbox_dispatcher
+from ..services.idempotency import get_idempotency_store
+from ..services.feed import InvalidCursor, invalidate_feed, load_feed_page
+from ..services.embeddings import condense_text, embed_candidate, skill_set, split_skills, tokenize
+from ..services.vector_index import get_candidate_index, get_job_index
+from ..config import Settings, get_settings
 
 router = APIRouter(prefix="/candidate", tags=["candidate"], dependencies=[Depends(require_role("candidate"))])
 
 
-def _matching_service(client: Client) -> MatchingService:
-    return MatchingService(settings=get_settings(), supabase=client)
-
-
-def _extract_text_from_pdf(data: bytes) -> str:
-    reader = PdfReader(io.BytesIO(data))
-    text_parts: List[str] = []
-    for page in reader.pages[:5]:
-        try:
-            text_parts.append(page.extract_text() or "")
-        except Exception:
-            continue
-    return "\n".join(text_parts).strip()
-
-
-def _extract_text_from_docx(data: bytes) -> str:
-    doc = Document(io.BytesIO(data))
-    return "\n".join([p.text for p in doc.paragraphs if p.text]).strip()
+def _matching_service(client: Client, user: AuthUser) -> MatchingService:
+    return MatchingService(settings=get_settings(), supabase=client, user=user)
 
 
 def _ensure_bucket(bucket: str) -> None:
@@ -115,6 +105,7 @@ async def update_profile(
 ):
     data = payload.model_dump()
     res = client.table("candidates").upsert({**data, "id": user.user_id}).execute()
+    get_candidate_index().upsert_profile(user.user_id, data)
     return res.data
 
 
@@ -128,9 +119,9 @@ async def upload_cv(
     path = f"{user.user_id}/{file.filename}"
     parsed_text = ""
     if file.content_type == "application/pdf":
-        parsed_text = _extract_text_from_pdf(content)
-    elif file.content_type in ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"):
-        parsed_text = _extract_text_from_docx(content)
+        parsed_text = extract_text_from_pdf(content)
+    elif file.content_type in DOCX_CONTENT_TYPES:
+        parsed_text = extract_text_from_docx(content)
     elif file.content_type and file.content_type.startswith("text/"):
         parsed_text = content.decode(errors="ignore")[:6000]
     else:
@@ -148,6 +139,7 @@ async def upload_cv(
         client.table("candidate_cvs").insert({"candidate_id": user.user_id, "file_url": path, "parsed_text": parsed_text}).execute()
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"CV upload failed: {exc}")
+    get_candidate_index().upsert_cv(user.user_id, parsed_text)
     return {"path": path}
 
 
@@ -189,7 +181,7 @@ async def autofill_profile_from_cv(
     if not cv_text:
         raise HTTPException(status_code=400, detail="No CV text found. Upload a CV first.")
 
-    match_service = _matching_service(client)
+    match_service = _matching_service(client, user)
     suggestions = await match_service.suggest_profile_from_cv(cv_text)
     return {
         "headline": suggestions.get("headline"),
@@ -199,35 +191,41 @@ async def autofill_profile_from_cv(
     }
 
 
+def _load_candidate_payload(client: Client, user_id: str, cv_id: Optional[str]) -> Dict[str, Any]:
+    profile_res = client.table("candidates").select("*").eq("id", user_id).limit(1).execute()
+    profile = profile_res.data[0] if profile_res.data else {}
+    cv_text = None
+    if cv_id:
+        cv_res = client.table("candidate_cvs").select("parsed_text").eq("id", cv_id).limit(1).execute()
+        cv_text = cv_res.data[0].get("parsed_text") if cv_res.data else None
+    return build_candidate_payload(profile, cv_text)
+
+
+def _match_check_row(user_id: str, jd_text: str, cv_id: Optional[str], result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "candidate_id": user_id,
+        "jd_text": jd_text,
+        "cv_id": cv_id,
+        "match_score": result.get("score"),
+        "explanation": result.get("rationale"),
+        "matched_skills": result.get("matched_skills"),
+        "missing_skills": result.get("missing_skills"),
+    }
+
+
 @router.post("/match-check", response_model=MatchCheckResponse)
 async def match_check(
     payload: MatchCheckRequest,
     user: AuthUser = Depends(require_role("candidate")),
     client: Client = Depends(get_supabase_user_client),
 ):
-    profile_res = client.table("candidates").select("*").eq("id", user.user_id).limit(1).execute()
-    profile = profile_res.data[0] if profile_res.data else {}
-    cv_text = None
-    if payload.cv_id:
-        cv_res = client.table("candidate_cvs").select("parsed_text").eq("id", payload.cv_id).limit(1).execute()
-        cv_text = cv_res.data[0].get("parsed_text") if cv_res.data else None
-    match_service = _matching_service(client)
-    candidate_payload = build_candidate_payload(profile, cv_text)
+    match_service = _matching_service(client, user)
+    candidate_payload = _load_candidate_payload(client, user.user_id, payload.cv_id)
     result = await match_service.score_candidate_for_job(
         job={"title": "Ad-hoc JD", "description": payload.jd_text, "skills": []},
         candidate=candidate_payload,
     )
-    client.table("match_checks").insert(
-        {
-            "candidate_id": user.user_id,
-            "jd_text": payload.jd_text,
-            "cv_id": payload.cv_id,
-            "match_score": result.get("score"),
-            "explanation": result.get("rationale"),
-            "matched_skills": result.get("matched_skills"),
-            "missing_skills": result.get("missing_skills"),
-        }
-    ).execute()
+    client.table("match_checks").insert(_match_check_row(user.user_id, payload.jd_text, payload.cv_id, result)).execute()
     return MatchCheckResponse(
         score=result.get("score", 0.0),
         matched_skills=result.get("matched_skills", []),
@@ -236,6 +234,126 @@ async def match_check(
     )
 
 
+@router.post("/match-check/batch", response_model=List[MatchCheckBatchItem])
+async def match_check_batch(
+    payload: MatchCheckBatchRequest,
+    user: AuthUser = Depends(require_role("candidate")),
+    client: Client = Depends(get_supabase_user_client),
+    settings: Settings = Depends(get_settings),
+):
+    """
+    Score several jobs (by id) and/or ad-hoc JD texts in one request. The profile and CV are
+    loaded once, items are scored concurrently up to match_check_concurrency, and all
+    match_checks rows are written in a single insert.
+    """
+    total = len(payload.job_ids) + len(payload.jd_texts)
+    if total == 0:
+        raise HTTPException(status_code=400, detail="job_ids or jd_texts required")
+    if total > settings.match_check_batch_max:
+        raise HTTPException(status_code=400, detail=f"At most {settings.match_check_batch_max} items per batch")
+
+    jobs: List[Dict[str, Any]] = []
+    if payload.job_ids:
+        job_ids = [str(jid) for jid in payload.job_ids]
+        rows = client.table("jobs").select("*").in_("id", job_ids).execute().data or []
+        job_map = {j["id"]: j for j in rows}
+        missing = [jid for jid in job_ids if jid not in job_map]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Jobs not found: {', '.join(missing)}")
+        jobs.extend(job_map[jid] for jid in job_ids)
+    jobs.extend({"title": "Ad-hoc JD", "description": text, "skills": []} for text in payload.jd_texts)
+
+    match_service = _matching_service(client, user)
+    candidate_payload = _load_candidate_payload(client, user.user_id, payload.cv_id)
+    limiter = anyio.CapacityLimiter(settings.match_check_concurrency)
+    results: List[Any] = [None] * len(jobs)
+
+    async def score(i: int, job: Dict[str, Any]) -> None:
+        async with limiter:
+            try:
+                results[i] = await match_service.score_candidate_for_job(job=job, candidate=candidate_payload)
+            except RateLimited as exc:
+                results[i] = exc
+            except Exception as exc:
+                print("Batch match-check item failed:", repr(exc))
+                results[i] = exc
+
+    async with anyio.create_task_group() as tg:
+        for i, job in enumerate(jobs):
+            tg.start_soon(score, i, job)
+
+    items: List[MatchCheckBatchItem] = []
+    rows_to_insert: List[Dict[str, Any]] = []
+    for job, result in zip(jobs, results):
+        if isinstance(result, RateLimited):
+            items.append(MatchCheckBatchItem(job_id=job.get("id"), title=job.get("title"), error=result.reason))
+            continue
+        if isinstance(result, Exception):
+            items.append(MatchCheckBatchItem(job_id=job.get("id"), title=job.get("title"), error="Scoring failed"))
+            continue
+        rows_to_insert.append(_match_check_row(user.user_id, job.get("description") or "", payload.cv_id, result))
+        items.append(
+            MatchCheckBatchItem(
+                job_id=job.get("id"),
+                title=job.get("title"),
+                score=result.get("score", 0.0),
+                matched_skills=result.get("matched_skills", []),
+                missing_skills=result.get("missing_skills", []),
+                suggestions=result.get("rationale", ""),
+            )
+        )
+    if rows_to_insert:
+        client.table("match_checks").insert(rows_to_insert).execute()
+    return items
+
+
+@router.get("/recommended-jobs")
+async def recommended_jobs(
+    limit: int = Query(10, ge=1, le=50),
+    cv_id: Optional[str] = Query(None),
+    user: AuthUser = Depends(require_role("candidate")),
+    client: Client = Depends(get_supabase_user_client),
+):
+    """
+    Rank every open job against the candidate's skills and CV in one matrix operation.
+    Local embeddings only, so unlike /match-check this costs no Gemini call.
+    """
+    profile_res = _safe_select(client, "candidates", lambda tbl: tbl.select("*").eq("id", user.user_id).limit(1))
+    profile = profile_res[0] if profile_res else {}
+    if cv_id:
+        cv_rows = _safe_select(client, "candidate_cvs", lambda tbl: tbl.select("parsed_text").eq("id", cv_id).limit(1))
+    else:
+        cv_rows = _safe_select(
+            client,
+            "candidate_cvs",
+            lambda tbl: tbl.select("parsed_text").eq("candidate_id", user.user_id).order("created_at", desc=True).limit(1),
+        )
+    cv_text = (cv_rows[0].get("parsed_text") if cv_rows else None) or ""
+
+    settings = get_settings()
+    index = get_job_index()
+    await anyio.to_thread.run_sync(index.ensure_loaded, supabase_service_client(settings))
+    candidate_vec = embed_candidate(profile, condense_text(cv_text), index.dim)
+    candidate_terms = set(skill_set(profile.get("skills"))) | set(tokenize(cv_text))
+    results = []
+    for job, similarity in index.top_k(candidate_vec, limit):
+        matched, missing = split_skills(skill_set(job.get("skills")), candidate_terms)
+        results.append(
+            {
+                "job_id": job.get("id"),
+                "slug": job.get("slug") or job.get("id"),
+                "title": job.get("title"),
+                "company_name": job.get("company_name"),
+                "location": job.get("location"),
+                "remote": job.get("remote"),
+                "score": round(max(similarity, 0.0) * 100, 1),
+                "matched_skills": matched,
+                "missing_skills": missing,
+            }
+        )
+    return results
+
+
 @router.get("/matches")
 async def list_match_checks(
     user: AuthUser = Depends(require_role("candidate")), client: Client = Depends(get_supabase_user_client)
@@ -248,107 +366,100 @@ async def list_applications(
     user: AuthUser = Depends(require_role("candidate")), client: Client = Depends(get_supabase_user_client)
 ):
     res = client.table("applications").select("*").eq("candidate_id", user.user_id).execute()
-    return [
-        Application(
-            id=a["id"],
-            job_id=a["job_id"],
-            candidate_id=a["candidate_id"],
-            status=a.get("status", "applied"),
-            applied_at=a.get("applied_at", datetime.utcnow()),
-            match_score=a.get("match_score"),
-        )
-        for a in res.data or []
-    ]
+    # Same shape as Application with its defaults, built as plain dicts and encoded by orjson:
+    # the rows are our own, so validating a model per row and again through response_model is wasted.
+    return ORJSONResponse(
+        [
+            {
+                "id": a["id"],
+                "job_id": a["job_id"],
+                "candidate_id": a["candidate_id"],
+                "cv_id": None,
+                "status": a.get("status", "applied"),
+                "applied_at": a.get("applied_at", datetime.utcnow()),
+                "match_score": a.get("match_score"),
+                "match_level": None,
+                "matched_skills": [],
+                "missing_skills": [],
+                "rationale": None,
+                "best_fit": False,
+                "last_scored_at": None,
+            }
+            for a in res.data or []
+        ]
+    )
 
 
 @router.post("/apply/{job_id}")
 async def apply_to_job(
     job_id: str,
+    background_tasks: BackgroundTasks,
+    response: Response,
     body: Dict[str, Any] = Body(default_factory=dict),
     user: AuthUser = Depends(require_role("candidate")),
     client: Client = Depends(get_supabase_user_client),
-    settings: Settings = Depends(get_settings),
+    idempotency_key: Optional[str] = Header(None),
 ):
-    cv_id = body.get("cv_id")
-    cv_file_url = None
-    cv_excerpt = None
+    async def apply():
+        cv_id = body.get("cv_id")
+        cv_file_url = None
+        cv_excerpt = None
 
-    # If no cv_id provided, pick the latest CV for the candidate (if any)
-    try:
-        if cv_id:
-            cv_res = (
-                client.table("candidate_cvs")
-                .select("id,file_url,parsed_text")
-                .eq("id", cv_id)
-                .eq("candidate_id", user.user_id)
-                .limit(1)
-                .execute()
-            )
-        else:
-            cv_res = (
-                client.table("candidate_cvs")
-                .select("id,file_url,parsed_text")
-                .eq("candidate_id", user.user_id)
-                .order("created_at", desc=True)
-                .limit(1)
-                .execute()
-            )
-        if cv_res.data:
-            cv_row = cv_res.data[0]
-            cv_id = cv_row.get("id") or cv_id
-            cv_file_url = cv_row.get("file_url")
-            parsed_text = cv_row.get("parsed_text") or ""
-            cv_excerpt = (parsed_text or "")[:800] if parsed_text else None
-    except Exception:
-        # Don't block application creation if CV lookup fails
-        pass
-
-    try:
-        res = client.table("applications").insert(
-            {
-                "job_id": job_id,
-                "candidate_id": user.user_id,
-                "status": "applied",
-                "applied_at": datetime.utcnow().isoformat(),
-                "cv_id": cv_id,
-                "cv_file_url": cv_file_url,
-                "cv_excerpt": cv_excerpt,
-            }
-        ).execute()
-        app_row = res.data[0] if res.data else None
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
+        # If no cv_id provided, pick the latest CV for the candidate (if any)
+        try:
+            if cv_id:
+                cv_res = (
+                    client.table("candidate_cvs")
+                    .select("id,file_url,parsed_text")
+                    .eq("id", cv_id)
+                    .eq("candidate_id", user.user_id)
+                    .limit(1)
+                    .execute()
+                )
+            else:
+                cv_res = (
+                    client.table("candidate_cvs")
+                    .select("id,file_url,parsed_text")
+                    .eq("candidate_id", user.user_id)
+                    .order("created_at", desc=True)
+                    .limit(1)
+                    .execute()
+                )
+            if cv_res.data:
+                cv_row = cv_res.data[0]
+                cv_id = cv_row.get("id") or cv_id
+                cv_file_url = cv_row.get("file_url")
+                parsed_text = cv_row.get("parsed_text") or ""
+                cv_excerpt = (parsed_text or "")[:800] if parsed_text else None
+        except Exception:
+            # Don't block application creation if CV lookup fails
+            pass
 
-    # Notify recruiter if job has a recruiter_id
-    try:
-        svc = supabase_service_client(settings)
-        job_res = (
-            svc.table("jobs")
-            .select("id,title,recruiter_id")
-            .eq("id", job_id)
-            .limit(1)
-            .execute()
-        )
-        job = job_res.data[0] if job_res.data else None
-        recruiter_id = job.get("recruiter_id") if job else None
-        if recruiter_id:
-            svc.table("notifications").insert(
+        try:
+            res = client.table("applications").insert(
                 {
-                    "user_id": recruiter_id,
-                    "type": "new_application",
-                    "data": {
-                        "job_id": job_id,
-                        "job_title": job.get("title"),
-                        "candidate_id": user.user_id,
-                        "application_id": app_row.get("id") if app_row else None,
-                    },
+                    "job_id": job_id,
+                    "candidate_id": user.user_id,
+                    "status": "applied",
+                    "applied_at": datetime.utcnow().isoformat(),
+                    "cv_id": cv_id,
+                    "cv_file_url": cv_file_url,
+                    "cv_excerpt": cv_excerpt,
                 }
             ).execute()
-    except Exception:
-        # Notification failures should not block apply flow
-        pass
+            app_row = res.data[0] if res.data else None
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+        # The recruiter notification is enqueued in the outbox by a trigger on the same insert;
+        # drain it after the response is sent so apply latency doesn't include the fan-out.
+        background_tasks.add_task(get_outbox_dispatcher().dispatch_once)
 
-    return app_row or res.data
+        return app_row or res.data
+
+    return await get_idempotency_store().run(
+        idempotency_key, f"apply:{job_id}", user.user_id, apply, response, payload=body
+    )
 
 
 @router.post("/posts")
@@ -357,9 +468,11 @@ async def create_post(
     user: AuthUser = Depends(require_role("candidate")),
     client: Client = Depends(get_supabase_user_client),
 ):
-    return client.table("posts").insert(
+    data = client.table("posts").insert(
         {"candidate_id": user.user_id, "body": payload.body, "visibility": payload.visibility}
     ).execute().data
+    invalidate_feed()
+    return data
 
 
 @router.get("/posts")
@@ -368,10 +481,23 @@ async def list_posts(user: AuthUser = Depends(require_role("candidate")), client
 
 
 @router.get("/feed")
-async def feed(client: Client = Depends(get_supabase_user_client)):
-    # Simple public feed
-    return _safe_select(
-        client,
-        "posts",
-        lambda tbl: tbl.select("*").eq("visibility", "public").order("created_at", desc=True).limit(20),
-    )
+async def feed(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=50),
+    client: Client = Depends(get_supabase_user_client),
+):
+    # Public feed, newest first. The next page's cursor is returned in the X-Next-Cursor header
+    # (absent on the last page), so the body stays a plain list of posts.
+    try:
+        posts, next_cursor = load_feed_page(client, cursor, limit)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except APIError as exc:
+        if "PGRST205" in str(exc):
+            # Table missing in schema cache; return empty data so the UI stays usable.
+            return []
+        raise
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return posts
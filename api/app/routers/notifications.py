@@ -1,30 +1,118 @@
 # api/app/routers/notifications.py
+import asyncio
+import json
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from supabase import Client
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from postgrest.exceptions import APIError
 
-from ..dependencies import get_supabase_user_client, require_role
+from ..config import Settings, get_settings
+from ..dependencies import Client, get_supabase_user_client, require_role
 from ..schemas import AuthUser
+from ..services.notifications import get_notification_broker
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
 @router.get("")
 async def list_notifications(
+    limit: int = Query(50, ge=1, le=200),
+    unread_only: bool = Query(False),
+    after: Optional[str] = Query(None, description="Only return notifications created after this timestamp"),
     user: AuthUser = Depends(require_role("admin", "recruiter", "candidate", "authenticated")),
     client: Client = Depends(get_supabase_user_client),
 ):
-    resp = (
+    query = (
         client.table("notifications")
         .select("id,type,data,read,created_at")
         .eq("user_id", user.user_id)
-        .order("created_at", desc=True)
-        .execute()
     )
+    if unread_only:
+        query = query.eq("read", False)
+    if after:
+        query = query.gt("created_at", after)
+    resp = query.order("created_at", desc=True).limit(limit).execute()
     return resp.data or []
 
 
+@router.get("/unread-count")
+async def unread_count(
+    user: AuthUser = Depends(require_role("admin", "recruiter", "candidate", "authenticated")),
+    client: Client = Depends(get_supabase_user_client),
+):
+    # Counter row maintained by a trigger on notifications, so this is a single-row lookup.
+    try:
+        resp = (
+            client.table("notification_counters")
+            .select("unread")
+            .eq("user_id", user.user_id)
+            .limit(1)
+            .execute()
+        )
+        return {"unread": int(resp.data[0]["unread"]) if resp.data else 0}
+    except APIError as exc:
+        if "PGRST205" not in str(exc):
+            raise
+    # Counter table missing (schema.sql not applied yet); count through the partial unread index.
+    resp = (
+        client.table("notifications")
+        .select("id", count="exact")
+        .eq("user_id", user.user_id)
+        .eq("read", False)
+        .limit(1)
+        .execute()
+    )
+    return {"unread": resp.count or 0}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    user: AuthUser = Depends(require_role("admin", "recruiter", "candidate", "authenticated")),
+    settings: Settings = Depends(get_settings),
+):
+    """
+    Server-sent events stream of new notifications for the current user.
+    Replaces polling GET /notifications; clients reconnect automatically on drop.
+    """
+    broker = get_notification_broker()
+    heartbeat = settings.notification_heartbeat_seconds
+
+    async def event_source():
+        queue = broker.subscribe(user.user_id)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: notification\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            broker.unsubscribe(user.user_id, queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/read-all")
+async def mark_all_notifications_read(
+    user: AuthUser = Depends(require_role("admin", "recruiter", "candidate", "authenticated")),
+    client: Client = Depends(get_supabase_user_client),
+):
+    # One UPDATE server-side that returns only the count, not the rows it touched.
+    updated = client.rpc("mark_notifications_read", {"p_user_id": user.user_id}).execute().data
+    return {"ok": True, "updated": updated or 0}
+
+
 @router.post("/{notification_id}/read")
 async def mark_notification_read(
     notification_id: UUID,
@@ -1,11 +1,11 @@
 # api\app\routers\public.py
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException
-from supabase import Client
+from fastapi.responses import ORJSONResponse
 
-from ..dependencies import get_supabase_service_client, get_current_user
+from ..dependencies import Client, get_supabase_service_client, get_current_user
 from ..schemas import JobPublic
 from ..config import get_settings
 from ..schemas import AuthUser
@@ -13,13 +13,14 @@ from ..schemas import AuthUser
 router = APIRouter(tags=["public"])
 
 
-def _map_job_public(j: dict) -> JobPublic:
+def _job_public_row(j: dict) -> Dict[str, Any]:
+    """JobPublic-shaped dict for a jobs row, for list responses that skip pydantic."""
     company_id = j.get("company_id")
     company_name = j.get("company_name") or j.get("company") or "Company"
-    return JobPublic(
-        id=str(j.get("id") or ""),
-        slug=str(j.get("slug") or j.get("id") or ""),
-        company={
+    return {
+        "id": str(j.get("id") or ""),
+        "slug": str(j.get("slug") or j.get("id") or ""),
+        "company": {
             "id": str(company_id or ""),
             "name": str(company_name or "Company"),
             "website": j.get("company_website") or None,
@@ -27,14 +28,18 @@ def _map_job_public(j: dict) -> JobPublic:
             "location": j.get("company_location") or j.get("location"),
             "plan": j.get("company_plan") or j.get("plan") or "free",
         },
-        title=j.get("title") or "Untitled role",
-        location=j.get("location"),
-        remote=bool(j.get("remote", True)),
-        employment_type=j.get("employment_type") or None,
-        description=j.get("description") or "",
-        created_at=j.get("created_at", datetime.utcnow()),
-        status=j.get("status", "open"),
-    )
+        "title": j.get("title") or "Untitled role",
+        "location": j.get("location"),
+        "remote": bool(j.get("remote", True)),
+        "employment_type": j.get("employment_type") or None,
+        "description": j.get("description") or "",
+        "created_at": j.get("created_at", datetime.utcnow()),
+        "status": j.get("status", "open"),
+    }
+
+
+def _map_job_public(j: dict) -> JobPublic:
+    return JobPublic(**_job_public_row(j))
 
 
 @router.get("/health")
@@ -62,7 +67,9 @@ async def list_jobs(client: Client = Depends(get_supabase_service_client)):
         print("Error fetching jobs:", exc)
         raise HTTPException(status_code=500, detail="Error fetching jobs. Check Supabase tables/keys.")
     jobs = res.data or []
-    return [_map_job_public(j) for j in jobs]
+    # Rows come straight from our own table, so build the dicts directly and let orjson encode them
+    # instead of constructing a JobPublic per row and validating it again through response_model.
+    return ORJSONResponse([_job_public_row(j) for j in jobs])
 
 
 @router.get("/jobs/{slug}", response_model=JobPublic)
@@ -1,17 +1,19 @@
 # api\app\routers\recruiter.py
+import csv
+import io
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
-from supabase import Client
+from fastapi import APIRouter, Depends, Header, HTTPException, UploadFile, File, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from postgrest.exceptions import APIError
-import io
-from PyPDF2 import PdfReader
-from docx import Document
 from uuid import UUID
 
+import anyio
+import orjson
+
 from ..config import get_settings
-from ..dependencies import get_supabase_user_client, require_role
+from ..dependencies import Client, get_supabase_user_client, require_role, supabase_service_client
 from ..schemas import (
     AuthUser,
     DashboardStat,
@@ -20,13 +22,22 @@ from ..schemas import (
     MatchRequest,
     MatchResult,
 )
+from ..services.admission import RateLimited
+from ..services.documents import DOCX_CONTENT_TYPES, extract_text_from_docx, extract_text_from_pdf
+from ..services.embeddings import embed_job, skill_set
+from ..services.idempotency import get_idempotency_store
+from ..services.job_import import ImportFormatError, JobImporter, detect_format, iter_rows
 from ..services.matching import MatchingService, build_candidate_payload
+from ..services.singleflight import SingleFlight
+from ..services.vector_index import get_candidate_index, get_job_index
 
 router = APIRouter(prefix="/recruiter", tags=["recruiter"], dependencies=[Depends(require_role("recruiter"))])
 
+_scoring_flight = SingleFlight()
 
-def _matching_service(client: Client) -> MatchingService:
-    return MatchingService(settings=get_settings(), supabase=client)
+
+def _matching_service(client: Client, user: AuthUser) -> MatchingService:
+    return MatchingService(settings=get_settings(), supabase=client, user=user)
 
 
 @router.get("/dashboard", response_model=List[DashboardStat])
@@ -39,13 +50,19 @@ async def dashboard(
         jobs = client.table("jobs").select("id,status").eq("recruiter_id", user.user_id).execute().data or []
     except Exception:
         jobs = client.table("jobs").select("id,status").execute().data or []
-    apps = client.table("applications").select("id").execute().data or []
-    matches = client.table("matches").select("id").execute().data or []
+    # Counted by PostgREST (Content-Range) rather than by fetching every id.
+    apps = client.table("applications").select("id", count="exact").limit(1).execute().count or 0
+    # Every scoring run is a match_history row; matches only keeps the latest per candidate.
+    job_ids = [j["id"] for j in jobs]
+    matches = 0
+    if job_ids:
+        history = client.table("match_history").select("id", count="exact").in_("job_id", job_ids)
+        matches = history.limit(1).execute().count or 0
     open_jobs = len([j for j in jobs if j.get("status") == "open"])
     return [
         DashboardStat(label="Open Jobs", value=str(open_jobs)),
-        DashboardStat(label="Candidates in Pipeline", value=str(len(apps))),
-        DashboardStat(label="Matches Run", value=str(len(matches))),
+        DashboardStat(label="Candidates in Pipeline", value=str(apps)),
+        DashboardStat(label="Matches Run", value=str(matches)),
     ]
 
 
@@ -67,22 +84,6 @@ async def update_profile(
     return res.data
 
 
-def _extract_text_from_pdf(data: bytes) -> str:
-    reader = PdfReader(io.BytesIO(data))
-    text_parts: List[str] = []
-    for page in reader.pages[:5]:
-        try:
-            text_parts.append(page.extract_text() or "")
-        except Exception:
-            continue
-    return "\n".join(text_parts).strip()
-
-
-def _extract_text_from_docx(data: bytes) -> str:
-    doc = Document(io.BytesIO(data))
-    return "\n".join([p.text for p in doc.paragraphs if p.text]).strip()
-
-
 def _is_valid_uuid(value: str) -> bool:
     try:
         UUID(str(value))
@@ -91,6 +92,14 @@ def _is_valid_uuid(value: str) -> bool:
         return False
 
 
+def _recruiter_id_for_insert(user: AuthUser) -> Optional[str]:
+    # In local/dev without a real Supabase user, avoid FK errors by leaving recruiter_id null.
+    settings = get_settings()
+    if settings.app_env.lower() == "local" and not user.token:
+        return None
+    return user.user_id if _is_valid_uuid(user.user_id) else None
+
+
 def _guess_title_and_skills(text: str) -> Dict[str, Any]:
     lines = [l.strip() for l in text.splitlines() if l.strip()]
     title = lines[0][:80] if lines else "Job Title"
@@ -150,6 +159,25 @@ async def _score_application_record(
     match_service: MatchingService,
     job: Dict[str, Any],
     application: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Score one application and persist the result. Concurrent calls for the same
+    (job, candidate, cv) - double clicks, two recruiters on one job - share a single
+    Gemini call and a single write.
+    """
+    key = (str(job["id"]), str(application["candidate_id"]), str(application.get("cv_id") or ""))
+    scored = await _scoring_flight.do(
+        key, lambda: _run_score_application_record(client, match_service, job, application)
+    )
+    # Each caller gets its own copy; handlers annotate the result (e.g. best_fit).
+    return dict(scored)
+
+
+async def _run_score_application_record(
+    client: Client,
+    match_service: MatchingService,
+    job: Dict[str, Any],
+    application: Dict[str, Any],
 ) -> Dict[str, Any]:
     candidate_profile = _load_candidate(client, application["candidate_id"])
     cv_text = _get_cv_text(client, application.get("cv_id"))
@@ -174,20 +202,49 @@ async def _score_application_record(
             client.table("applications").update(update_fields).eq("id", application["id"]).execute()
         else:
             raise
-    client.table("matches").insert(
-        {
-            "job_id": job["id"],
-            "candidate_id": application["candidate_id"],
-            "score": score,
-            "matched_skills": result.get("matched_skills", []),
-            "missing_skills": result.get("missing_skills", []),
-            "rationale": result.get("rationale", ""),
-            "source": "batch",
-        }
-    ).execute()
+    match_row = {
+        "job_id": job["id"],
+        "candidate_id": application["candidate_id"],
+        "score": score,
+        "matched_skills": result.get("matched_skills", []),
+        "missing_skills": result.get("missing_skills", []),
+        "rationale": result.get("rationale", ""),
+        "source": "batch",
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+    # Latest score per (job, candidate); the match_history trigger keeps a compact record of each run.
+    try:
+        client.table("matches").upsert(match_row, on_conflict="job_id,candidate_id", returning="minimal").execute()
+    except APIError as exc:
+        # 42P10: no unique index for on_conflict, PGRST204: no updated_at column, i.e. schema.sql
+        # not re-applied yet; keep appending. Anything else (RLS, bad data) is a real error.
+        if exc.code not in ("42P10", "PGRST204"):
+            raise
+        print("matches upsert failed, inserting:", exc)
+        match_row.pop("updated_at")
+        client.table("matches").insert(match_row, returning="minimal").execute()
     return {**application, **update_fields}
 
 
+def _refresh_best_fit(client: Client, job_id: str) -> Optional[str]:
+    """
+    Recompute best_fit for a job after a score changes. The RPC flips the flags atomically in a
+    single UPDATE that only touches rows whose flag actually changes, and returns the best id.
+    """
+    try:
+        res = client.rpc("refresh_best_fit", {"p_job_id": job_id}).execute()
+        return res.data or None
+    except APIError as exc:
+        print("refresh_best_fit RPC failed, falling back:", exc)
+    all_apps = client.table("applications").select("id,match_score").eq("job_id", job_id).execute().data or []
+    if not all_apps:
+        return None
+    best = sorted(all_apps, key=lambda a: a.get("match_score") or 0, reverse=True)[0]
+    client.table("applications").update({"best_fit": False}).eq("job_id", job_id).neq("id", best["id"]).execute()
+    client.table("applications").update({"best_fit": True}).eq("id", best["id"]).execute()
+    return best["id"]
+
+
 @router.post("/jobs/ingest")
 async def ingest_job_file(
     file: UploadFile = File(...),
@@ -197,15 +254,15 @@ async def ingest_job_file(
     content = await file.read()
     text = ""
     if file.content_type == "application/pdf":
-        text = _extract_text_from_pdf(content)
-    elif file.content_type in ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"):
-        text = _extract_text_from_docx(content)
+        text = extract_text_from_pdf(content)
+    elif file.content_type in DOCX_CONTENT_TYPES:
+        text = extract_text_from_docx(content)
     elif file.content_type.startswith("text/"):
         text = content.decode(errors="ignore")
     else:
         raise HTTPException(status_code=400, detail="Unsupported file type")
 
-    match_service = _matching_service(client)
+    match_service = _matching_service(client, user)
     ai_payload = await match_service.improve_job_description(text[:6000])
     description = ai_payload.get("description") or text[:4000]
     must_ai = ai_payload.get("must_have") or []
@@ -228,9 +285,11 @@ async def improve_job_description(
     jd_text = body.get("description") or ""
     if not jd_text:
         raise HTTPException(status_code=400, detail="description is required")
-    match_service = _matching_service(client)
+    match_service = _matching_service(client, user)
     try:
         improved = await match_service.improve_job_description(jd_text)
+    except RateLimited:
+        raise
     except Exception as exc:
         print("Error improving JD:", repr(exc))
         raise HTTPException(status_code=502, detail="Error calling AI model. Try again later.")
@@ -248,20 +307,44 @@ async def create_job(
     client: Client = Depends(get_supabase_user_client),
 ):
     data = payload.model_dump()
-    settings = get_settings()
-    # In local/dev without a real Supabase user, avoid FK errors by leaving recruiter_id null.
-    if settings.app_env.lower() == "local" and not user.token:
-        data["recruiter_id"] = None
-    else:
-        try:
-            UUID(str(user.user_id))
-            data["recruiter_id"] = user.user_id
-        except Exception:
-            data["recruiter_id"] = None
+    data["recruiter_id"] = _recruiter_id_for_insert(user)
     res = client.table("jobs").insert(data).execute()
+    get_job_index().invalidate()
     return res.data
 
 
+@router.post("/jobs/import")
+async def import_jobs(
+    file: UploadFile = File(...),
+    file_format: Optional[Literal["csv", "jsonl"]] = Query(None, alias="format", description="Defaults to the file extension"),
+    extract_skills: bool = Query(False, description="Guess title/skills from the description when missing"),
+    user: AuthUser = Depends(require_role("recruiter")),
+    client: Client = Depends(get_supabase_user_client),
+):
+    """
+    Bulk-create jobs from a CSV (header row with JobCreate field names; skills separated by ';')
+    or JSONL (one JobCreate object per line) upload. Returns inserted/failed counts and per-row
+    errors by line number; valid rows are imported even when others fail.
+    """
+    settings = get_settings()
+    try:
+        fmt = file_format or detect_format(file.filename, file.content_type)
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    importer = JobImporter(
+        client,
+        recruiter_id=_recruiter_id_for_insert(user),
+        batch_size=settings.job_import_batch_size,
+        max_rows=settings.job_import_max_rows,
+        extract_skills=_guess_title_and_skills if extract_skills else None,
+    )
+    # Parsing, validation and the batched inserts are all blocking; keep them off the event loop.
+    result = await anyio.to_thread.run_sync(importer.run, iter_rows(file.file, fmt))
+    if result["inserted"]:
+        get_job_index().invalidate()
+    return result
+
+
 @router.get("/jobs")
 async def list_jobs(
     user: AuthUser = Depends(require_role("recruiter")),
@@ -299,6 +382,7 @@ async def update_job(
     client: Client = Depends(get_supabase_user_client),
 ):
     res = client.table("jobs").update(payload.model_dump()).eq("id", job_id).execute()
+    get_job_index().invalidate()
     return res.data
 
 
@@ -306,74 +390,88 @@ async def update_job(
 async def attach_candidate_to_job(
     job_id: str,
     body: Dict[str, Any],
+    response: Response,
     user: AuthUser = Depends(require_role("recruiter")),
     client: Client = Depends(get_supabase_user_client),
+    idempotency_key: Optional[str] = Header(None),
 ):
-    candidate_id = body.get("candidate_id")
-    if not candidate_id:
-        raise HTTPException(status_code=400, detail="candidate_id required")
-    res = client.table("applications").upsert(
-        {
-            "job_id": job_id,
-            "candidate_id": candidate_id,
-            "status": "applied",
-            "applied_at": datetime.utcnow().isoformat(),
-        }
-    ).execute()
-    return res.data
+    async def attach():
+        candidate_id = body.get("candidate_id")
+        if not candidate_id:
+            raise HTTPException(status_code=400, detail="candidate_id required")
+        res = client.table("applications").upsert(
+            {
+                "job_id": job_id,
+                "candidate_id": candidate_id,
+                "status": "applied",
+                "applied_at": datetime.utcnow().isoformat(),
+            }
+        ).execute()
+        return res.data
+
+    return await get_idempotency_store().run(
+        idempotency_key, f"attach:{job_id}", user.user_id, attach, response, payload=body
+    )
 
 
 @router.post("/jobs/{job_id}/match", response_model=MatchResult)
 async def run_match_for_candidate(
     job_id: str,
     payload: MatchRequest,
+    response: Response,
     user: AuthUser = Depends(require_role("recruiter")),
     client: Client = Depends(get_supabase_user_client),
+    idempotency_key: Optional[str] = Header(None),
 ):
-    settings = get_settings()
-    skip_owner = settings.app_env.lower() == "local" and not user.token
-    job = _load_job_owned(client, job_id, user.user_id, skip_owner_check=skip_owner)
-    match_service = _matching_service(client)
-    app_res = (
-        client.table("applications")
-        .select("*")
-        .eq("job_id", job_id)
-        .eq("candidate_id", payload.candidate_id)
-        .limit(1)
-        .execute()
-    )
-    application = app_res.data[0] if app_res.data else None
-    if application is None:
-        inserted = (
+    async def run_match():
+        settings = get_settings()
+        skip_owner = settings.app_env.lower() == "local" and not user.token
+        job = _load_job_owned(client, job_id, user.user_id, skip_owner_check=skip_owner)
+        match_service = _matching_service(client, user)
+        app_res = (
             client.table("applications")
-            .insert(
-                {
-                    "job_id": job_id,
-                    "candidate_id": payload.candidate_id,
-                    "status": "applied",
-                    "applied_at": datetime.utcnow().isoformat(),
-                    "cv_id": payload.cv_id,
-                }
-            )
+            .select("*")
+            .eq("job_id", job_id)
+            .eq("candidate_id", payload.candidate_id)
+            .limit(1)
             .execute()
         )
-        application = inserted.data[0]
-    # Ensure cv_id is respected for scoring
-    application["cv_id"] = payload.cv_id or application.get("cv_id")
-    scored_app = await _score_application_record(client, match_service, job, application)
-    return MatchResult(
-        job_id=job_id,
-        candidate_id=payload.candidate_id,
-        score=scored_app.get("match_score", 0.0),
-        match_level=scored_app.get("match_level"),
-        matched_skills=scored_app.get("matched_skills", []),
-        missing_skills=scored_app.get("missing_skills", []),
-        rationale=scored_app.get("rationale", ""),
-        created_at=datetime.utcnow(),
+        application = app_res.data[0] if app_res.data else None
+        if application is None:
+            inserted = (
+                client.table("applications")
+                .insert(
+                    {
+                        "job_id": job_id,
+                        "candidate_id": payload.candidate_id,
+                        "status": "applied",
+                        "applied_at": datetime.utcnow().isoformat(),
+                        "cv_id": payload.cv_id,
+                    }
+                )
+                .execute()
+            )
+            application = inserted.data[0]
+        # Ensure cv_id is respected for scoring
+        application["cv_id"] = payload.cv_id or application.get("cv_id")
+        scored_app = await _score_application_record(client, match_service, job, application)
+        return MatchResult(
+            job_id=job_id,
+            candidate_id=payload.candidate_id,
+            score=scored_app.get("match_score", 0.0),
+            match_level=scored_app.get("match_level"),
+            matched_skills=scored_app.get("matched_skills", []),
+            missing_skills=scored_app.get("missing_skills", []),
+            rationale=scored_app.get("rationale", ""),
+            created_at=datetime.utcnow(),
+        )
+
+    return await get_idempotency_store().run(
+        idempotency_key, f"match:{job_id}", user.user_id, run_match, response, payload=payload
     )
 
 
-@router.get("/jobs/{job_id}/applications")
+@router.get("/jobs/{job_id}/applications", response_class=ORJSONResponse)
 async def list_job_applications(
     job_id: str,
     include_best: bool = Query(False),
@@ -404,9 +502,9 @@ async def list_job_applications(
         reverse=True,
     )
     if include_best and sorted_apps:
-        best_id = sorted_apps[0]["id"]
-        client.table("applications").update({"best_fit": False}).eq("job_id", job_id).execute()
-        client.table("applications").update({"best_fit": True}).eq("id", best_id).execute()
+        # Derived at read time so the GET stays side-effect free; scoring endpoints persist the flag.
+        for app in sorted_apps:
+            app["best_fit"] = False
         sorted_apps[0]["best_fit"] = True
     enriched = []
     for app in sorted_apps:
@@ -418,78 +516,305 @@ async def list_job_applications(
                 "email": user_map.get(app.get("candidate_id"), {}).get("email"),
             }
         )
-    return enriched
+    # Returned as a response so FastAPI skips jsonable_encoder; these rows are already JSON-native.
+    return ORJSONResponse(enriched)
+
+
+_EXPORT_COLUMNS = (
+    "application_id",
+    "candidate_id",
+    "email",
+    "headline",
+    "location",
+    "skills",
+    "status",
+    "applied_at",
+    "match_score",
+    "match_level",
+    "matched_skills",
+    "missing_skills",
+    "rationale",
+    "best_fit",
+    "last_scored_at",
+    "cv_file_url",
+)
 
 
-@router.post("/jobs/{job_id}/applications/score")
-async def score_all_applications_for_job(
+def _iter_pipeline_pages(client: Client, job_id: str, page_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Enriched applications for a job, one page at a time. Keyset pagination on the primary key
+    (id > last id seen) keeps every page an index range scan and stays consistent while new
+    applications arrive; candidates and emails are joined per page with two IN lookups.
+    """
+    last_id = None
+    while True:
+        query = client.table("applications").select("*").eq("job_id", job_id)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        apps = query.order("id").limit(page_size).execute().data or []
+        if not apps:
+            return
+        candidate_ids = list({a["candidate_id"] for a in apps if a.get("candidate_id")})
+        candidates = (
+            client.table("candidates").select("*").in_("id", candidate_ids).execute().data if candidate_ids else []
+        )
+        users = (
+            client.table("users").select("id,email").in_("id", candidate_ids).execute().data if candidate_ids else []
+        )
+        cand_map = {c["id"]: c for c in candidates or []}
+        user_map = {u["id"]: u for u in users or []}
+        yield [
+            {
+                **app,
+                "candidate": cand_map.get(app.get("candidate_id")) or {},
+                "email": user_map.get(app.get("candidate_id"), {}).get("email"),
+            }
+            for app in apps
+        ]
+        if len(apps) < page_size:
+            return
+        last_id = apps[-1]["id"]
+
+
+def _export_csv_row(app: Dict[str, Any]) -> List[Any]:
+    candidate = app.get("candidate") or {}
+
+    def joined(values: Any) -> str:
+        return "; ".join(str(v) for v in values or [])
+
+    return [
+        app.get("id"),
+        app.get("candidate_id"),
+        app.get("email"),
+        candidate.get("headline"),
+        candidate.get("location"),
+        joined(candidate.get("skills")),
+        app.get("status"),
+        app.get("applied_at"),
+        app.get("match_score"),
+        app.get("match_level"),
+        joined(app.get("matched_skills")),
+        joined(app.get("missing_skills")),
+        app.get("rationale"),
+        app.get("best_fit"),
+        app.get("last_scored_at"),
+        app.get("cv_file_url"),
+    ]
+
+
+@router.get("/jobs/{job_id}/applications/export")
+async def export_job_applications(
     job_id: str,
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
     user: AuthUser = Depends(require_role("recruiter")),
     client: Client = Depends(get_supabase_user_client),
 ):
+    """
+    Stream a job's whole pipeline as CSV or NDJSON (one enriched application per line, the same
+    shape as GET /jobs/{job_id}/applications). Only one page is held in memory at a time.
+    """
+    settings = get_settings()
+    skip_owner = settings.app_env.lower() == "local" and not user.token
+    # Checked before streaming starts so a missing/foreign job is a clean 404.
+    _load_job_owned(client, job_id, user.user_id, skip_owner_check=skip_owner)
+    pages = _iter_pipeline_pages(client, job_id, settings.pipeline_export_page_size)
+
+    # Sync generators: Starlette runs each step in the threadpool, so the per-page PostgREST
+    # calls don't block the event loop.
+    def csv_body() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(_EXPORT_COLUMNS)
+        for page in pages:
+            writer.writerows(_export_csv_row(app) for app in page)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def ndjson_body() -> Iterator[bytes]:
+        for page in pages:
+            yield b"".join(orjson.dumps(app) + b"\n" for app in page)
+
+    filename = f"pipeline-{job_id}.{export_format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if export_format == "csv":
+        return StreamingResponse(csv_body(), media_type="text/csv; charset=utf-8", headers=headers)
+    return StreamingResponse(ndjson_body(), media_type="application/x-ndjson", headers=headers)
+
+
+@router.get("/jobs/{job_id}/sourcing")
+async def source_candidates_for_job(
+    job_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    include_applicants: bool = Query(False),
+    user: AuthUser = Depends(require_role("recruiter")),
+    client: Client = Depends(get_supabase_user_client),
+):
+    """
+    Top-N candidates across the whole platform for a job, by embedding similarity.
+    Unlike the scoring endpoints this doesn't call Gemini, so it can rank every candidate.
+    """
     settings = get_settings()
     skip_owner = settings.app_env.lower() == "local" and not user.token
     job = _load_job_owned(client, job_id, user.user_id, skip_owner_check=skip_owner)
-    apps = client.table("applications").select("*").eq("job_id", job_id).execute().data or []
-    if not apps:
-        return {"scored": 0, "best_fit_id": None}
-    match_service = _matching_service(client)
-    scored: List[Dict[str, Any]] = []
-    for app in apps:
-        scored_app = await _score_application_record(client, match_service, job, app)
-        scored.append(scored_app)
-    best_fit_id = None
-    if scored:
-        client.table("applications").update({"best_fit": False}).eq("job_id", job_id).execute()
-        best = sorted(scored, key=lambda a: a.get("match_score") or 0, reverse=True)[0]
-        best_fit_id = best.get("id")
-        if best_fit_id:
-            client.table("applications").update({"best_fit": True}).eq("id", best_fit_id).execute()
-    return {"scored": len(scored), "best_fit_id": best_fit_id}
+    index = get_candidate_index()
+    # Candidate rows are self-read under RLS, so the index is built with the service client.
+    await anyio.to_thread.run_sync(index.ensure_loaded, supabase_service_client(settings))
+    exclude = set()
+    if not include_applicants:
+        applied = client.table("applications").select("candidate_id").eq("job_id", job_id).execute().data or []
+        exclude = {a["candidate_id"] for a in applied if a.get("candidate_id")}
+    hits = index.search(embed_job(job, index.dim), limit, exclude=exclude)
+    job_skills = skill_set(job.get("skills"))
+    results = []
+    for candidate_id, similarity in hits:
+        profile = index.profile(candidate_id)
+        candidate_skills = set(skill_set(profile.get("skills")))
+        results.append(
+            {
+                "candidate_id": candidate_id,
+                "similarity": round(similarity, 4),
+                "headline": profile.get("headline"),
+                "location": profile.get("location"),
+                "skills": profile.get("skills") or [],
+                "matched_skills": [s for s in job_skills if s in candidate_skills],
+            }
+        )
+    return results
+
+
+@router.post("/jobs/{job_id}/applications/score")
+async def score_all_applications_for_job(
+    job_id: str,
+    response: Response,
+    user: AuthUser = Depends(require_role("recruiter")),
+    client: Client = Depends(get_supabase_user_client),
+    idempotency_key: Optional[str] = Header(None),
+):
+    async def score_all():
+        settings = get_settings()
+        skip_owner = settings.app_env.lower() == "local" and not user.token
+        job = _load_job_owned(client, job_id, user.user_id, skip_owner_check=skip_owner)
+        apps = client.table("applications").select("*").eq("job_id", job_id).execute().data or []
+        if not apps:
+            return {"scored": 0, "best_fit_id": None, "remaining": 0}
+        # At most LLM_BATCH_MAX_CALLS per request, never-scored and stalest first; the response
+        # says how many are left for the next call.
+        apps.sort(key=lambda a: a.get("last_scored_at") or "")
+        batch = apps[: max(1, settings.llm_batch_max_calls)]
+        match_service = _matching_service(client, user)
+        # One admission for the whole batch: refused up front, never a 429 halfway through.
+        match_service.reserve(len(batch))
+        scored: List[Dict[str, Any]] = []
+        try:
+            for app in batch:
+                scored_app = await _score_application_record(client, match_service, job, app)
+                scored.append(scored_app)
+        finally:
+            match_service.release_reservation()
+            # Scores already written count even if a later one failed.
+            best_fit_id = _refresh_best_fit(client, job_id) if scored else None
+        return {"scored": len(scored), "best_fit_id": best_fit_id, "remaining": len(apps) - len(scored)}
+
+    return await get_idempotency_store().run(
+        idempotency_key, f"score-all:{job_id}", user.user_id, score_all, response
+    )
 
 
 @router.post("/jobs/{job_id}/applications/{application_id}/score", response_model=MatchResult)
 async def score_single_application(
     job_id: str,
     application_id: str,
+    response: Response,
     user: AuthUser = Depends(require_role("recruiter")),
     client: Client = Depends(get_supabase_user_client),
+    idempotency_key: Optional[str] = Header(None),
 ):
-    settings = get_settings()
-    skip_owner = settings.app_env.lower() == "local" and not user.token
-    job = _load_job_owned(client, job_id, user.user_id, skip_owner_check=skip_owner)
-    app_res = (
-        client.table("applications")
-        .select("*")
-        .eq("job_id", job_id)
-        .eq("id", application_id)
-        .limit(1)
-        .execute()
-    )
-    if not app_res.data:
-        raise HTTPException(status_code=404, detail="Application not found")
-    application = app_res.data[0]
-    match_service = _matching_service(client)
-    scored_app = await _score_application_record(client, match_service, job, application)
-    all_apps = client.table("applications").select("id,match_score").eq("job_id", job_id).execute().data or []
-    if all_apps:
-        client.table("applications").update({"best_fit": False}).eq("job_id", job_id).execute()
-        best = sorted(all_apps, key=lambda a: a.get("match_score") or 0, reverse=True)[0]
-        client.table("applications").update({"best_fit": True}).eq("id", best["id"]).execute()
-        if scored_app.get("id") == best.get("id"):
-            scored_app["best_fit"] = True
-    return MatchResult(
-        job_id=job_id,
-        candidate_id=scored_app.get("candidate_id", ""),
-        score=scored_app.get("match_score", 0.0),
-        match_level=scored_app.get("match_level"),
-        matched_skills=scored_app.get("matched_skills", []),
-        missing_skills=scored_app.get("missing_skills", []),
-        rationale=scored_app.get("rationale", ""),
-        created_at=datetime.utcnow(),
+    async def score_one():
+        settings = get_settings()
+        skip_owner = settings.app_env.lower() == "local" and not user.token
+        job = _load_job_owned(client, job_id, user.user_id, skip_owner_check=skip_owner)
+        app_res = (
+            client.table("applications")
+            .select("*")
+            .eq("job_id", job_id)
+            .eq("id", application_id)
+            .limit(1)
+            .execute()
+        )
+        if not app_res.data:
+            raise HTTPException(status_code=404, detail="Application not found")
+        application = app_res.data[0]
+        match_service = _matching_service(client, user)
+        scored_app = await _score_application_record(client, match_service, job, application)
+        best_fit_id = _refresh_best_fit(client, job_id)
+        scored_app["best_fit"] = scored_app.get("id") == best_fit_id
+        return MatchResult(
+            job_id=job_id,
+            candidate_id=scored_app.get("candidate_id", ""),
+            score=scored_app.get("match_score", 0.0),
+            match_level=scored_app.get("match_level"),
+            matched_skills=scored_app.get("matched_skills", []),
+            missing_skills=scored_app.get("missing_skills", []),
+            rationale=scored_app.get("rationale", ""),
+            created_at=datetime.utcnow(),
+        )
+
+    return await get_idempotency_store().run(
+        idempotency_key, f"score:{job_id}:{application_id}", user.user_id, score_one, response
     )
 
 
+@router.get("/candidates/search")
+async def search_candidates(
+    q: str = Query("", max_length=200),
+    location: Optional[str] = Query(None),
+    skills: List[str] = Query([]),
+    remote_pref: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    user: AuthUser = Depends(require_role("recruiter")),
+    client: Client = Depends(get_supabase_user_client),
+):
+    """
+    Ranked full-text search over candidate skills, headline, summary, location and latest CV text.
+    Backed by the search_candidates RPC (GIN-indexed tsvector on candidates).
+    """
+    try:
+        return (
+            client.rpc(
+                "search_candidates",
+                {
+                    "p_query": q,
+                    "p_location": location,
+                    "p_skills": skills or None,
+                    "p_remote_pref": remote_pref,
+                    "p_limit": limit,
+                    "p_offset": offset,
+                },
+            )
+            .execute()
+            .data
+            or []
+        )
+    except APIError as exc:
+        print("search_candidates RPC failed, falling back:", exc)
+    # Unranked substring fallback for setups without the RPC; fine for small local datasets only.
+    query = client.table("candidates").select("id,headline,location,remote_pref,summary,skills,links")
+    term = "".join(ch for ch in q if ch not in ",.()*%").strip()
+    if term:
+        query = query.or_(f"headline.ilike.*{term}*,summary.ilike.*{term}*,location.ilike.*{term}*")
+    if location:
+        query = query.ilike("location", f"%{location}%")
+    if skills:
+        query = query.contains("skills", skills)
+    if remote_pref:
+        query = query.eq("remote_pref", remote_pref)
+    return query.range(offset, offset + limit - 1).execute().data or []
+
+
 @router.get("/candidates/{candidate_id}")
 async def candidate_detail(
     candidate_id: str,
@@ -504,42 +829,71 @@ async def candidate_detail(
     return {"profile": profile[0] if profile else {}, "posts": posts, "applications": applications}
 
 
-@router.get("/candidates")
+@router.get("/candidates", response_class=ORJSONResponse)
 async def list_candidates(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     user: AuthUser = Depends(require_role("recruiter")),
     client: Client = Depends(get_supabase_user_client),
 ):
-    # Candidates that have applied to any of this recruiter's jobs. In local mode (non-UUID user),
-    # fall back to all jobs to avoid UUID cast errors.
-    job_ids = client.table("jobs").select("id").execute().data or []
-    try:
-        UUID(str(user.user_id))
-        job_ids = client.table("jobs").select("id").eq("recruiter_id", user.user_id).execute().data or job_ids
-    except Exception:
-        # keep job_ids as all jobs when user_id isn't a UUID (local dev)
-        pass
+    # Candidates that have applied to any of this recruiter's jobs, most recent applicants first.
+    # With a real recruiter the joined RPC does jobs -> applications -> candidates -> emails in one query.
+    if _is_valid_uuid(user.user_id):
+        try:
+            return ORJSONResponse(
+                client.rpc(
+                    "recruiter_candidates",
+                    {"p_recruiter_id": user.user_id, "p_limit": limit, "p_offset": offset},
+                )
+                .execute()
+                .data
+                or []
+            )
+        except APIError as exc:
+            # RPC missing (schema.sql not applied yet); fall back to the table-by-table path below.
+            print("recruiter_candidates RPC failed, falling back:", exc)
+        jobs = client.table("jobs").select("id").eq("recruiter_id", user.user_id).execute().data or []
+    else:
+        # In local mode (non-UUID user), fall back to all jobs to avoid UUID cast errors.
+        jobs = client.table("jobs").select("id").execute().data or []
 
-    job_ids_list = [j["id"] for j in job_ids]
+    job_ids_list = [j["id"] for j in jobs]
     if not job_ids_list:
         return []
 
-    apps = client.table("applications").select("*").in_("job_id", job_ids_list).execute().data or []
-    candidate_ids = list({a["candidate_id"] for a in apps if a.get("candidate_id")})
+    apps = (
+        client.table("applications")
+        .select("*")
+        .in_("job_id", job_ids_list)
+        .order("applied_at", desc=True)
+        .execute()
+        .data
+        or []
+    )
+    # Single pass: group applications by candidate (dict keeps most-recent-applicant order).
+    apps_by_candidate: Dict[str, List[Dict[str, Any]]] = {}
+    for a in apps:
+        cid = a.get("candidate_id")
+        if cid:
+            apps_by_candidate.setdefault(cid, []).append(a)
+    candidate_ids = list(apps_by_candidate)[offset : offset + limit]
     if not candidate_ids:
         return []
     candidates = client.table("candidates").select("*").in_("id", candidate_ids).execute().data or []
     users = client.table("users").select("id,email").in_("id", candidate_ids).execute().data or []
     cand_map = {c["id"]: c for c in candidates}
     user_map = {u["id"]: u for u in users}
-    return [
-        {
-            "id": cid,
-            "candidate": cand_map.get(cid, {}),
-            "email": user_map.get(cid, {}).get("email"),
-            "applications": [a for a in apps if a.get("candidate_id") == cid],
-        }
-        for cid in candidate_ids
-    ]
+    return ORJSONResponse(
+        [
+            {
+                "id": cid,
+                "candidate": cand_map.get(cid, {}),
+                "email": user_map.get(cid, {}).get("email"),
+                "applications": apps_by_candidate[cid],
+            }
+            for cid in candidate_ids
+        ]
+    )
 
 
 @router.post("/candidates/{candidate_id}/bookmark")
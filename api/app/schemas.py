@@ -1,6 +1,7 @@
 # api\app\schemas.py
 from datetime import datetime
 from typing import List, Literal, Optional
+from uuid import UUID
 
 from pydantic import BaseModel, EmailStr, HttpUrl, Field
 
@@ -116,6 +117,23 @@ class MatchCheckResponse(BaseModel):
     suggestions: str
 
 
+class MatchCheckBatchRequest(BaseModel):
+    # Validated here so a malformed id is a 422, not a uuid cast error from PostgREST.
+    job_ids: List[UUID] = Field(default_factory=list)
+    jd_texts: List[str] = Field(default_factory=list)
+    cv_id: Optional[str] = None
+
+
+class MatchCheckBatchItem(BaseModel):
+    job_id: Optional[str] = None
+    title: Optional[str] = None
+    score: float = 0.0
+    matched_skills: List[str] = Field(default_factory=list)
+    missing_skills: List[str] = Field(default_factory=list)
+    suggestions: str = ""
+    error: Optional[str] = None
+
+
 class PostCreate(BaseModel):
     body: str
     visibility: Literal["public", "hidden"] = "public"
@@ -125,3 +143,36 @@ class DashboardStat(BaseModel):
     label: str
     value: str
     trend: Optional[str] = None
+
+
+class UserFilter(BaseModel):
+    role: Optional[str] = None
+    status: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+class BulkUserStatusRequest(BaseModel):
+    status: str = Field(pattern=r"^[A-Za-z_-]{1,32}$")
+    ids: List[str] = Field(default_factory=list)
+    filter: Optional[UserFilter] = None
+
+
+class PostFilter(BaseModel):
+    candidate_id: Optional[str] = None
+    status: Optional[str] = None
+    visibility: Optional[str] = None
+    body_contains: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+class BulkPostModerationRequest(BaseModel):
+    status: str = Field("hidden", pattern=r"^[A-Za-z_-]{1,32}$")
+    ids: List[str] = Field(default_factory=list)
+    filter: Optional[PostFilter] = None
+
+
+class BulkUpdateResult(BaseModel):
+    status: str
+    affected: int
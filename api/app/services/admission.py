@@ -0,0 +1,231 @@
+# api\app\services\admission.py
+"""
+Admission control for model calls made through MatchingService.
+
+Three layers, checked in order:
+- a token bucket per user, so one caller's batch can't use up the shared model quota;
+- a global token bucket sized to the model quota;
+- a fixed number of concurrent call slots handed out by weighted fair queuing, so when slots are
+  scarce each user (weighted by role) gets a fair share instead of first-come-first-served.
+
+Bucket misses and a full or slow queue raise RateLimited immediately (mapped to 429 with
+Retry-After in main.py) instead of parking the request on a busy worker.
+
+A batch of calls (scoring every application for a job, at most LLM_BATCH_MAX_CALLS) reserves
+its per-user tokens as a unit up front, so it is either refused before any work starts or admitted
+whole instead of hitting 429 partway. A batch larger than the user's burst runs only that user's
+bucket into debt. The shared global bucket is never prepaid: each batch call takes its global
+token as it runs, waiting up to LLM_QUEUE_TIMEOUT_SECONDS for one, so a batch can't exhaust the
+model quota for everyone else.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from ..config import Settings, get_settings
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, burst: float):
+        self.rate = rate_per_second
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float = 1.0, allow_debt: bool = False) -> float:
+        """
+        Take `cost` tokens. Returns 0 on success, otherwise seconds until they'd be available.
+        With allow_debt, a cost above the burst is granted once the bucket is full and leaves it
+        negative.
+        """
+        self._refill(time.monotonic())
+        needed = min(cost, self.capacity) if allow_debt else cost
+        if self.tokens >= needed:
+            self.tokens -= cost
+            return 0.0
+        return (needed - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+    def refund(self, cost: float = 1.0) -> None:
+        self.tokens = min(self.capacity, self.tokens + cost)
+
+    def is_full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class FairQueue:
+    """
+    `slots` concurrent holders; waiters are served in order of their start-time fair queuing tag:
+    max(virtual time, the key's last tag) + 1/weight. A key with weight 2 gets twice the grants
+    of a weight-1 key while both are waiting, and a key that was idle doesn't bank credit.
+    """
+
+    def __init__(self, slots: int, max_waiting: int):
+        self.free = slots
+        self.max_waiting = max_waiting
+        self._heap: List[Tuple[float, int, asyncio.Future]] = []
+        self._virtual = 0.0
+        self._last_tag: Dict[str, float] = {}
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._heap)
+
+    async def acquire(self, key: str, weight: float, timeout: float) -> None:
+        if self.free > 0 and not self._heap:
+            self.free -= 1
+            return
+        if len(self._heap) >= self.max_waiting:
+            raise RateLimited(timeout, "Model call queue is full")
+        tag = max(self._virtual, self._last_tag.get(key, 0.0)) + 1.0 / max(weight, 0.01)
+        self._last_tag[key] = tag
+        if len(self._last_tag) > 10_000:
+            self._last_tag = {k: t for k, t in self._last_tag.items() if t > self._virtual}
+        granted = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (tag, next(self._seq), granted))
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), timeout)
+        except BaseException as exc:
+            # Timed out or the request went away. If the slot was granted in the meantime, pass
+            # it on; otherwise cancel so release() skips this waiter.
+            if granted.done() and not granted.cancelled():
+                self.release()
+            else:
+                granted.cancel()
+            if isinstance(exc, asyncio.TimeoutError):
+                raise RateLimited(timeout, "Timed out waiting for model capacity") from None
+            raise
+
+    def release(self) -> None:
+        while self._heap:
+            tag, _, granted = heapq.heappop(self._heap)
+            if granted.cancelled():
+                continue
+            self._virtual = tag
+            granted.set_result(None)
+            return
+        self.free += 1
+
+
+class AdmissionController:
+    def __init__(self, settings: Settings):
+        self.enabled = settings.llm_admission_enabled
+        self.user_rate = settings.llm_user_rate_per_minute / 60.0
+        self.user_burst = settings.llm_user_burst
+        self.queue_timeout = settings.llm_queue_timeout_seconds
+        self.role_weights = settings.llm_role_weights
+        self._global = TokenBucket(settings.llm_global_rate_per_minute / 60.0, settings.llm_global_burst)
+        self._users: Dict[str, TokenBucket] = {}
+        self._queue = FairQueue(settings.llm_max_concurrency, settings.llm_queue_max)
+        self._lock = threading.Lock()
+
+    def _user_bucket(self, user_id: str) -> TokenBucket:
+        # Caller holds self._lock.
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            if len(self._users) > 10_000:
+                # Full buckets carry no state worth keeping.
+                self._users = {k: b for k, b in self._users.items() if not b.is_full()}
+            bucket = self._users[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        return bucket
+
+    def _take_tokens(self, user_id: str) -> None:
+        with self._lock:
+            bucket = self._user_bucket(user_id)
+            wait = bucket.take()
+            if wait:
+                raise RateLimited(wait, "Too many model calls for this user; slow down")
+            wait = self._global.take()
+            if wait:
+                bucket.refund()
+                raise RateLimited(wait, "Model capacity is saturated; try again shortly")
+
+    async def _wait_for_global_token(self) -> None:
+        """A global token for an already admitted batch call: wait for one rather than fail."""
+        deadline = time.monotonic() + self.queue_timeout
+        while True:
+            with self._lock:
+                wait = self._global.take()
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimited(wait, "Model capacity is saturated; try again shortly")
+            await asyncio.sleep(wait)
+
+    def reserve(self, user_id: Optional[str], calls: int) -> None:
+        """
+        Charge `calls` model calls to the user's bucket at once (into debt past the burst), or
+        raise RateLimited. The calls are then made with admit(..., prepaid=True).
+        """
+        if not self.enabled or calls <= 0:
+            return
+        with self._lock:
+            wait = self._user_bucket(user_id or "anonymous").take(calls, allow_debt=True)
+        if wait:
+            raise RateLimited(wait, "Too many model calls for this user; slow down")
+
+    def charge(self, user_id: Optional[str], calls: int = 1) -> None:
+        """Bill extra calls made inside an admitted batch (reply retries) without refusing them."""
+        if not self.enabled or calls <= 0:
+            return
+        with self._lock:
+            bucket = self._user_bucket(user_id or "anonymous")
+            bucket.tokens -= calls
+
+    def refund(self, user_id: Optional[str], calls: int) -> None:
+        """Give back reserved calls that were not made."""
+        if not self.enabled or calls <= 0:
+            return
+        with self._lock:
+            bucket = self._users.get(user_id or "anonymous")
+            if bucket is not None:
+                bucket.refund(calls)
+
+    @asynccontextmanager
+    async def admit(
+        self, user_id: Optional[str], role: Optional[str], prepaid: bool = False
+    ) -> AsyncIterator[None]:
+        """
+        Hold one model-call slot for the duration of the block, or raise RateLimited. A prepaid
+        call (see reserve) skips the user bucket and waits for its global token.
+        """
+        if not self.enabled:
+            yield
+            return
+        key = user_id or "anonymous"
+        if prepaid:
+            await self._wait_for_global_token()
+        else:
+            self._take_tokens(key)
+        await self._queue.acquire(key, self.role_weights.get(role or "", 1.0), self.queue_timeout)
+        try:
+            yield
+        finally:
+            self._queue.release()
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    return AdmissionController(get_settings())
@@ -0,0 +1,30 @@
+# api\app\services\documents.py
+import io
+from typing import List
+
+from .metrics import instrumented
+
+DOCX_CONTENT_TYPES = ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword")
+
+
+@instrumented("parser", "pdf")
+def extract_text_from_pdf(data: bytes) -> str:
+    # Parser libraries are imported on first use to keep them off the cold-start path.
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    text_parts: List[str] = []
+    for page in reader.pages[:5]:
+        try:
+            text_parts.append(page.extract_text() or "")
+        except Exception:
+            continue
+    return "\n".join(text_parts).strip()
+
+
+@instrumented("parser", "docx")
+def extract_text_from_docx(data: bytes) -> str:
+    from docx import Document
+
+    doc = Document(io.BytesIO(data))
+    return "\n".join([p.text for p in doc.paragraphs if p.text]).strip()
@@ -0,0 +1,116 @@
+# api\app\services\embeddings.py
+"""
+Local text embeddings for candidate/job similarity, no external service involved.
+
+A signed hashing vectorizer: tokens are hashed into a fixed number of dimensions with a stable
+hash (blake2b, so vectors are identical across processes), weighted by sublinear term frequency,
+and L2-normalized so a dot product is cosine similarity. Declared skills are weighted higher than
+free text because they are the strongest matching signal.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+# numpy is imported where it is used, so cold starts that never build an index don't load it.
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_DIM = 512
+SKILL_WEIGHT = 3.0
+CV_TERMS = 64
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by for from has have i in is it its my of on or our that the their
+    this to was we were will with you your job role work team years year experience using used
+    also need needs must should can able strong good great looking join who what more see
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+@lru_cache(maxsize=200_000)
+def _bucket(token: str, dim: int) -> Tuple[int, float]:
+    h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+    return h % dim, 1.0 if (h >> 63) & 1 else -1.0
+
+
+def _normalize_skill(skill: Any) -> str:
+    # Job skills may be JobSkill dicts ({"skill": ..., "importance": ...}) or plain strings.
+    if isinstance(skill, dict):
+        skill = skill.get("skill") or ""
+    return str(skill or "").strip().lower()
+
+
+def skill_set(skills: Optional[Iterable[Any]]) -> List[str]:
+    seen: Dict[str, None] = {}
+    for s in skills or []:
+        norm = _normalize_skill(s)
+        if norm:
+            seen.setdefault(norm, None)
+    return list(seen)
+
+
+def split_skills(job_skills: List[str], candidate_terms: set) -> Tuple[List[str], List[str]]:
+    """Partition normalized job skills into (matched, missing) against a candidate's terms."""
+    matched, missing = [], []
+    for skill in job_skills:
+        tokens = tokenize(skill)
+        if skill in candidate_terms or (tokens and all(t in candidate_terms for t in tokens)):
+            matched.append(skill)
+        else:
+            missing.append(skill)
+    return matched, missing
+
+
+def condense_text(text: str, max_terms: int = CV_TERMS) -> List[str]:
+    """Reduce a long document (e.g. a CV) to its most frequent informative terms."""
+    counts = Counter(tokenize(text))
+    return [t for t, _ in counts.most_common(max_terms)]
+
+
+def embed_tokens(tokens: Iterable[str], skills: Iterable[str] = (), dim: int = DEFAULT_DIM) -> np.ndarray:
+    import numpy as np
+    vec = np.zeros(dim, dtype=np.float32)
+    for token, tf in Counter(tokens).items():
+        idx, sign = _bucket(token, dim)
+        vec[idx] += sign * (1.0 + math.log(tf))
+    for skill in skills:
+        # Whole skill phrase plus its tokens, so "react native" also matches "react".
+        for token in {skill, *tokenize(skill)}:
+            idx, sign = _bucket(token, dim)
+            vec[idx] += sign * SKILL_WEIGHT
+    norm = float(np.linalg.norm(vec))
+    if norm > 0:
+        vec /= norm
+    return vec
+
+
+def candidate_features(profile: Dict[str, Any], cv_terms: Optional[List[str]] = None) -> Tuple[List[str], List[str]]:
+    """Tokens and normalized skills for a candidate profile plus condensed CV terms."""
+    text = " ".join(str(profile.get(k) or "") for k in ("headline", "summary", "location"))
+    return tokenize(text) + list(cv_terms or []), skill_set(profile.get("skills"))
+
+
+def job_features(job: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    text = " ".join(str(job.get(k) or "") for k in ("title", "description", "location", "seniority"))
+    return tokenize(text), skill_set(job.get("skills"))
+
+
+def embed_candidate(profile: Dict[str, Any], cv_terms: Optional[List[str]] = None, dim: int = DEFAULT_DIM) -> np.ndarray:
+    tokens, skills = candidate_features(profile, cv_terms)
+    return embed_tokens(tokens, skills, dim)
+
+
+def embed_job(job: Dict[str, Any], dim: int = DEFAULT_DIM) -> np.ndarray:
+    tokens, skills = job_features(job)
+    return embed_tokens(tokens, skills, dim)
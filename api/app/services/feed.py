@@ -0,0 +1,73 @@
+# api\app\services\feed.py
+"""
+Public post feed with keyset pagination and a shared first-page cache.
+
+Pages are ordered by (created_at, id) descending and continue from an opaque cursor holding the
+last row's sort key, so loading page N is an index range scan instead of an OFFSET scan. The
+first page is what nearly every reader asks for; it is cached in process for FEED_CACHE_SECONDS
+and dropped whenever this instance creates or moderates a post. The feed only contains public,
+visible posts, so the same cached page is valid for every caller.
+"""
+import base64
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import get_settings
+from ..dependencies import Client
+from .cache import TTLCache
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@lru_cache
+def _first_pages() -> TTLCache:
+    return TTLCache(ttl_seconds=get_settings().feed_cache_seconds, maxsize=64)
+
+
+def invalidate_feed() -> None:
+    _first_pages().clear()
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    raw = json.dumps([row.get("created_at"), row.get("id")], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+    if not isinstance(created_at, str) or not isinstance(post_id, str):
+        raise InvalidCursor("Invalid cursor")
+    return created_at, post_id
+
+
+def _quote(value: str) -> str:
+    # Timestamps contain ':' '.' and '+', which PostgREST only reads literally inside quotes.
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def load_feed_page(client: Client, cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of the public feed and the cursor for the next page (None on the last page)."""
+    cache = _first_pages()
+    if cursor is None:
+        cached = cache.get(limit)
+        if cached is not None:
+            return cached
+
+    query = client.table("posts").select("*").eq("visibility", "public").eq("status", "visible")
+    if cursor is not None:
+        created_at, post_id = decode_cursor(cursor)
+        query = query.or_(
+            f"created_at.lt.{_quote(created_at)},and(created_at.eq.{_quote(created_at)},id.lt.{_quote(post_id)})"
+        )
+    rows = query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute().data or []
+    next_cursor = encode_cursor(rows[-1]) if len(rows) == limit else None
+
+    if cursor is None:
+        cache.set(limit, (rows, next_cursor))
+    return rows, next_cursor
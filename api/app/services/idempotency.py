@@ -0,0 +1,138 @@
+# api\app\services\idempotency.py
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+
+from ..config import Settings, get_settings
+from ..dependencies import supabase_service_client
+from .cache import TTLCache
+from .singleflight import SingleFlight
+
+
+class IdempotencyStore:
+    """
+    Response cache for requests carrying an Idempotency-Key header.
+
+    The first request with a key runs the handler and stores its JSON result (in memory and in
+    public.idempotency_keys so other instances see it); retries within the TTL get the stored
+    result without re-running the pipeline. A retry that arrives while the first request is still
+    running waits for it instead of starting a second one. Only successful results are stored, so
+    a request that failed can be retried with the same key.
+
+    A hash of the request payload is stored with the key; reusing a key with a different payload
+    is rejected with 422 rather than replaying another request's result. Expired rows are purged
+    from the table at most every IDEMPOTENCY_PURGE_INTERVAL_SECONDS, from the save path.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.ttl_seconds = settings.idempotency_ttl_seconds
+        self._memory = TTLCache(ttl_seconds=self.ttl_seconds, maxsize=10_000)
+        self._flight = SingleFlight()
+        self.purge_interval_seconds = settings.idempotency_purge_interval_seconds
+        self._last_purge = float("-inf")
+
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[Tuple[Optional[str], Any]]:
+        """(request hash, stored response) for a live key, or None."""
+        cached = self._memory.get(key)
+        if cached is not None:
+            return cached
+        try:
+            rows = (
+                supabase_service_client(self.settings)
+                .table("idempotency_keys")
+                .select("request_hash,response")
+                .eq("key", key)
+                .gt("expires_at", datetime.utcnow().isoformat())
+                .limit(1)
+                .execute()
+                .data
+            )
+        except Exception as exc:
+            # Table missing or DB hiccup: fall back to the in-memory cache only.
+            print("Idempotency lookup failed:", exc)
+            return None
+        if not rows:
+            return None
+        entry = (rows[0].get("request_hash"), rows[0]["response"])
+        self._memory.set(key, entry)
+        return entry
+
+    def _save(self, key: str, request_hash: str, result: Any) -> None:
+        self._memory.set(key, (request_hash, result))
+        svc = supabase_service_client(self.settings)
+        try:
+            svc.table("idempotency_keys").upsert(
+                {
+                    "key": key,
+                    "request_hash": request_hash,
+                    "response": result,
+                    "expires_at": (datetime.utcnow() + timedelta(seconds=self.ttl_seconds)).isoformat(),
+                }
+            ).execute()
+        except Exception as exc:
+            print("Idempotency save failed:", exc)
+        self._maybe_purge(svc)
+
+    def _maybe_purge(self, svc) -> None:
+        now = time.monotonic()
+        if now - self._last_purge < self.purge_interval_seconds:
+            return
+        self._last_purge = now
+        try:
+            # Backed by idx_idempotency_keys_expires_at; return=minimal so nothing comes back.
+            svc.table("idempotency_keys").delete(returning="minimal").lt(
+                "expires_at", datetime.utcnow().isoformat()
+            ).execute()
+        except Exception as exc:
+            print("Idempotency purge failed:", exc)
+
+    async def run(
+        self,
+        idempotency_key: Optional[str],
+        scope: str,
+        user_id: str,
+        fn: Callable[[], Awaitable[Any]],
+        response: Response,
+        payload: Any = None,
+    ) -> Any:
+        """`payload` is whatever identifies the request beyond the scope (body, ids); it's hashed."""
+        if not idempotency_key:
+            return await fn()
+        key = f"{user_id}:{scope}:{idempotency_key}"
+        request_hash = self.fingerprint(payload)
+        cached = await anyio.to_thread.run_sync(self._lookup, key)
+        if cached is not None:
+            stored_hash, stored = cached
+            # Rows written before request hashes were stored have none; they can only replay.
+            if stored_hash is not None and stored_hash != request_hash:
+                raise HTTPException(
+                    status_code=422, detail="Idempotency-Key was already used with a different request body"
+                )
+            response.headers["Idempotent-Replayed"] = "true"
+            return stored
+
+        async def execute() -> Any:
+            result = jsonable_encoder(await fn())
+            await anyio.to_thread.run_sync(self._save, key, request_hash, result)
+            return result
+
+        # Concurrent requests only share a run when their payloads match too.
+        return await self._flight.do(f"{key}:{request_hash}", execute)
+
+
+@lru_cache
+def get_idempotency_store() -> IdempotencyStore:
+    return IdempotencyStore(get_settings())
@@ -0,0 +1,151 @@
+# api\app\services\job_import.py
+"""
+Bulk job import from CSV or JSONL uploads.
+
+Rows are read one at a time from the upload's spooled file, validated as JobCreate and inserted
+in batches, so memory stays flat however large the file is. A batch the database rejects is
+retried row by row to pin the error on the rows that caused it; every failure is reported with
+its line number instead of aborting the whole import.
+"""
+import codecs
+import csv
+import json
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+from pydantic import ValidationError
+
+from ..dependencies import Client
+from ..schemas import JobCreate
+
+# Errors beyond this many are counted but not listed in the response.
+MAX_REPORTED_ERRORS = 200
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    name = (filename or "").lower()
+    ctype = (content_type or "").lower()
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in ctype or "jsonl" in ctype:
+        return "jsonl"
+    if name.endswith(".csv") or "csv" in ctype:
+        return "csv"
+    raise ImportFormatError("Cannot tell the file format; upload a .csv or .jsonl file or pass format=csv|jsonl")
+
+
+def _split_skills(value: Any) -> List[Any]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        # CSV cells: "Python; SQL; AWS" (commas would clash with the CSV delimiter in spreadsheets).
+        parts = value.replace("|", ";").split(";") if (";" in value or "|" in value) else value.split(",")
+        return [{"skill": p.strip()} for p in parts if p.strip()]
+    return [{"skill": s} if isinstance(s, str) else s for s in value]
+
+
+def _iter_csv(stream) -> Iterator[Tuple[int, Any]]:
+    reader = csv.DictReader(stream)
+    for record in reader:
+        # Blank cells mean "not set", so JobCreate defaults apply instead of failing on "".
+        row = {k.strip().lower(): (v.strip() if isinstance(v, str) else v) for k, v in record.items() if k}
+        yield reader.line_num, {k: v for k, v in row.items() if v not in ("", None)}
+
+
+def _iter_jsonl(stream) -> Iterator[Tuple[int, Any]]:
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, exc
+
+
+def iter_rows(fileobj: BinaryIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """(line number, row dict) pairs; a row that can't be parsed is yielded as the exception."""
+    stream = codecs.getreader("utf-8-sig")(fileobj, errors="replace")
+    if fmt == "csv":
+        # csv wants newline-preserving lines; StreamReader iterates them lazily.
+        return _iter_csv(stream)
+    if fmt == "jsonl":
+        return _iter_jsonl(stream)
+    raise ImportFormatError(f"Unsupported format {fmt!r}; use csv or jsonl")
+
+
+class JobImporter:
+    def __init__(
+        self,
+        client: Client,
+        recruiter_id: Optional[str],
+        batch_size: int,
+        max_rows: int,
+        extract_skills: Optional[Callable[[str], Dict[str, Any]]] = None,
+    ):
+        self.client = client
+        self.recruiter_id = recruiter_id
+        self.batch_size = max(1, batch_size)
+        self.max_rows = max_rows
+        self.extract_skills = extract_skills
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def _error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line, "error": message})
+
+    def _prepare(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(raw)
+        row["skills"] = _split_skills(row.get("skills"))
+        if self.extract_skills and row.get("description") and (not row["skills"] or not row.get("title")):
+            guessed = self.extract_skills(row["description"])
+            row.setdefault("title", guessed["title"])
+            if not row["skills"]:
+                row["skills"] = [{"skill": s} for s in guessed["skills"]]
+        data = JobCreate.model_validate(row).model_dump()
+        data["recruiter_id"] = self.recruiter_id
+        return data
+
+    def _insert(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        if not batch:
+            return
+        try:
+            self.client.table("jobs").insert([data for _, data in batch], returning="minimal").execute()
+            self.inserted += len(batch)
+            return
+        except APIError as exc:
+            if len(batch) == 1:
+                self._error(batch[0][0], exc.message or str(exc))
+                return
+        for item in batch:
+            self._insert([item])
+
+    def run(self, rows: Iterator[Tuple[int, Any]]) -> Dict[str, Any]:
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        seen = 0
+        for line, raw in rows:
+            seen += 1
+            if seen > self.max_rows:
+                self._error(line, f"Row limit of {self.max_rows} reached; remaining rows were not imported")
+                break
+            if isinstance(raw, Exception):
+                self._error(line, f"Invalid JSON: {raw}")
+                continue
+            if not isinstance(raw, dict):
+                self._error(line, "Expected a JSON object")
+                continue
+            try:
+                batch.append((line, self._prepare(raw)))
+            except ValidationError as exc:
+                self._error(line, "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()))
+                continue
+            if len(batch) >= self.batch_size:
+                self._insert(batch)
+                batch = []
+        self._insert(batch)
+        return {"inserted": self.inserted, "failed": self.failed, "errors": self.errors}
@@ -0,0 +1,70 @@
+# api\app\services\match_history.py
+import asyncio
+from functools import lru_cache
+
+import anyio
+from postgrest.exceptions import APIError
+
+from ..config import Settings, get_settings
+from ..dependencies import supabase_service_client
+
+
+class MatchHistoryPruner:
+    """
+    Keeps public.match_history inside MATCH_HISTORY_RETENTION_DAYS.
+
+    public.matches holds only the latest score per (job, candidate); every scoring run is also
+    appended to match_history by a trigger, so the history is the only table that grows. Old rows
+    are deleted by the prune_match_history() RPC in batches, each its own short transaction, until
+    a batch comes back short.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.retention_days = settings.match_history_retention_days
+        self.batch_size = settings.match_history_prune_batch_size
+        self.interval_seconds = settings.match_history_prune_interval_seconds
+        self._stopped = False
+
+    def prune_once(self, max_batches: int = 100) -> int:
+        """Delete expired history rows, at most `max_batches` batches. Returns the number deleted."""
+        svc = supabase_service_client(self.settings)
+        total = 0
+        for _ in range(max_batches):
+            try:
+                deleted = (
+                    svc.rpc(
+                        "prune_match_history",
+                        {"p_retention_days": self.retention_days, "p_batch_size": self.batch_size},
+                    )
+                    .execute()
+                    .data
+                    or 0
+                )
+            except APIError as exc:
+                # RPC missing means schema.sql (and match_history with it) isn't applied yet.
+                print("prune_match_history RPC failed:", exc)
+                break
+            total += int(deleted)
+            if deleted < self.batch_size:
+                break
+        return total
+
+    async def run(self) -> None:
+        """Background loop: prune, then sleep for the prune interval."""
+        while not self._stopped:
+            try:
+                deleted = await anyio.to_thread.run_sync(self.prune_once)
+                if deleted:
+                    print(f"Pruned {deleted} match_history rows older than {self.retention_days} days")
+            except Exception as exc:
+                print("Match history prune failed:", exc)
+            await asyncio.sleep(self.interval_seconds)
+
+    def stop(self) -> None:
+        self._stopped = True
+
+
+@lru_cache
+def get_match_history_pruner() -> MatchHistoryPruner:
+    return MatchHistoryPruner(get_settings())
@@ -1,26 +1,12 @@
 # api\app\services\matching.py
-import json
+from contextlib import nullcontext
 from typing import Any, Dict, Optional
 
-import anyio
-import google.generativeai as genai
-from supabase import Client
-
 from ..config import Settings
-
-
-def _strip_code_fences(text: str) -> str:
-    """
-    Gemini sometimes wraps JSON in ```json ... ``` fences.
-    This removes them if present.
-    """
-    text = text.strip()
-    if text.startswith("```"):
-        lines = text.splitlines()[1:]
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        return "\n".join(lines).strip()
-    return text
+from ..dependencies import Client
+from ..schemas import AuthUser
+from .admission import get_admission_controller
+from .scorers import get_scorer_backend
 
 
 def build_candidate_payload(profile: Dict[str, Any], cv_text: Optional[str]) -> Dict[str, Any]:
@@ -41,53 +27,61 @@ def build_candidate_payload(profile: Dict[str, Any], cv_text: Optional[str]) ->
 
 class MatchingService:
     """
-    Wrapper around Gemini for:
+    Model-agnostic facade for:
     - Improving job descriptions
+    - Suggesting candidate profiles from CVs
     - Scoring candidates against jobs
+
+    The model itself is a ScorerBackend chosen by settings.scorer_backend (gemini, local, fake);
+    this class normalizes whatever the backend returns. Every model call is admitted by the
+    AdmissionController on behalf of `user` (each attempt, when a backend retries) and may raise
+    RateLimited.
     """
 
-    def __init__(self, settings: Settings, supabase: Client):
+    def __init__(self, settings: Settings, supabase: Client, user: Optional[AuthUser] = None):
         self.supabase = supabase
-        genai.configure(api_key=settings.gemini_api_key)
-        # Use a model available in your current SDK (see genai.list_models()).
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
-
-    def _generate(self, prompt: str) -> str:
-        response = self.model.generate_content(prompt)
-        return response.text
-
-    async def _generate_json(self, prompt: str) -> Dict[str, Any]:
-        text = await anyio.to_thread.run_sync(self._generate, prompt)
-        cleaned = _strip_code_fences(text)
-        try:
-            return json.loads(cleaned)
-        except json.JSONDecodeError:
-            return {}
+        self.backend = get_scorer_backend(settings)
+        self.user = user
+        self._prepaid = 0
+        self._in_batch = False
+
+    def _admit(self, retry: bool = False):
+        if not self.backend.rate_limited:
+            return nullcontext()
+        controller = get_admission_controller()
+        user_id = self.user.user_id if self.user else None
+        prepaid = False
+        if self._in_batch:
+            if retry:
+                # A retry belongs to a call the batch already admitted: bill it, don't refuse it,
+                # and leave the prepaid tokens for the applications still to come.
+                controller.charge(user_id)
+                prepaid = True
+            elif self._prepaid > 0:
+                self._prepaid -= 1
+                prepaid = True
+        return controller.admit(user_id, self.user.role if self.user else None, prepaid=prepaid)
+
+    def reserve(self, calls: int) -> None:
+        """
+        Charge the next `calls` model calls to the user's rate limit up front, so a batch is
+        refused before it starts rather than partway through. Raises RateLimited.
+        """
+        if not self.backend.rate_limited:
+            return
+        get_admission_controller().reserve(self.user.user_id if self.user else None, calls)
+        self._prepaid += calls
+        self._in_batch = True
+
+    def release_reservation(self) -> None:
+        """Refund reserved calls that weren't made (shared with another request, or the batch failed)."""
+        if self._prepaid > 0:
+            get_admission_controller().refund(self.user.user_id if self.user else None, self._prepaid)
+        self._prepaid = 0
+        self._in_batch = False
 
     async def improve_job_description(self, jd_text: str) -> Dict[str, Any]:
-        prompt = f"""
-You are an expert technical recruiter.
-
-You will receive a raw job description. Your job is to:
-1. Clean and improve the description for clarity, structure, and attractiveness.
-2. Extract MUST-HAVE skills (core requirements).
-3. Extract NICE-TO-HAVE skills (bonuses, optional).
-
-Return ONLY valid JSON with this exact structure:
-
-{{
-  "description": "Improved job description as a single long string...",
-  "must_have": ["skill1", "skill2", "..."],
-  "nice_to_have": ["skillA", "skillB", "..."]
-}}
-
-Do not include any explanatory text outside the JSON.
-Here is the raw job description:
-
-\"\"\"{jd_text}\"\"\"        
-        """.strip()
-
-        data = await self._generate_json(prompt)
+        data = await self.backend.improve_job_description(jd_text, admit=self._admit)
         return {
             "description": data.get("description", jd_text),
             "must_have": data.get("must_have") or [],
@@ -98,21 +92,7 @@ Here is the raw job description:
         """
         Generate candidate profile suggestions (headline, summary, skills, links) from CV text.
         """
-        prompt = f"""
-You are a career coach helping a candidate set up a concise profile from their CV.
-
-Return ONLY valid JSON:
-{{
-  "headline": "Short role/title headline",
-  "summary": "2-4 sentence summary highlighting strengths",
-  "skills": ["skill1","skill2", "..."],
-  "links": ["https://example.com/portfolio", "..."]
-}}
-
-CV TEXT:
-\"\"\"{cv_text[:6000]}\"\"\"
-""".strip()
-        data = await self._generate_json(prompt)
+        data = await self.backend.suggest_profile_from_cv(cv_text, admit=self._admit)
         return {
             "headline": data.get("headline"),
             "summary": data.get("summary"),
@@ -125,56 +105,7 @@ CV TEXT:
         job: Dict[str, Any],
         candidate: Dict[str, Any],
     ) -> Dict[str, Any]:
-        job_title = job.get("title") or "Role"
-        job_desc = job.get("description") or ""
-        job_skills = job.get("skills") or []
-
-        cand_headline = candidate.get("headline") or ""
-        cand_location = candidate.get("location") or ""
-        cand_remote_pref = candidate.get("remote_pref") or ""
-        cand_summary = candidate.get("summary") or ""
-        cand_skills = candidate.get("skills") or []
-        cand_links = candidate.get("links") or []
-        cand_cv_text = candidate.get("cv_text") or ""
-
-        prompt = f"""
-You are an AI assistant helping a recruiter decide how well a candidate fits a job.
-
-You will receive a job and a candidate profile (including parsed CV text).
-You must evaluate the match and respond ONLY with valid JSON in this structure:
-
-{{
-  "score": 0-100 as a number,
-  "band": "poor" | "ok" | "strong" | "excellent",
-  "matched_skills": ["..."],
-  "missing_skills": ["..."],
-  "rationale": "Short explanation in 3–6 sentences."
-}}
-
-Give higher scores when the candidate clearly matches most of the core skills and responsibilities.
-
-JOB:
-- Title: {job_title}
-- Description:
-{job_desc}
-
-- Explicit job skills (may be empty): {job_skills}
-
-CANDIDATE:
-- Headline: {cand_headline}
-- Location: {cand_location}
-- Remote preference: {cand_remote_pref}
-- Summary:
-{cand_summary}
-
-- Declared skills: {cand_skills}
-- Links: {cand_links}
-
-- CV Text:
-\"\"\"{cand_cv_text}\"\"\"        
-        """.strip()
-
-        data = await self._generate_json(prompt)
+        data = await self.backend.score_candidate_for_job(job, candidate, admit=self._admit)
 
         score = float(data.get("score") or 0.0)
         band = data.get("band") or None
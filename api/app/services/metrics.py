@@ -0,0 +1,174 @@
+# api\app\services\metrics.py
+"""
+In-process latency metrics, rendered in the Prometheus text format on /metrics.
+
+Two families are tracked: `http_request_duration_seconds` per (method, route template, status
+class) recorded by MetricsMiddleware, and `dependency_duration_seconds` per (dependency,
+operation) recorded around PostgREST calls, scorer calls, the auth upserts and document parsing.
+Each series keeps a cumulative histogram, a call count and an error count. Metrics are per
+process; with several workers each one exposes its own.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Upper bounds in seconds; covers ~1ms PostgREST reads up to multi-second Gemini calls.
+BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Series:
+    __slots__ = ("buckets", "count", "total", "errors")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool) -> None:
+        self.count += 1
+        self.total += seconds
+        if error:
+            self.errors += 1
+        for i, upper in enumerate(BUCKETS):
+            if seconds <= upper:
+                self.buckets[i] += 1
+                break
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._families: Dict[str, Dict[Tuple[Tuple[str, str], ...], _Series]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, family: str, help_text: str) -> None:
+        self._help[family] = help_text
+
+    def observe(self, family: str, labels: Dict[str, str], seconds: float, error: bool = False) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._families.setdefault(family, {}).get(key)
+            if series is None:
+                series = self._families[family][key] = _Series()
+            series.observe(seconds, error)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._families.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            snapshot = {
+                family: {key: (list(s.buckets), s.count, s.total, s.errors) for key, s in series.items()}
+                for family, series in self._families.items()
+            }
+        for family in sorted(snapshot):
+            lines.append(f"# HELP {family} {self._help.get(family, family)}")
+            lines.append(f"# TYPE {family} histogram")
+            errors_family = family.replace("_duration_seconds", "") + "_errors_total"
+            errors_lines = []
+            for key, (buckets, count, total, errors) in sorted(snapshot[family].items()):
+                labels = ",".join(f'{k}="{_escape(v)}"' for k, v in key)
+                cumulative = 0
+                for upper, n in zip(BUCKETS, buckets):
+                    cumulative += n
+                    lines.append(f'{family}_bucket{{{labels},le="{upper}"}} {cumulative}')
+                lines.append(f'{family}_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f"{family}_sum{{{labels}}} {total:.6f}")
+                lines.append(f"{family}_count{{{labels}}} {count}")
+                errors_lines.append(f"{errors_family}{{{labels}}} {errors}")
+            lines.append(f"# TYPE {errors_family} counter")
+            lines.extend(errors_lines)
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+_registry.describe("http_request_duration_seconds", "HTTP request latency by route template.")
+_registry.describe("dependency_duration_seconds", "Latency of calls to Supabase, the scorer and parsers.")
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+def observe_request(method: str, route: str, status_code: int, seconds: float) -> None:
+    _registry.observe(
+        "http_request_duration_seconds",
+        {"method": method, "route": route, "status": f"{status_code // 100}xx"},
+        seconds,
+        error=status_code >= 500,
+    )
+
+
+@contextmanager
+def track_dependency(dependency: str, operation: str) -> Iterator[None]:
+    """Time a block as one call to `dependency`; an exception counts as an error and is re-raised."""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _registry.observe(
+            "dependency_duration_seconds",
+            {"dependency": dependency, "operation": operation},
+            time.perf_counter() - start,
+            error=error,
+        )
+
+
+def instrumented(dependency: str, operation: str) -> Callable:
+    """Decorator form of track_dependency for plain (sync) functions."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track_dependency(dependency, operation):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+_postgrest_patched = False
+
+
+def instrument_postgrest() -> None:
+    """
+    Time every PostgREST call made through supabase-py. The sync request builders all funnel into
+    a handful of execute() methods; they are wrapped once per process, labelled by HTTP method and
+    table (or rpc/<name>), like the httpx patch in dependencies.py.
+    """
+    global _postgrest_patched
+    if _postgrest_patched:
+        return
+    from postgrest._sync import request_builder as rb
+
+    def wrap(cls) -> None:
+        original = cls.execute
+
+        @functools.wraps(original)
+        def execute(self, *args, **kwargs):
+            with track_dependency("postgrest", f"{self.http_method} {self.path.lstrip('/')}"):
+                return original(self, *args, **kwargs)
+
+        cls.execute = execute
+
+    # Subclasses (select/filter/rpc builders) inherit these; MaybeSingle overrides execute and
+    # calls its parent's, so it is covered through SyncSingleRequestBuilder.
+    for cls in (rb.SyncQueryRequestBuilder, rb.SyncSingleRequestBuilder, getattr(rb, "SyncExplainRequestBuilder", None)):
+        if cls is not None and "execute" in vars(cls):
+            wrap(cls)
+    _postgrest_patched = True
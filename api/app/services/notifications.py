@@ -0,0 +1,64 @@
+# api\app\services\notifications.py
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+
+class NotificationBroker:
+    """
+    In-process pub/sub for pushing notifications to connected clients (SSE streams).
+    Each subscriber gets a bounded queue; publishers never block, and a slow consumer
+    only drops its own events (it can resync through GET /notifications).
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(user_id, []).append((loop, queue))
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subs = [s for s in self._subscribers.get(user_id, []) if s[1] is not queue]
+            if subs:
+                self._subscribers[user_id] = subs
+            else:
+                self._subscribers.pop(user_id, None)
+
+    def subscriber_count(self, user_id: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(user_id, []))
+
+    def publish(self, user_id: str, event: Dict[str, Any]) -> int:
+        """
+        Deliver an event to every open stream of a user. Safe to call from worker threads.
+        Returns the number of streams the event was handed to.
+        """
+        with self._lock:
+            subs = list(self._subscribers.get(user_id, []))
+        for loop, queue in subs:
+            try:
+                loop.call_soon_threadsafe(_put_nowait, queue, event)
+            except RuntimeError:
+                # Loop already closed; the stream is gone and will unsubscribe itself.
+                continue
+        return len(subs)
+
+
+def _put_nowait(queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        pass
+
+
+@lru_cache
+def get_notification_broker() -> NotificationBroker:
+    return NotificationBroker()
@@ -0,0 +1,186 @@
+# api\app\services\outbox.py
+import asyncio
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import anyio
+from postgrest.exceptions import APIError
+
+from ..config import Settings, get_settings
+from ..dependencies import supabase_service_client
+from .notifications import get_notification_broker
+
+
+class OutboxDispatcher:
+    """
+    Drains public.notification_outbox into public.notifications.
+
+    Outbox rows are written by a trigger in the same transaction as the application insert, so an
+    event exists if and only if the application does. The dispatcher turns pending rows into
+    notifications in batches; notifications carry a unique outbox_id, so a batch that is retried
+    after a partial failure never produces duplicates.
+
+    An event that fails OUTBOX_MAX_ATTEMPTS times is marked dead_at and logged instead of being
+    retried forever. Processed and dead rows are deleted after OUTBOX_RETENTION_DAYS by the
+    prune_notification_outbox() RPC, from the same loop.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.batch_size = settings.outbox_batch_size
+        self.max_attempts = settings.outbox_max_attempts
+        self.poll_seconds = settings.outbox_poll_seconds
+        self.retention_days = settings.outbox_retention_days
+        self.prune_batch_size = settings.outbox_prune_batch_size
+        self.prune_interval_seconds = settings.outbox_prune_interval_seconds
+        self._last_prune = float("-inf")
+        self._stopped = False
+
+    def dispatch_once(self) -> int:
+        """Process one batch of pending events. Returns the number of events handled."""
+        svc = supabase_service_client(self.settings)
+        now = datetime.utcnow()
+        rows = (
+            svc.table("notification_outbox")
+            .select("*")
+            .is_("processed_at", "null")
+            .is_("dead_at", "null")
+            .lt("attempts", self.max_attempts)
+            .lte("available_at", now.isoformat())
+            .order("created_at")
+            .limit(self.batch_size)
+            .execute()
+            .data
+            or []
+        )
+        if not rows:
+            return 0
+        try:
+            notifications = self._build_notifications(svc, rows)
+            if notifications:
+                inserted = (
+                    svc.table("notifications")
+                    .upsert(notifications, on_conflict="outbox_id", ignore_duplicates=True)
+                    .execute()
+                    .data
+                    or []
+                )
+                broker = get_notification_broker()
+                for notif in inserted:
+                    broker.publish(notif["user_id"], notif)
+            svc.table("notification_outbox").update({"processed_at": datetime.utcnow().isoformat()}).in_(
+                "id", [r["id"] for r in rows]
+            ).execute()
+        except Exception as exc:
+            print("Outbox dispatch failed, scheduling retry:", exc)
+            self._schedule_retry(svc, rows, exc)
+            return 0
+        return len(rows)
+
+    def _build_notifications(self, svc, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        job_ids = list({(r.get("payload") or {}).get("job_id") for r in rows} - {None})
+        jobs = (
+            svc.table("jobs").select("id,title,recruiter_id").in_("id", job_ids).execute().data or []
+            if job_ids
+            else []
+        )
+        job_map = {j["id"]: j for j in jobs}
+        notifications = []
+        for row in rows:
+            payload = row.get("payload") or {}
+            if row.get("event_type") != "new_application":
+                continue
+            job = job_map.get(payload.get("job_id"))
+            recruiter_id = job.get("recruiter_id") if job else None
+            if not recruiter_id:
+                # Nobody to notify (e.g. seeded jobs without an owner); the event is still consumed.
+                continue
+            notifications.append(
+                {
+                    "user_id": recruiter_id,
+                    "type": "new_application",
+                    "outbox_id": row["id"],
+                    "data": {
+                        "job_id": payload.get("job_id"),
+                        "job_title": job.get("title"),
+                        "candidate_id": payload.get("candidate_id"),
+                        "application_id": payload.get("application_id"),
+                    },
+                }
+            )
+        return notifications
+
+    def _schedule_retry(self, svc, rows: List[Dict[str, Any]], exc: Exception) -> None:
+        for row in rows:
+            attempts = int(row.get("attempts") or 0) + 1
+            delay = min(2**attempts * self.poll_seconds, 300)
+            update = {
+                "attempts": attempts,
+                "available_at": (datetime.utcnow() + timedelta(seconds=delay)).isoformat(),
+                "last_error": str(exc)[:500],
+            }
+            if attempts >= self.max_attempts:
+                print(f"Outbox event {row['id']} ({row.get('event_type')}) dead after {attempts} attempts:", exc)
+                update["dead_at"] = datetime.utcnow().isoformat()
+            try:
+                svc.table("notification_outbox").update(update).eq("id", row["id"]).execute()
+            except Exception as update_exc:
+                # Row stays pending with its old attempt count and is picked up on the next poll.
+                print("Could not record outbox retry:", update_exc)
+
+    def prune_once(self, max_batches: int = 100) -> int:
+        """Delete processed and dead rows past retention, at most `max_batches` batches."""
+        svc = supabase_service_client(self.settings)
+        total = 0
+        for _ in range(max_batches):
+            try:
+                deleted = (
+                    svc.rpc(
+                        "prune_notification_outbox",
+                        {"p_retention_days": self.retention_days, "p_batch_size": self.prune_batch_size},
+                    )
+                    .execute()
+                    .data
+                    or 0
+                )
+            except APIError as exc:
+                print("prune_notification_outbox RPC failed:", exc)
+                break
+            total += int(deleted)
+            if deleted < self.prune_batch_size:
+                break
+        return total
+
+    async def _maybe_prune(self) -> None:
+        now = time.monotonic()
+        if self.prune_interval_seconds <= 0 or now - self._last_prune < self.prune_interval_seconds:
+            return
+        self._last_prune = now
+        try:
+            deleted = await anyio.to_thread.run_sync(self.prune_once)
+            if deleted:
+                print(f"Pruned {deleted} notification_outbox rows older than {self.retention_days} days")
+        except Exception as exc:
+            print("Outbox prune failed:", exc)
+
+    async def run(self) -> None:
+        """Background loop: drain the outbox, prune old rows when due, then sleep until the next poll."""
+        while not self._stopped:
+            try:
+                handled = await anyio.to_thread.run_sync(self.dispatch_once)
+            except Exception as exc:
+                print("Outbox poll failed:", exc)
+                handled = 0
+            await self._maybe_prune()
+            if handled < self.batch_size:
+                await asyncio.sleep(self.poll_seconds)
+
+    def stop(self) -> None:
+        self._stopped = True
+
+
+@lru_cache
+def get_outbox_dispatcher() -> OutboxDispatcher:
+    return OutboxDispatcher(get_settings())
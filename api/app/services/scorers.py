@@ -0,0 +1,349 @@
+# api\app\services\scorers.py
+import hashlib
+import json
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, Callable, Dict, List, Literal, Optional, Type
+
+import anyio
+from pydantic import BaseModel, Field, ValidationError
+
+from ..config import Settings
+from .embeddings import condense_text, embed_candidate, embed_job, skill_set, split_skills, tokenize
+from .metrics import track_dependency
+
+
+def _strip_code_fences(text: str) -> str:
+    """
+    Gemini sometimes wraps JSON in ```json ... ``` fences.
+    This removes them if present.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        lines = text.splitlines()[1:]
+        if lines and lines[-1].strip() == "```":
+            lines = lines[:-1]
+        return "\n".join(lines).strip()
+    return text
+
+
+# Returns the context to hold around one model request: MatchingService passes its admission.
+# Called with retry=True for a reply-validation retry of the same request.
+Admit = Callable[..., AsyncContextManager[Any]]
+
+
+def _unadmitted(retry: bool = False) -> AsyncContextManager[Any]:
+    return nullcontext()
+
+
+class ScorerBackend(ABC):
+    """
+    What MatchingService needs from a model. Implementations return raw dicts; MatchingService
+    normalizes them (defaults, score clamping), so backends can be loose about missing keys.
+    Rate-limited backends enter `admit(retry=...)` around every request they send, retries included.
+    """
+
+    name = "base"
+    # Whether calls go through admission control (services/admission.py); off for in-process scorers.
+    rate_limited = True
+
+    @abstractmethod
+    async def improve_job_description(self, jd_text: str, admit: Admit = _unadmitted) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def suggest_profile_from_cv(self, cv_text: str, admit: Admit = _unadmitted) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def score_candidate_for_job(
+        self, job: Dict[str, Any], candidate: Dict[str, Any], admit: Admit = _unadmitted
+    ) -> Dict[str, Any]:
+        ...
+
+
+class ScorerReplyError(ValueError):
+    """The model kept returning replies that don't match the expected schema."""
+
+
+class _JobDescriptionReply(BaseModel):
+    description: str = Field(min_length=1)
+    must_have: List[str] = Field(default_factory=list)
+    nice_to_have: List[str] = Field(default_factory=list)
+
+
+class _ProfileReply(BaseModel):
+    headline: Optional[str] = None
+    summary: Optional[str] = None
+    skills: List[str] = Field(default_factory=list)
+    links: List[str] = Field(default_factory=list)
+
+
+class _ScoreReply(BaseModel):
+    score: float = Field(ge=0, le=100)
+    band: Literal["poor", "ok", "strong", "excellent"]
+    matched_skills: List[str] = Field(default_factory=list)
+    missing_skills: List[str] = Field(default_factory=list)
+    rationale: str = Field(min_length=1)
+
+
+# Gemini response schemas (OpenAPI subset: no min/max, so the pydantic models above add the bounds).
+_STRINGS = {"type": "array", "items": {"type": "string"}}
+_JOB_DESCRIPTION_SCHEMA = {
+    "type": "object",
+    "properties": {"description": {"type": "string"}, "must_have": _STRINGS, "nice_to_have": _STRINGS},
+    "required": ["description", "must_have", "nice_to_have"],
+}
+_PROFILE_SCHEMA = {
+    "type": "object",
+    "properties": {"headline": {"type": "string"}, "summary": {"type": "string"}, "skills": _STRINGS, "links": _STRINGS},
+    "required": ["headline", "summary", "skills"],
+}
+_SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "description": "0-100"},
+        "band": {"type": "string", "enum": ["poor", "ok", "strong", "excellent"]},
+        "matched_skills": _STRINGS,
+        "missing_skills": _STRINGS,
+        "rationale": {"type": "string", "description": "3-6 sentences"},
+    },
+    "required": ["score", "band", "matched_skills", "missing_skills", "rationale"],
+}
+
+
+def _listing(values: Any) -> str:
+    if isinstance(values, (list, tuple)):
+        return ", ".join(str(v.get("skill", v)) if isinstance(v, dict) else str(v) for v in values)
+    return str(values or "")
+
+
+class GeminiScorer(ScorerBackend):
+    """
+    Prompts Gemini in JSON mode with a response schema, so prompts don't spend tokens describing
+    the output format. Replies are validated with pydantic; an invalid reply is retried up to
+    GEMINI_REPLY_RETRIES times and then raises ScorerReplyError instead of passing on empty data.
+    Each attempt is admitted separately, so retries are paid for like any other call.
+    """
+
+    name = "gemini"
+
+    def __init__(self, settings: Settings):
+        import google.generativeai as genai
+
+        genai.configure(api_key=settings.gemini_api_key)
+        # Use a model available in your current SDK (see genai.list_models()).
+        self.model = genai.GenerativeModel(settings.gemini_model)
+        self.reply_retries = settings.gemini_reply_retries
+
+    def _generate(self, prompt: str, schema: Dict[str, Any]) -> str:
+        response = self.model.generate_content(
+            prompt,
+            generation_config={"response_mime_type": "application/json", "response_schema": schema},
+        )
+        return response.text
+
+    def _timed_generate(self, prompt: str, schema: Dict[str, Any]) -> str:
+        with track_dependency("scorer", self.name):
+            return self._generate(prompt, schema)
+
+    async def _generate_json(
+        self, prompt: str, reply_model: Type[BaseModel], schema: Dict[str, Any], admit: Admit
+    ) -> Dict[str, Any]:
+        attempt_prompt = prompt
+        for attempt in range(self.reply_retries + 1):
+            async with admit(retry=attempt > 0):
+                text = await anyio.to_thread.run_sync(self._timed_generate, attempt_prompt, schema)
+            try:
+                return reply_model.model_validate_json(_strip_code_fences(text)).model_dump()
+            except ValidationError as exc:
+                problem = "; ".join(f"{'.'.join(map(str, e['loc'])) or 'reply'}: {e['msg']}" for e in exc.errors()[:3])
+                print(f"{self.name} reply failed validation (attempt {attempt + 1}):", problem)
+                attempt_prompt = f"{prompt}\n\nYour previous reply was invalid ({problem}). Reply again following the schema."
+        raise ScorerReplyError(f"{self.name} returned no valid reply after {self.reply_retries + 1} attempts")
+
+    async def improve_job_description(self, jd_text: str, admit: Admit = _unadmitted) -> Dict[str, Any]:
+        prompt = (
+            "As an expert technical recruiter, rewrite this job description for clarity, structure and "
+            "appeal, and extract its must-have and nice-to-have skills.\n"
+            f'JD:\n"""{jd_text}"""'
+        )
+        return await self._generate_json(prompt, _JobDescriptionReply, _JOB_DESCRIPTION_SCHEMA, admit)
+
+    async def suggest_profile_from_cv(self, cv_text: str, admit: Admit = _unadmitted) -> Dict[str, Any]:
+        prompt = (
+            "From this CV, write a short role headline, a 2-4 sentence summary of strengths, the key "
+            "skills, and any profile/portfolio links found.\n"
+            f'CV:\n"""{cv_text[:6000]}"""'
+        )
+        return await self._generate_json(prompt, _ProfileReply, _PROFILE_SCHEMA, admit)
+
+    async def score_candidate_for_job(
+        self, job: Dict[str, Any], candidate: Dict[str, Any], admit: Admit = _unadmitted
+    ) -> Dict[str, Any]:
+        # Only non-empty fields are sent; empty labels cost tokens and tell the model nothing.
+        job_lines = [
+            f"Title: {job.get('title') or 'Role'}",
+            f"Skills: {_listing(job.get('skills'))}" if job.get("skills") else "",
+            f"Description: {job.get('description')}" if job.get("description") else "",
+        ]
+        candidate_fields = [
+            ("Headline", candidate.get("headline")),
+            ("Location", candidate.get("location")),
+            ("Remote preference", candidate.get("remote_pref")),
+            ("Summary", candidate.get("summary")),
+            ("Skills", _listing(candidate.get("skills"))),
+            ("Links", _listing(candidate.get("links"))),
+        ]
+        candidate_lines = [f"{label}: {value}" for label, value in candidate_fields if value]
+        prompt = "\n".join(
+            [
+                "Rate how well the candidate fits the job (score 0-100; higher when most core skills and "
+                "responsibilities are clearly covered) and list matched and missing job skills.",
+                "JOB",
+                *[line for line in job_lines if line],
+                "CANDIDATE",
+                *candidate_lines,
+                f'CV:\n"""{(candidate.get("cv_text") or "")[:8000]}"""',
+            ]
+        )
+        return await self._generate_json(prompt, _ScoreReply, _SCORE_SCHEMA, admit)
+
+
+def _band(score: float) -> str:
+    if score >= 80:
+        return "excellent"
+    if score >= 60:
+        return "strong"
+    if score >= 40:
+        return "ok"
+    return "poor"
+
+
+_URL_RE = re.compile(r"https?://[^\s)>\]]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+class LocalScorer(ScorerBackend):
+    """
+    Deterministic offline scorer: explicit skill overlap blended with embedding similarity.
+    No network, same input -> same output, so it suits CI and reproducible benchmarks.
+    """
+
+    name = "local"
+    rate_limited = False
+    SKILL_WEIGHT = 0.6
+
+    def __init__(self, settings: Settings):
+        self.dim = settings.embedding_dim
+
+    def _score(self, job: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+        cv_text = candidate.get("cv_text") or ""
+        job_skills = skill_set(job.get("skills"))
+        candidate_terms = set(skill_set(candidate.get("skills"))) | set(
+            tokenize(" ".join([candidate.get("headline") or "", candidate.get("summary") or "", cv_text]))
+        )
+        matched, missing = split_skills(job_skills, candidate_terms)
+        similarity = max(float(embed_job(job, self.dim) @ embed_candidate(candidate, condense_text(cv_text), self.dim)), 0.0)
+        if job_skills:
+            score = 100 * (self.SKILL_WEIGHT * len(matched) / len(job_skills) + (1 - self.SKILL_WEIGHT) * similarity)
+        else:
+            score = 100 * similarity
+        score = round(min(max(score, 0.0), 100.0), 1)
+        rationale = f"Matched {len(matched)} of {len(job_skills)} listed skills; text similarity {similarity:.2f}."
+        if missing:
+            rationale += f" Missing: {', '.join(missing[:5])}."
+        return {
+            "score": score,
+            "band": _band(score),
+            "matched_skills": matched,
+            "missing_skills": missing,
+            "rationale": rationale,
+        }
+
+    async def improve_job_description(self, jd_text: str, admit: Admit = _unadmitted) -> Dict[str, Any]:
+        description = "\n".join(line.strip() for line in jd_text.splitlines() if line.strip())
+        terms = condense_text(jd_text, max_terms=12)
+        return {"description": description, "must_have": terms[:8], "nice_to_have": terms[8:]}
+
+    async def suggest_profile_from_cv(self, cv_text: str, admit: Admit = _unadmitted) -> Dict[str, Any]:
+        lines = [line.strip() for line in cv_text.splitlines() if line.strip()]
+        sentences = _SENTENCE_RE.split(" ".join(lines[1:])) if len(lines) > 1 else []
+        body = _URL_RE.sub(" ", "\n".join(lines[1:]))
+        return {
+            "headline": lines[0][:80] if lines else None,
+            "summary": " ".join(sentences[:3]) or None,
+            "skills": condense_text(body, max_terms=10),
+            "links": _URL_RE.findall(cv_text)[:5],
+        }
+
+    async def score_candidate_for_job(
+        self, job: Dict[str, Any], candidate: Dict[str, Any], admit: Admit = _unadmitted
+    ) -> Dict[str, Any]:
+        # In process, nothing to admit.
+        return self._score(job, candidate)
+
+
+class FakeLLMScorer(GeminiScorer):
+    """
+    Stand-in for Gemini with configurable latency, for load tests. It goes through the same
+    prompt building and JSON parsing as GeminiScorer and blocks a worker thread for
+    `fake_scorer_latency_ms` like a real model call. Replies are derived from a prompt hash.
+    """
+
+    name = "fake"
+
+    def __init__(self, settings: Settings):
+        self.latency_seconds = settings.fake_scorer_latency_ms / 1000.0
+        self.reply_retries = settings.gemini_reply_retries
+
+    def _generate(self, prompt: str, schema: Dict[str, Any]) -> str:
+        time.sleep(self.latency_seconds)
+        digest = int(hashlib.sha256(prompt.encode()).hexdigest()[:8], 16)
+        score = digest % 101
+        # Every prompt ends with the user-supplied text in triple quotes; echo terms from it.
+        quoted = prompt.rsplit('"""', 2)[-2] if prompt.count('"""') >= 2 else prompt
+        words = condense_text(quoted, max_terms=6)
+        reply = {
+            "score": score,
+            "band": _band(score),
+            "matched_skills": words[:3],
+            "missing_skills": words[3:],
+            "rationale": "Fake scorer reply for load testing.",
+            "description": quoted.strip(),
+            "must_have": words[:3],
+            "nice_to_have": words[3:],
+            "headline": "Fake headline",
+            "summary": "Fake summary.",
+            "skills": words,
+            "links": [],
+        }
+        return "```json\n" + json.dumps(reply) + "\n```"
+
+
+_BACKENDS = {
+    GeminiScorer.name: GeminiScorer,
+    LocalScorer.name: LocalScorer,
+    FakeLLMScorer.name: FakeLLMScorer,
+}
+_instances: Dict[str, ScorerBackend] = {}
+_instances_lock = threading.Lock()
+
+
+def available_backends() -> List[str]:
+    return list(_BACKENDS)
+
+
+def get_scorer_backend(settings: Settings) -> ScorerBackend:
+    """Backend selected by settings.scorer_backend; one shared instance per backend name."""
+    name = settings.scorer_backend.lower()
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown scorer backend {settings.scorer_backend!r}; expected one of {available_backends()}")
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            backend = _instances[name] = _BACKENDS[name](settings)
+    return backend
@@ -2,7 +2,7 @@
 from datetime import timedelta
 from typing import Optional
 
-from supabase import Client
+from ..dependencies import Client
 
 
 def get_signed_url(client: Client, bucket: str, path: str, expires_in: int = 3600) -> Optional[str]:
@@ -0,0 +1,343 @@
+# api\app\services\vector_index.py
+from __future__ import annotations
+
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+# numpy is imported where it is used, so cold starts that never build an index don't load it.
+if TYPE_CHECKING:
+    import numpy as np
+
+from ..config import Settings, get_settings
+from .embeddings import condense_text, embed_candidate, embed_job
+
+_PROFILE_FIELDS = ("headline", "location", "remote_pref", "summary", "skills")
+
+
+class VectorIndex:
+    """
+    In-memory cosine-similarity index over L2-normalized float32 vectors.
+
+    Vectors live in one contiguous NumPy matrix (grown by doubling) so exact scoring is a single
+    matrix-vector product. Above `exact_threshold` rows, queries go through random-hyperplane LSH:
+    each table hashes a vector to an n_bits signature, candidates are the union of matching buckets
+    (plus one-bit-flip probes), and only those rows are re-ranked exactly.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        n_tables: int = 8,
+        n_bits: int = 12,
+        exact_threshold: int = 5000,
+        seed: int = 7,
+    ):
+        import numpy as np
+        self.dim = dim
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.exact_threshold = exact_threshold
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((n_tables, n_bits, dim)).astype(np.float32)
+        self._powers = (1 << np.arange(n_bits)).astype(np.int64)
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._codes = np.zeros((0, n_tables), dtype=np.int64)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._buckets: List[Dict[int, set]] = [dict() for _ in range(n_tables)]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    def _hash(self, vectors: np.ndarray) -> np.ndarray:
+        import numpy as np
+        # (n, dim) -> (n, n_tables) integer bucket keys
+        bits = np.einsum("tbd,nd->ntb", self._planes, vectors) > 0
+        return bits.astype(np.int64) @ self._powers
+
+    def build(self, ids: List[str], vectors: np.ndarray) -> None:
+        """Replace the whole index in one shot (vectorized hashing)."""
+        import numpy as np
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        codes = self._hash(vectors) if len(ids) else np.zeros((0, self.n_tables), dtype=np.int64)
+        buckets: List[Dict[int, set]] = [dict() for _ in range(self.n_tables)]
+        for row, row_codes in enumerate(codes.tolist()):
+            for t, code in enumerate(row_codes):
+                buckets[t].setdefault(code, set()).add(row)
+        with self._lock:
+            self._matrix = vectors.copy()
+            self._codes = codes
+            self._ids = list(ids)
+            self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+            self._buckets = buckets
+
+    def upsert(self, item_id: str, vector: np.ndarray) -> None:
+        import numpy as np
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        codes = self._hash(vector[None, :])[0]
+        with self._lock:
+            row = self._rows.get(item_id)
+            if row is None:
+                row = len(self._ids)
+                if row >= self._matrix.shape[0]:
+                    capacity = max(16, self._matrix.shape[0] * 2)
+                    grown = np.zeros((capacity, self.dim), dtype=np.float32)
+                    grown[:row] = self._matrix[:row]
+                    self._matrix = grown
+                    grown_codes = np.zeros((capacity, self.n_tables), dtype=np.int64)
+                    grown_codes[:row] = self._codes[:row]
+                    self._codes = grown_codes
+                self._ids.append(item_id)
+                self._rows[item_id] = row
+            else:
+                self._unbucket(row)
+            self._matrix[row] = vector
+            self._codes[row] = codes
+            self._bucket(row)
+
+    def remove(self, item_id: str) -> None:
+        with self._lock:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                return
+            self._unbucket(row)
+            last = len(self._ids) - 1
+            if row != last:
+                # Move the last row into the hole so the matrix stays dense.
+                moved_id = self._ids[last]
+                self._unbucket(last)
+                self._matrix[row] = self._matrix[last]
+                self._codes[row] = self._codes[last]
+                self._ids[row] = moved_id
+                self._rows[moved_id] = row
+                self._bucket(row)
+            self._ids.pop()
+
+    def _bucket(self, row: int) -> None:
+        for t, code in enumerate(self._codes[row].tolist()):
+            self._buckets[t].setdefault(code, set()).add(row)
+
+    def _unbucket(self, row: int) -> None:
+        for t, code in enumerate(self._codes[row].tolist()):
+            bucket = self._buckets[t].get(code)
+            if bucket is not None:
+                bucket.discard(row)
+                if not bucket:
+                    del self._buckets[t][code]
+
+    def _candidate_rows(self, vector: np.ndarray) -> np.ndarray:
+        import numpy as np
+        codes = self._hash(vector[None, :])[0].tolist()
+        rows: set = set()
+        for t, code in enumerate(codes):
+            table = self._buckets[t]
+            rows.update(table.get(code, ()))
+            for bit in range(self.n_bits):
+                rows.update(table.get(code ^ (1 << bit), ()))
+        return np.fromiter(rows, dtype=np.int64, count=len(rows))
+
+    def query(self, vector: np.ndarray, k: int, exclude: Optional[set] = None) -> List[Tuple[str, float]]:
+        """Top-k (id, cosine similarity) pairs, best first."""
+        import numpy as np
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        exclude = exclude or set()
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or k <= 0:
+                return []
+            want = k + len(exclude)
+            rows = None
+            if n > self.exact_threshold:
+                rows = self._candidate_rows(vector)
+                if len(rows) < want:
+                    rows = None  # too few LSH hits; fall back to an exact scan
+            if rows is None:
+                rows = np.arange(n)
+            scores = self._matrix[rows] @ vector
+            top = min(want, len(rows))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            ids = self._ids
+            results = [(ids[rows[i]], float(scores[i])) for i in best]
+        return [(item_id, score) for item_id, score in results if item_id not in exclude][:k]
+
+
+class CandidateIndex:
+    """
+    Candidate sourcing index: one embedding per candidate (profile + condensed CV terms).
+
+    Loaded lazily from Supabase on first use and rebuilt after `vector_index_refresh_seconds` so
+    writes handled by other instances show up; writes on this instance are applied incrementally
+    through upsert_profile/upsert_cv.
+    """
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.dim = settings.embedding_dim
+        self.index = VectorIndex(dim=self.dim)
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._cv_terms: Dict[str, List[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def ensure_loaded(self, client) -> None:
+        """Load (or periodically reload) the index. Blocking; call from a worker thread."""
+        ttl = self.settings.vector_index_refresh_seconds
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < ttl:
+            return
+        with self._load_lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < ttl:
+                return
+            self._load(client)
+
+    def _load(self, client) -> None:
+        import numpy as np
+        profiles: Dict[str, Dict[str, Any]] = {}
+        start = 0
+        while True:
+            page = (
+                client.table("candidates")
+                .select("id," + ",".join(_PROFILE_FIELDS))
+                .order("id")
+                .range(start, start + self.PAGE_SIZE - 1)
+                .execute()
+                .data
+                or []
+            )
+            for row in page:
+                profiles[row["id"]] = row
+            if len(page) < self.PAGE_SIZE:
+                break
+            start += self.PAGE_SIZE
+        cv_terms: Dict[str, List[str]] = {}
+        start = 0
+        while True:
+            # Newest first, so the first CV seen per candidate is the one that counts.
+            page = (
+                client.table("candidate_cvs")
+                .select("candidate_id,parsed_text")
+                .order("created_at", desc=True)
+                .range(start, start + self.PAGE_SIZE - 1)
+                .execute()
+                .data
+                or []
+            )
+            for row in page:
+                cid = row.get("candidate_id")
+                if cid and cid not in cv_terms:
+                    cv_terms[cid] = condense_text(row.get("parsed_text") or "")
+            if len(page) < self.PAGE_SIZE:
+                break
+            start += self.PAGE_SIZE
+        ids = list(profiles)
+        vectors = np.zeros((len(ids), self.dim), dtype=np.float32)
+        for i, cid in enumerate(ids):
+            vectors[i] = embed_candidate(profiles[cid], cv_terms.get(cid), self.dim)
+        self.index.build(ids, vectors)
+        self._profiles = profiles
+        self._cv_terms = cv_terms
+        self._loaded_at = time.monotonic()
+
+    def upsert_profile(self, candidate_id: str, profile: Dict[str, Any]) -> None:
+        # Before the first load there is nothing to patch; the load will read the new row.
+        if not self.loaded:
+            return
+        updates = {k: profile[k] for k in _PROFILE_FIELDS if k in profile}
+        row = {**self._profiles.get(candidate_id, {}), **updates, "id": candidate_id}
+        self._profiles[candidate_id] = row
+        self.index.upsert(candidate_id, embed_candidate(row, self._cv_terms.get(candidate_id), self.dim))
+
+    def upsert_cv(self, candidate_id: str, cv_text: str) -> None:
+        if not self.loaded:
+            return
+        self._cv_terms[candidate_id] = condense_text(cv_text or "")
+        row = self._profiles.setdefault(candidate_id, {"id": candidate_id})
+        self.index.upsert(candidate_id, embed_candidate(row, self._cv_terms[candidate_id], self.dim))
+
+    def profile(self, candidate_id: str) -> Dict[str, Any]:
+        return self._profiles.get(candidate_id, {})
+
+    def search(self, vector: np.ndarray, k: int, exclude: Optional[set] = None) -> List[Tuple[str, float]]:
+        return self.index.query(vector, k, exclude=exclude)
+
+
+class JobIndex:
+    """
+    Precomputed feature matrix of open jobs, for ranking every job against one candidate with a
+    single matrix-vector product. Marked stale by job writes on this instance (invalidate) and
+    rebuilt on the next read, or after `job_index_refresh_seconds` for writes made elsewhere.
+    """
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.dim = settings.embedding_dim
+        # Job counts are small enough that the exact scan always wins over LSH.
+        self.index = VectorIndex(dim=self.dim, exact_threshold=10**9)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: Optional[float] = None
+        self._load_lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def ensure_loaded(self, client) -> None:
+        """Load (or rebuild) the job matrix if stale. Blocking; call from a worker thread."""
+        import numpy as np
+        ttl = self.settings.job_index_refresh_seconds
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < ttl:
+            return
+        with self._load_lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < ttl:
+                return
+            jobs: Dict[str, Dict[str, Any]] = {}
+            start = 0
+            while True:
+                page = (
+                    client.table("jobs")
+                    .select("*")
+                    .eq("status", "open")
+                    .order("id")
+                    .range(start, start + self.PAGE_SIZE - 1)
+                    .execute()
+                    .data
+                    or []
+                )
+                for row in page:
+                    jobs[row["id"]] = row
+                if len(page) < self.PAGE_SIZE:
+                    break
+                start += self.PAGE_SIZE
+            ids = list(jobs)
+            vectors = np.zeros((len(ids), self.dim), dtype=np.float32)
+            for i, job_id in enumerate(ids):
+                vectors[i] = embed_job(jobs[job_id], self.dim)
+            self.index.build(ids, vectors)
+            self._jobs = jobs
+            self._loaded_at = time.monotonic()
+
+    def top_k(self, vector: np.ndarray, k: int) -> List[Tuple[Dict[str, Any], float]]:
+        return [(self._jobs[job_id], score) for job_id, score in self.index.query(vector, k) if job_id in self._jobs]
+
+
+@lru_cache
+def get_candidate_index() -> CandidateIndex:
+    return CandidateIndex(get_settings())
+
+
+@lru_cache
+def get_job_index() -> JobIndex:
+    return JobIndex(get_settings())
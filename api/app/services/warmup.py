@@ -0,0 +1,34 @@
+# api\app\services\warmup.py
+import importlib
+import time
+
+from ..config import Settings
+
+# Imported lazily by the request paths that need them; pulled in here ahead of the first request.
+_HEAVY_MODULES = ("supabase", "jwt", "numpy", "PyPDF2", "docx")
+
+
+def warm_up(settings: Settings) -> None:
+    """
+    Load heavy modules and create shared clients in the background after startup, so the first
+    real request doesn't pay for them. Runs on a daemon thread; every step is best-effort.
+    """
+    from ..dependencies import supabase_service_client
+    from .scorers import get_scorer_backend
+
+    started = time.perf_counter()
+    for name in _HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as exc:
+            print(f"Warm-up: could not import {name}:", exc)
+    steps = (
+        ("supabase service client", lambda: supabase_service_client(settings)),
+        ("scorer backend", lambda: get_scorer_backend(settings)),
+    )
+    for label, step in steps:
+        try:
+            step()
+        except Exception as exc:
+            print(f"Warm-up: {label} failed:", exc)
+    print(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1 @@
+"""Load and micro benchmarks for the HireMatch API (local PostgREST and Gemini stand-ins)."""
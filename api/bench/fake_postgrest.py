@@ -0,0 +1,332 @@
+# api\bench\fake_postgrest.py
+"""
+In-memory PostgREST stand-in for benchmarks.
+
+Speaks the subset of the PostgREST HTTP API that supabase-py (postgrest-py) sends for this app:
+select projections, eq/neq/gt/gte/lt/lte/in/is/like/ilike/cs filters, or=(...), order, limit/offset,
+Prefer count=exact, inserts (single and bulk), upserts with on_conflict and merge/ignore
+resolution, updates and deletes. Unknown RPCs answer 404 PGRST202 so the app takes its
+non-RPC fallback paths. Tables are schemaless and created on first write.
+
+Served by uvicorn on a background thread so the sync supabase client can reach it over HTTP.
+"""
+import asyncio
+import json
+import re
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns", "or"}
+
+# Column defaults the real schema (db/schema.sql) would fill in.
+TABLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "jobs": {"status": "open", "remote": True},
+    "users": {"role": "candidate", "status": "active"},
+    "posts": {"visibility": "public", "status": "visible"},
+    "applications": {"status": "applied", "best_fit": False},
+    "notifications": {"read": False},
+    "notification_outbox": {"attempts": 0, "processed_at": None},
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_top_level(value: str) -> List[str]:
+    """Split on commas that are not inside parentheses or double quotes."""
+    parts, depth, quoted, current = [], 0, False, []
+    for ch in value:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1] if len(value) >= 2 and value[0] == value[-1] == '"' else value
+
+
+def _coerce(stored: Any, raw: str) -> Any:
+    if isinstance(stored, bool):
+        return raw.lower() == "true"
+    if isinstance(stored, (int, float)):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _like(pattern: str, flags: int = 0) -> "re.Pattern":
+    escaped = re.escape(pattern).replace(r"\*", ".*").replace("%", ".*").replace(r"\%", ".*")
+    return re.compile(f"^{escaped}$", flags | re.DOTALL)
+
+
+_OPERATORS = {"eq", "neq", "gt", "gte", "lt", "lte", "in", "is", "like", "ilike", "cs"}
+_COMPARE = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+
+def _compile(column: str, op: str, raw: str) -> Predicate:
+    """Turn one PostgREST filter (column=op.value) into a row predicate, parsing the value once."""
+    negate = False
+    if op == "not":
+        negate = True
+        op, _, raw = raw.partition(".")
+    if op not in _OPERATORS:
+        return lambda row: False
+    if op == "is":
+        expected = None if raw == "null" else raw == "true"
+        test = lambda row: row.get(column) is expected
+    elif op == "in":
+        values = {_unquote(v) for v in _split_top_level(raw.strip("()"))}
+        test = lambda row: row.get(column) is not None and str(row.get(column)) in values
+    elif op == "cs":
+        wanted = [_unquote(v) for v in _split_top_level(raw.strip("{}"))] if raw.startswith("{") else json.loads(raw)
+        wanted_set = {str(w) for w in wanted}
+        test = lambda row: wanted_set <= {str(v) for v in (row.get(column) or [])}
+    elif op in ("like", "ilike"):
+        pattern = _like(raw, re.IGNORECASE if op == "ilike" else 0)
+        test = lambda row: row.get(column) is not None and bool(pattern.match(str(row.get(column))))
+    else:
+        compare, value = _COMPARE[op], _unquote(raw)
+
+        def test(row: Dict[str, Any]) -> bool:
+            stored = row.get(column)
+            if stored is None:
+                return False
+            coerced = _coerce(stored, value)
+            try:
+                return compare(stored if not isinstance(coerced, str) else str(stored), coerced)
+            except TypeError:
+                return False
+
+    return (lambda row: not test(row)) if negate else test
+
+
+def _compile_or(expr: str, combine=any) -> Predicate:
+    """or=(...) / and(...) groups; nested and(...)/or(...) terms are supported (keyset cursors use them)."""
+    tests = []
+    for part in _split_top_level(expr.strip()[1:-1]):
+        if part.startswith(("and(", "or(")):
+            name, _, group = part.partition("(")
+            tests.append(_compile_or("(" + group, all if name == "and" else any))
+            continue
+        column, op, raw = (part.split(".", 2) + ["", ""])[:3]
+        tests.append(_compile(column, op, raw))
+    return lambda row: combine(t(row) for t in tests)
+
+
+class FakePostgrest:
+    """Holds the tables and implements the REST semantics; `app` is the ASGI entry point."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.latency_seconds = latency_ms / 1000.0
+        self.rpcs: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self.request_count = 0
+        self.app = Starlette(
+            routes=[
+                Route("/rest/v1/rpc/{name}", self._rpc, methods=["POST"]),
+                Route("/rest/v1/{table}", self._table, methods=["GET", "HEAD", "POST", "PATCH", "DELETE"]),
+            ]
+        )
+
+    # ---- data helpers -------------------------------------------------------------------
+    def table(self, name: str) -> List[Dict[str, Any]]:
+        return self.tables.setdefault(name, [])
+
+    def insert_rows(self, name: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Direct insert (used for seeding and by the REST handler)."""
+        table = self.table(name)
+        inserted = []
+        for row in rows:
+            full = {**TABLE_DEFAULTS.get(name, {}), **row}
+            full.setdefault("id", str(uuid.uuid4()))
+            full.setdefault("created_at", _now())
+            table.append(full)
+            inserted.append(full)
+            if name == "applications":
+                # Mirrors trg_applications_outbox in db/schema.sql.
+                self.insert_rows(
+                    "notification_outbox",
+                    [
+                        {
+                            "event_type": "new_application",
+                            "available_at": _now(),
+                            "payload": {
+                                "job_id": full.get("job_id"),
+                                "candidate_id": full.get("candidate_id"),
+                                "application_id": full["id"],
+                            },
+                        }
+                    ],
+                )
+        return inserted
+
+    def _filtered(self, name: str, params) -> List[Dict[str, Any]]:
+        tests: List[Predicate] = []
+        for key, value in params.multi_items():
+            if key == "or":
+                tests.append(_compile_or(value))
+            elif key not in _RESERVED_PARAMS:
+                op, _, raw = value.partition(".")
+                tests.append(_compile(key, op, raw))
+        return [r for r in self.table(name) if all(t(r) for t in tests)]
+
+    @staticmethod
+    def _order(rows: List[Dict[str, Any]], order: Optional[str]) -> List[Dict[str, Any]]:
+        if not order:
+            return rows
+        for term in reversed(order.split(",")):
+            column, *mods = term.split(".")
+            desc = "desc" in mods
+            nulls_first = "nullsfirst" in mods or (desc and "nullslast" not in mods)
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: (isinstance(r[column], str), r[column]), reverse=desc)
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    @staticmethod
+    def _project(rows: List[Dict[str, Any]], select: Optional[str]) -> List[Dict[str, Any]]:
+        if not select or select.strip() == "*":
+            return rows
+        columns = [c.strip() for c in _split_top_level(select) if c.strip()]
+        if "*" in columns:
+            return rows
+        return [{c: r.get(c) for c in columns} for r in rows]
+
+    # ---- HTTP handlers ------------------------------------------------------------------
+    async def _table(self, request: Request) -> Response:
+        self.request_count += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        name = request.path_params["table"]
+        params = request.query_params
+        prefer = request.headers.get("prefer", "")
+        method = request.method
+
+        if method in ("GET", "HEAD"):
+            rows = self._order(self._filtered(name, params), params.get("order"))
+            total = len(rows)
+            offset = int(params.get("offset", 0))
+            limit = params.get("limit")
+            rows = rows[offset : offset + int(limit)] if limit is not None else rows[offset:]
+            headers = {}
+            if "count=exact" in prefer:
+                end = offset + len(rows) - 1
+                headers["Content-Range"] = f"{offset}-{end}/{total}" if rows else f"*/{total}"
+            return JSONResponse(self._project(rows, params.get("select")), headers=headers)
+
+        body = json.loads(await request.body() or b"null")
+        if method == "POST":
+            rows_in = body if isinstance(body, list) else [body]
+            result = self._upsert(name, rows_in, prefer, params.get("on_conflict")) if "resolution=" in prefer else (
+                self.insert_rows(name, rows_in)
+            )
+        elif method == "PATCH":
+            result = self._filtered(name, params)
+            for row in result:
+                row.update(body)
+        else:  # DELETE
+            result = self._filtered(name, params)
+            ids = {id(r) for r in result}
+            self.tables[name] = [r for r in self.table(name) if id(r) not in ids]
+        headers = {}
+        if "count=exact" in prefer:
+            headers["Content-Range"] = f"*/{len(result)}"
+        if "return=minimal" in prefer:
+            return Response(status_code=204 if method != "POST" else 201, headers=headers)
+        return JSONResponse(result, status_code=201 if method == "POST" else 200, headers=headers)
+
+    def _upsert(self, name: str, rows_in: List[Dict[str, Any]], prefer: str, on_conflict: Optional[str]):
+        keys = [k.strip() for k in (on_conflict or "id").split(",")]
+        ignore = "resolution=ignore-duplicates" in prefer
+        table = self.table(name)
+        result = []
+        for row in rows_in:
+            existing = None
+            if all(row.get(k) is not None for k in keys):
+                existing = next((r for r in table if all(str(r.get(k)) == str(row[k]) for k in keys)), None)
+            if existing is None:
+                result.extend(self.insert_rows(name, [row]))
+            elif not ignore:
+                existing.update(row)
+                result.append(existing)
+        return result
+
+    async def _rpc(self, request: Request) -> Response:
+        self.request_count += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        name = request.path_params["name"]
+        fn = self.rpcs.get(name)
+        if fn is None:
+            return JSONResponse(
+                {
+                    "code": "PGRST202",
+                    "message": f"Could not find the function public.{name} in the schema cache",
+                    "hint": None,
+                    "details": None,
+                },
+                status_code=404,
+            )
+        body = json.loads(await request.body() or b"{}")
+        return JSONResponse(fn(body))
+
+
+class ServerThread:
+    """Run an ASGI app with uvicorn on a free localhost port in a daemon thread."""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: Optional[int] = None):
+        if port is None:
+            with socket.socket() as sock:
+                sock.bind((host, 0))
+                port = sock.getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="off")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "ServerThread":
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("fake PostgREST did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
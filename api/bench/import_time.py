@@ -0,0 +1,74 @@
+# api\bench\import_time.py
+"""
+Cold-start guard: time `import app.main` (what the Vercel entry point does) in fresh interpreters
+and fail if it is over budget or if a module that should load lazily got imported eagerly.
+
+    cd api
+    python -m bench.import_time
+    python -m bench.import_time --runs 10 --budget-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Optional
+
+# Only needed on specific request paths; importing app.main must not load them.
+LAZY_MODULES = ("supabase", "gotrue", "storage3", "jwt", "numpy", "PyPDF2", "docx", "google.generativeai")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def _probe(env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time regression guard for app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if the median import time exceeds this")
+    args = parser.parse_args(argv)
+
+    env = {
+        **os.environ,
+        "SUPABASE_URL": os.environ.get("SUPABASE_URL", "http://127.0.0.1:54321"),
+        "SUPABASE_SERVICE_KEY": os.environ.get("SUPABASE_SERVICE_KEY", "bench.service.key"),
+        "SUPABASE_ANON_KEY": os.environ.get("SUPABASE_ANON_KEY", "bench.anon.key"),
+    }
+    _probe(env)  # populate __pycache__ so every measured run is a warm-disk, cold-interpreter start
+    results = [_probe(env) for _ in range(args.runs)]
+    times = sorted(r["ms"] for r in results)
+    median = statistics.median(times)
+    print(f"import app.main: median {median:.0f}ms, min {times[0]:.0f}ms, max {times[-1]:.0f}ms over {args.runs} runs")
+
+    failed = False
+    loaded = sorted({m for r in results for m in r["loaded"]})
+    if loaded:
+        print(f"FAIL: imported eagerly: {', '.join(loaded)}")
+        failed = True
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"FAIL: median {median:.0f}ms is over the {args.budget_ms:.0f}ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
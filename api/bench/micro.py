@@ -0,0 +1,153 @@
+# api\bench\micro.py
+"""
+Micro-benchmarks for the CPU-bound helpers on hot request paths.
+
+    cd api
+    python -m bench.micro
+    python -m bench.micro --filter pdf --number 200
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import timeit
+from typing import Callable, Dict, List, Optional, Tuple
+
+# The routers read settings lazily, but give the required keys a value so imports never fail.
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench.service.key")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench.anon.key")
+
+from .workloads import FILLER, SKILLS, TITLES  # noqa: E402
+
+JD_TEXT = "\n".join(
+    [TITLES[0], "About the role", FILLER]
+    + [f"- Hands-on experience with {s.title()} and {SKILLS[(i + 7) % len(SKILLS)].title()}" for i, s in enumerate(SKILLS)]
+    + [FILLER] * 10
+)
+
+
+def _sample_pdf(text: str, pages: int = 3) -> bytes:
+    """Minimal multi-page PDF with one Helvetica text block per page."""
+    lines = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in text.splitlines()]
+    content = "BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(f"({line}) '" for line in lines[:60]) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(pages)), pages),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{num} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def _sample_docx(text: str) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    for line in text.splitlines():
+        doc.add_paragraph(line)
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def _sample_job_row() -> Dict[str, object]:
+    return {
+        "id": "8d0f4c1e-5a55-4f0e-9c1e-3d2b1a0f9e77",
+        "slug": "backend-engineer-1",
+        "company_name": "Company 1",
+        "title": "Backend Engineer",
+        "location": "Lahore",
+        "remote": True,
+        "employment_type": "full_time",
+        "description": FILLER,
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "status": "open",
+    }
+
+
+def _sample_enriched_applications(n: int) -> List[Dict[str, object]]:
+    """list_job_applications-shaped payload: application rows with the full candidate row embedded."""
+    return [
+        {
+            "id": f"app-{i}",
+            "job_id": "job-1",
+            "candidate_id": f"cand-{i}",
+            "status": "applied",
+            "applied_at": "2025-01-01T00:00:00+00:00",
+            "match_score": 50 + i % 50,
+            "matched_skills": SKILLS[:8],
+            "missing_skills": SKILLS[8:12],
+            "rationale": FILLER,
+            "cv_excerpt": FILLER * 3,
+            "candidate": {"id": f"cand-{i}", "headline": TITLES[i % len(TITLES)], "skills": SKILLS, "summary": FILLER},
+            "email": f"candidate{i}@example.com",
+        }
+        for i in range(n)
+    ]
+
+
+def benchmarks() -> List[Tuple[str, Callable[[], object]]]:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, ORJSONResponse
+
+    from app.routers.public import _job_public_row, _map_job_public
+    from app.routers.recruiter import _guess_title_and_skills
+    from app.services.documents import extract_text_from_docx, extract_text_from_pdf
+    from app.services.scorers import _strip_code_fences
+
+    fenced = "```json\n" + json.dumps({"score": 72, "matched_skills": SKILLS[:10], "rationale": FILLER}) + "\n```"
+    pdf_bytes = _sample_pdf(JD_TEXT)
+    docx_bytes = _sample_docx(JD_TEXT)
+    job_rows = [_sample_job_row() for _ in range(200)]
+    enriched = _sample_enriched_applications(200)
+    return [
+        ("strip_code_fences", lambda: _strip_code_fences(fenced)),
+        ("guess_title_and_skills", lambda: _guess_title_and_skills(JD_TEXT)),
+        ("extract_text_from_pdf (3 pages)", lambda: extract_text_from_pdf(pdf_bytes)),
+        ("extract_text_from_docx", lambda: extract_text_from_docx(docx_bytes)),
+        ("map_job_public x200", lambda: [_map_job_public(j) for j in job_rows]),
+        ("job_public_row x200", lambda: [_job_public_row(j) for j in job_rows]),
+        # Default FastAPI path for a returned list vs. returning an ORJSONResponse directly.
+        ("applications x200 JSONResponse", lambda: JSONResponse(jsonable_encoder(enriched)).body),
+        ("applications x200 ORJSONResponse", lambda: ORJSONResponse(enriched).body),
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HireMatch API micro-benchmarks")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--number", type=int, default=0, help="calls per repeat (0 = auto)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'benchmark':<36}{'calls':>8}{'best us/call':>15}{'median us/call':>17}")
+    for name, fn in benchmarks():
+        if args.filter and args.filter not in name:
+            continue
+        timer = timeit.Timer(fn)
+        number = args.number or timer.autorange()[0]
+        runs = sorted(t / number * 1e6 for t in timer.repeat(repeat=args.repeat, number=number))
+        print(f"{name:<36}{number:>8}{runs[0]:>15.1f}{runs[len(runs) // 2]:>17.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
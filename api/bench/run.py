@@ -0,0 +1,215 @@
+# api\bench\run.py
+"""
+End-to-end load benchmark.
+
+Starts the in-memory PostgREST stand-in, seeds it, points the app at it with the fake scorer
+backend, and drives the real FastAPI app in-process with concurrent workers. Reports per-route
+throughput and latency percentiles so changes can be compared before/after.
+
+    cd api
+    python -m bench.run --workload mixed --concurrency 32 --duration 20
+    python -m bench.run --workload recruiter --requests 2000 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from .fake_postgrest import FakePostgrest, ServerThread
+
+
+class RouteStats:
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = defaultdict(int)
+        self.failures = 0  # transport errors / exceptions
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def errors(self) -> int:
+        return self.failures + sum(n for code, n in self.statuses.items() if code >= 500)
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        idx = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+        return ordered[idx]
+
+    def histogram(self) -> Dict[str, int]:
+        """Counts per power-of-two millisecond bucket ("<1ms", "<2ms", "<4ms", ...)."""
+        buckets: Dict[str, int] = {}
+        for latency in self.latencies:
+            ms = latency * 1000
+            upper = 1 if ms < 1 else 2 ** math.ceil(math.log2(ms + 1e-9))
+            key = f"<{upper}ms"
+            buckets[key] = buckets.get(key, 0) + 1
+        return dict(sorted(buckets.items(), key=lambda kv: int(kv[0][1:-2])))
+
+    def summary(self) -> Dict[str, object]:
+        ms = [v * 1000 for v in self.latencies]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "status": dict(sorted(self.statuses.items())),
+            "mean_ms": round(statistics.fmean(ms), 2) if ms else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p90_ms": round(self.percentile(90) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "max_ms": round(max(ms), 2) if ms else 0.0,
+            "histogram": self.histogram(),
+        }
+
+
+def _configure_env(args: argparse.Namespace, supabase_url: str) -> None:
+    # Must run before anything imports app.main (it builds the app, and settings, at import).
+    os.environ.update(
+        {
+            "APP_ENV": "local",
+            "SUPABASE_URL": supabase_url,
+            # supabase-py only checks that keys look like JWTs; the stand-in ignores them.
+            "SUPABASE_SERVICE_KEY": "bench.service.key",
+            "SUPABASE_ANON_KEY": "bench.anon.key",
+            "SCORER_BACKEND": args.scorer,
+            "FAKE_SCORER_LATENCY_MS": str(args.llm_latency_ms),
+            "OUTBOX_POLL_SECONDS": "1",
+            # Every benchmark request is the same dev user, so per-user limits would dominate.
+            "LLM_ADMISSION_ENABLED": "true" if args.admission else "false",
+        }
+    )
+
+
+async def _drive(app, data, pick, args: argparse.Namespace) -> Tuple[Dict[str, RouteStats], float]:
+    """Run the workers against the app; returns per-route stats and the measured (post-warmup) time."""
+    import httpx
+
+    stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+    deadline: Optional[float] = None
+    remaining = [args.requests]
+
+    def has_budget() -> bool:
+        if deadline is not None:
+            return time.perf_counter() < deadline
+        if remaining[0] <= 0:
+            return False
+        remaining[0] -= 1
+        return True
+
+    async def worker(worker_id: int, client: httpx.AsyncClient) -> None:
+        rng = random.Random(args.seed * 1000 + worker_id)
+        while has_budget():
+            method, url, label, kwargs = pick(rng, data)
+            route = stats[label]
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                await response.aread()
+                route.statuses[response.status_code] += 1
+            except Exception as exc:
+                route.failures += 1
+                if args.verbose:
+                    print(f"{label}: {exc!r}", file=sys.stderr)
+            route.latencies.append(time.perf_counter() - start)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            if args.warmup:
+                warm_rng = random.Random(args.seed)
+                for _ in range(args.warmup):
+                    method, url, _, kwargs = pick(warm_rng, data)
+                    await client.request(method, url, **kwargs)
+            started = time.perf_counter()
+            if args.requests is None:
+                deadline = started + args.duration
+            await asyncio.gather(*(worker(i, client) for i in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+    return stats, elapsed
+
+
+def _print_report(stats: Dict[str, RouteStats], elapsed: float, args: argparse.Namespace, db_requests: int) -> None:
+    total = sum(s.count for s in stats.values())
+    errors = sum(s.errors for s in stats.values())
+    print(
+        f"\nworkload={args.workload} concurrency={args.concurrency} scorer={args.scorer} "
+        f"llm_latency={args.llm_latency_ms}ms db_latency={args.db_latency_ms}ms"
+    )
+    print(f"{total} requests in {elapsed:.2f}s -> {total / elapsed:.1f} req/s, {errors} errors, {db_requests} DB calls\n")
+    header = f"{'route':<64}{'count':>7}{'err':>5}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    print("-" * len(header))
+    for label in sorted(stats, key=lambda k: -stats[k].count):
+        s = stats[label].summary()
+        print(
+            f"{label[:63]:<64}{s['count']:>7}{s['errors']:>5}{s['mean_ms']:>9.1f}{s['p50_ms']:>9.1f}"
+            f"{s['p90_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}"
+        )
+    print("\n(latencies in ms)")
+    if args.histogram:
+        for label in sorted(stats):
+            buckets = "  ".join(f"{k}:{v}" for k, v in stats[label].histogram().items())
+            print(f"\n{label}\n  {buckets}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HireMatch API load benchmark")
+    parser.add_argument("--workload", default="mixed", choices=["public", "candidate", "recruiter", "mixed"])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run (ignored with --requests)")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    parser.add_argument("--warmup", type=int, default=20, help="sequential requests before measuring")
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--applications-per-job", type=int, default=20)
+    parser.add_argument("--scorer", default="fake", choices=["fake", "local"])
+    parser.add_argument("--llm-latency-ms", type=int, default=800, help="fake scorer latency per call")
+    parser.add_argument("--db-latency-ms", type=float, default=2.0, help="added latency per PostgREST call")
+    parser.add_argument("--admission", action="store_true", help="keep LLM admission control (rate limits) on")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--histogram", action="store_true", help="print latency histograms per route")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    db = FakePostgrest(latency_ms=args.db_latency_ms)
+    with ServerThread(db.app) as server:
+        _configure_env(args, server.url)
+        from app.main import app
+
+        from .workloads import picker, seed
+
+        data = seed(db, random.Random(args.seed), args.jobs, args.candidates, args.applications_per_job)
+        db.request_count = 0
+        stats, elapsed = asyncio.run(_drive(app, data, picker(args.workload), args))
+
+    _print_report(stats, elapsed, args, db.request_count)
+    if args.json:
+        total = sum(s.count for s in stats.values())
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "config": vars(args),
+                    "elapsed_s": round(elapsed, 3),
+                    "requests": total,
+                    "rps": round(total / elapsed, 2) if elapsed else 0.0,
+                    "db_calls": db.request_count,
+                    "routes": {label: s.summary() for label, s in sorted(stats.items())},
+                },
+                fh,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
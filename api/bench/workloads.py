@@ -0,0 +1,301 @@
+# api\bench\workloads.py
+"""
+Seed data and request mixes for the load benchmark.
+
+Every request is issued as the local dev user (X-Debug-Role picks candidate or recruiter), so the
+seeded jobs are owned by LOCAL_DEV_USER_ID and that user also has a candidate profile and CV.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.dependencies import LOCAL_DEV_USER_ID
+
+# (method, url, route label for reporting, extra httpx.request kwargs)
+Call = Tuple[str, str, str, Dict[str, Any]]
+Scenario = Callable[[random.Random, "Dataset"], Call]
+
+SKILLS = [
+    "python", "fastapi", "django", "postgresql", "react", "typescript", "node.js", "aws", "docker",
+    "kubernetes", "terraform", "go", "rust", "java", "spring", "kotlin", "swift", "graphql", "redis",
+    "kafka", "spark", "pandas", "pytorch", "tensorflow", "sql", "figma", "css", "c#", "azure", "linux",
+]
+TITLES = [
+    "Backend Engineer", "Frontend Engineer", "Data Engineer", "ML Engineer", "DevOps Engineer",
+    "Mobile Developer", "Full Stack Developer", "Platform Engineer", "Data Scientist", "QA Engineer",
+]
+CITIES = ["Lahore", "Karachi", "Islamabad", "Berlin", "London", "Toronto", "Dubai", "Remote"]
+FILLER = (
+    "We build products used by thousands of teams. You will design services, review code, mentor "
+    "engineers and own features from idea to production. Our stack evolves quickly and we value "
+    "clear writing, testing and pragmatic decisions."
+)
+
+CANDIDATE = {"X-Debug-Role": "candidate"}
+RECRUITER = {"X-Debug-Role": "recruiter"}
+
+
+class Dataset:
+    """Ids of the seeded rows, so scenarios can pick realistic targets."""
+
+    def __init__(self) -> None:
+        self.job_ids: List[str] = []
+        self.job_slugs: List[str] = []
+        self.candidate_ids: List[str] = []
+        self.applications: List[Tuple[str, str]] = []  # (job_id, application_id)
+        self.own_cv_id: str = ""
+
+
+def _ts(rng: random.Random, days: int = 90) -> str:
+    moment = datetime.now(timezone.utc) - timedelta(seconds=rng.randint(0, days * 86400))
+    return moment.isoformat()
+
+
+def _skills(rng: random.Random, k: int) -> List[str]:
+    return rng.sample(SKILLS, k)
+
+
+def _cv_text(rng: random.Random, headline: str, skills: List[str]) -> str:
+    lines = [headline, f"Experienced in {', '.join(skills)}."]
+    lines += [f"Built {rng.choice(TITLES).lower()} tooling with {s} and shipped it to production." for s in skills]
+    lines += [FILLER] * 3
+    return "\n".join(lines)
+
+
+def seed(db, rng: random.Random, jobs: int, candidates: int, applications_per_job: int) -> Dataset:
+    """Populate the fake PostgREST tables; returns the ids scenarios draw from."""
+    data = Dataset()
+    db.insert_rows("users", [{"id": LOCAL_DEV_USER_ID, "role": "recruiter", "email": "dev@example.com"}])
+    db.insert_rows("recruiters", [{"id": LOCAL_DEV_USER_ID}])
+
+    own_skills = _skills(rng, 6)
+    db.insert_rows(
+        "candidates",
+        [
+            {
+                "id": LOCAL_DEV_USER_ID,
+                "headline": "Backend Engineer",
+                "location": "Lahore",
+                "remote_pref": "remote",
+                "summary": FILLER,
+                "skills": own_skills,
+                "links": [],
+            }
+        ],
+    )
+    data.own_cv_id = str(uuid.uuid4())
+    db.insert_rows(
+        "candidate_cvs",
+        [
+            {
+                "id": data.own_cv_id,
+                "candidate_id": LOCAL_DEV_USER_ID,
+                "file_url": "cvs/dev.pdf",
+                "parsed_text": _cv_text(rng, "Backend Engineer", own_skills),
+                "created_at": _ts(rng),
+            }
+        ],
+    )
+
+    users, profiles, cvs = [], [], []
+    for i in range(candidates):
+        cid = str(uuid.uuid4())
+        headline = rng.choice(TITLES)
+        skills = _skills(rng, rng.randint(3, 8))
+        users.append({"id": cid, "role": "candidate", "email": f"candidate{i}@example.com"})
+        profiles.append(
+            {
+                "id": cid,
+                "headline": headline,
+                "location": rng.choice(CITIES),
+                "remote_pref": rng.choice(["remote", "hybrid", "onsite"]),
+                "summary": f"{headline} with {rng.randint(1, 12)} years in {', '.join(skills[:3])}.",
+                "skills": skills,
+                "links": [],
+            }
+        )
+        cvs.append(
+            {
+                "id": str(uuid.uuid4()),
+                "candidate_id": cid,
+                "file_url": f"cvs/{cid}.pdf",
+                "parsed_text": _cv_text(rng, headline, skills),
+                "created_at": _ts(rng),
+            }
+        )
+        data.candidate_ids.append(cid)
+    db.insert_rows("users", users)
+    db.insert_rows("candidates", profiles)
+    db.insert_rows("candidate_cvs", cvs)
+    cv_by_candidate = {cv["candidate_id"]: cv["id"] for cv in cvs}
+
+    job_rows, app_rows = [], []
+    for i in range(jobs):
+        jid = str(uuid.uuid4())
+        title = rng.choice(TITLES)
+        job_rows.append(
+            {
+                "id": jid,
+                "slug": f"{title.lower().replace(' ', '-')}-{i}",
+                "recruiter_id": LOCAL_DEV_USER_ID,
+                "title": title,
+                "company_name": f"Company {i % 25}",
+                "location": rng.choice(CITIES),
+                "remote": rng.random() < 0.5,
+                "employment_type": "full_time",
+                "description": f"{title} role. {FILLER}",
+                "skills": [{"skill": s, "importance": "must"} for s in _skills(rng, 5)],
+                "status": "open" if rng.random() < 0.9 else "closed",
+                "created_at": _ts(rng),
+            }
+        )
+        data.job_ids.append(jid)
+        data.job_slugs.append(job_rows[-1]["slug"])
+        for cid in rng.sample(data.candidate_ids, min(applications_per_job, len(data.candidate_ids))):
+            scored = rng.random() < 0.5
+            app_rows.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "job_id": jid,
+                    "candidate_id": cid,
+                    "cv_id": cv_by_candidate[cid],
+                    "status": "applied",
+                    "applied_at": _ts(rng),
+                    "match_score": round(rng.uniform(20, 95), 1) if scored else None,
+                }
+            )
+            data.applications.append((jid, app_rows[-1]["id"]))
+    db.insert_rows("jobs", job_rows)
+    db.tables.setdefault("applications", []).extend(app_rows)  # seeded rows skip the outbox trigger
+
+    db.insert_rows(
+        "posts",
+        [
+            {
+                "candidate_id": rng.choice(data.candidate_ids),
+                "body": f"Post {i}: {FILLER[:120]}",
+                "visibility": "public",
+                "created_at": _ts(rng),
+            }
+            for i in range(max(candidates // 2, 1))
+        ],
+    )
+    return data
+
+
+# ---- scenarios ------------------------------------------------------------------------------
+
+
+def public_jobs(rng, data) -> Call:
+    return "GET", "/jobs", "GET /jobs", {}
+
+
+def public_job_detail(rng, data) -> Call:
+    return "GET", f"/jobs/{rng.choice(data.job_slugs)}", "GET /jobs/{slug}", {}
+
+
+def candidate_feed(rng, data) -> Call:
+    return "GET", "/candidate/feed", "GET /candidate/feed", {"headers": CANDIDATE}
+
+
+def candidate_applications(rng, data) -> Call:
+    return "GET", "/candidate/applications", "GET /candidate/applications", {"headers": CANDIDATE}
+
+
+def candidate_recommended(rng, data) -> Call:
+    return "GET", "/candidate/recommended-jobs", "GET /candidate/recommended-jobs", {"headers": CANDIDATE}
+
+
+def candidate_match_check(rng, data) -> Call:
+    jd = f"{rng.choice(TITLES)} needed. Skills: {', '.join(_skills(rng, 5))}. {FILLER}"
+    return "POST", "/candidate/match-check", "POST /candidate/match-check", {
+        "headers": CANDIDATE,
+        "json": {"jd_text": jd, "cv_id": data.own_cv_id},
+    }
+
+
+def candidate_apply(rng, data) -> Call:
+    job_id = rng.choice(data.job_ids)
+    return "POST", f"/candidate/apply/{job_id}", "POST /candidate/apply/{job_id}", {
+        "headers": CANDIDATE,
+        "json": {"cv_id": data.own_cv_id},
+    }
+
+
+def notifications_unread(rng, data) -> Call:
+    return "GET", "/notifications/unread-count", "GET /notifications/unread-count", {"headers": RECRUITER}
+
+
+def recruiter_jobs(rng, data) -> Call:
+    return "GET", "/recruiter/jobs", "GET /recruiter/jobs", {"headers": RECRUITER}
+
+
+def recruiter_applications(rng, data) -> Call:
+    job_id = rng.choice(data.job_ids)
+    return "GET", f"/recruiter/jobs/{job_id}/applications", "GET /recruiter/jobs/{job_id}/applications", {
+        "headers": RECRUITER,
+        "params": {"include_best": "true"},
+    }
+
+
+def recruiter_candidates(rng, data) -> Call:
+    return "GET", "/recruiter/candidates", "GET /recruiter/candidates", {"headers": RECRUITER}
+
+
+def recruiter_search(rng, data) -> Call:
+    return "GET", "/recruiter/candidates/search", "GET /recruiter/candidates/search", {
+        "headers": RECRUITER,
+        "params": {"q": rng.choice(TITLES).split()[0]},
+    }
+
+
+def recruiter_sourcing(rng, data) -> Call:
+    job_id = rng.choice(data.job_ids)
+    return "GET", f"/recruiter/jobs/{job_id}/sourcing", "GET /recruiter/jobs/{job_id}/sourcing", {
+        "headers": RECRUITER
+    }
+
+
+def recruiter_score(rng, data) -> Call:
+    job_id, app_id = rng.choice(data.applications)
+    return (
+        "POST",
+        f"/recruiter/jobs/{job_id}/applications/{app_id}/score",
+        "POST /recruiter/jobs/{job_id}/applications/{application_id}/score",
+        {"headers": RECRUITER},
+    )
+
+
+WORKLOADS: Dict[str, List[Tuple[int, Scenario]]] = {
+    "public": [(6, public_jobs), (4, public_job_detail)],
+    "candidate": [
+        (4, candidate_feed),
+        (3, candidate_applications),
+        (3, candidate_recommended),
+        (1, candidate_match_check),
+        (1, candidate_apply),
+    ],
+    "recruiter": [
+        (3, recruiter_jobs),
+        (3, recruiter_applications),
+        (2, recruiter_candidates),
+        (2, recruiter_search),
+        (2, recruiter_sourcing),
+        (2, notifications_unread),
+        (1, recruiter_score),
+    ],
+}
+WORKLOADS["mixed"] = WORKLOADS["public"] + WORKLOADS["candidate"] + WORKLOADS["recruiter"]
+
+
+def picker(name: str) -> Callable[[random.Random, Dataset], Call]:
+    """Weighted random choice over the scenarios of one workload."""
+    entries = WORKLOADS[name]
+    weights = [w for w, _ in entries]
+    scenarios = [s for _, s in entries]
+
+    def pick(rng: random.Random, data: Dataset) -> Call:
+        return rng.choices(scenarios, weights)[0](rng, data)
+
+    return pick
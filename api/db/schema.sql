@@ -155,6 +155,10 @@ create policy if not exists "posts owner read" on public.posts for select using
 create policy if not exists "posts owner insert" on public.posts for insert with check (auth.uid() = candidate_id);
 create policy if not exists "posts owner update" on public.posts for update using (auth.uid() = candidate_id);
 
+-- Keyset index for the public feed: (created_at, id) descending over public, visible posts.
+create index if not exists idx_posts_feed on public.posts(created_at desc, id desc)
+  where visibility = 'public' and status = 'visible';
+
 alter table public.bookmarks enable row level security;
 create policy if not exists "bookmarks recruiter access" on public.bookmarks
   for select using (auth.uid() = recruiter_id);
@@ -192,6 +196,8 @@ create policy if not exists "matches recruiter access" on public.matches
   for select using (exists(select 1 from public.jobs j where j.id = job_id and j.recruiter_id = auth.uid()));
 create policy if not exists "matches recruiter insert" on public.matches
   for insert with check (exists(select 1 from public.jobs j where j.id = job_id and j.recruiter_id = auth.uid()));
+create policy if not exists "matches recruiter update" on public.matches
+  for update using (exists(select 1 from public.jobs j where j.id = job_id and j.recruiter_id = auth.uid()));
 create policy if not exists "matches candidate access" on public.matches
   for select using (auth.uid() = candidate_id);
 
@@ -218,3 +224,614 @@ create table if not exists public.notifications (
 
 create index if not exists idx_notifications_user_id on public.notifications(user_id);
 create index if not exists idx_notifications_created_at on public.notifications(created_at);
+
+-- Recruiter candidate list: jobs -> applications -> candidates -> emails in one round trip.
+-- Runs as the caller so the applications/candidates RLS policies still apply.
+create index if not exists idx_jobs_recruiter_id on public.jobs(recruiter_id);
+
+create or replace function public.recruiter_candidates(
+  p_recruiter_id uuid,
+  p_limit int default 50,
+  p_offset int default 0
+)
+returns table (id uuid, candidate jsonb, email text, applications jsonb)
+language sql
+stable
+as $$
+  select
+    a.candidate_id as id,
+    coalesce(to_jsonb(c), '{}'::jsonb) as candidate,
+    u.email,
+    jsonb_agg(to_jsonb(a) order by a.applied_at desc) as applications
+  from public.applications a
+  join public.jobs j on j.id = a.job_id
+  left join public.candidates c on c.id = a.candidate_id
+  left join public.users u on u.id = a.candidate_id
+  where j.recruiter_id = p_recruiter_id
+    and a.candidate_id is not null
+  group by a.candidate_id, c.id, u.id
+  order by max(a.applied_at) desc
+  limit p_limit
+  offset p_offset;
+$$;
+
+-- Keep applications.best_fit in sync after a score changes: one atomic UPDATE that only
+-- rewrites rows whose flag flips. Returns the best application id (null if none scored).
+create or replace function public.refresh_best_fit(p_job_id uuid)
+returns uuid
+language plpgsql
+as $$
+declare
+  v_best uuid;
+begin
+  select a.id into v_best
+  from public.applications a
+  where a.job_id = p_job_id
+  order by a.match_score desc nulls last, a.applied_at asc
+  limit 1;
+
+  update public.applications a
+  set best_fit = coalesce(a.id = v_best, false)
+  where a.job_id = p_job_id
+    and a.best_fit is distinct from coalesce(a.id = v_best, false);
+
+  return v_best;
+end;
+$$;
+
+-- Unread notification counters, maintained by trigger so the unread-count endpoint is a
+-- single-row lookup. The partial index backs the fallback count and "mark all read".
+create index if not exists idx_notifications_user_unread on public.notifications(user_id) where read = false;
+
+create table if not exists public.notification_counters (
+  user_id uuid primary key references public.users(id),
+  unread int not null default 0
+);
+
+alter table public.notification_counters enable row level security;
+create policy if not exists "notification_counters self read" on public.notification_counters
+  for select using (auth.uid() = user_id);
+
+create or replace function public.track_unread_notifications()
+returns trigger
+language plpgsql
+security definer
+as $$
+declare
+  v_delta int := 0;
+  v_user uuid;
+begin
+  if tg_op = 'INSERT' then
+    v_user := new.user_id;
+    v_delta := case when coalesce(new.read, false) then 0 else 1 end;
+  elsif tg_op = 'DELETE' then
+    v_user := old.user_id;
+    v_delta := case when coalesce(old.read, false) then 0 else -1 end;
+  else
+    v_user := new.user_id;
+    v_delta := (case when coalesce(new.read, false) then 0 else 1 end)
+             - (case when coalesce(old.read, false) then 0 else 1 end);
+  end if;
+  if v_user is not null and v_delta <> 0 then
+    insert into public.notification_counters as nc (user_id, unread)
+    values (v_user, greatest(v_delta, 0))
+    on conflict (user_id) do update set unread = greatest(nc.unread + v_delta, 0);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists trg_notifications_unread on public.notifications;
+create trigger trg_notifications_unread
+  after insert or update of read or delete on public.notifications
+  for each row execute function public.track_unread_notifications();
+
+-- Seed the counters from the rows written before the trigger existed. A full recount, so
+-- re-running this file also repairs any drift.
+insert into public.notification_counters (user_id, unread)
+select user_id, count(*) from public.notifications
+where user_id is not null and not coalesce(read, false)
+group by user_id
+on conflict (user_id) do update set unread = excluded.unread;
+
+update public.notification_counters nc
+set unread = 0
+where nc.unread <> 0
+  and not exists (
+    select 1 from public.notifications n where n.user_id = nc.user_id and not coalesce(n.read, false)
+  );
+
+-- Mark all of a user's notifications read; returns how many changed.
+create or replace function public.mark_notifications_read(p_user_id uuid)
+returns int
+language plpgsql
+as $$
+declare
+  v_updated int;
+begin
+  update public.notifications
+  set read = true
+  where user_id = p_user_id and read = false;
+  get diagnostics v_updated = row_count;
+  return v_updated;
+end;
+$$;
+
+-- Transactional outbox for application notifications. The trigger enqueues the event in the
+-- same transaction as the application insert; the API's OutboxDispatcher batches them into
+-- notifications, retrying with backoff. notifications.outbox_id makes redelivery idempotent.
+create table if not exists public.notification_outbox (
+  id uuid primary key default uuid_generate_v4(),
+  event_type text not null,
+  payload jsonb not null,
+  attempts int not null default 0,
+  available_at timestamptz not null default now(),
+  processed_at timestamptz,
+  last_error text,
+  created_at timestamptz default now()
+);
+
+create index if not exists idx_notification_outbox_pending
+  on public.notification_outbox(created_at) where processed_at is null;
+
+-- Events that used up OUTBOX_MAX_ATTEMPTS are marked dead (and logged by the dispatcher) rather
+-- than left pending; prune_notification_outbox() deletes processed and dead rows after retention.
+alter table public.notification_outbox add column if not exists dead_at timestamptz;
+create index if not exists idx_notification_outbox_done
+  on public.notification_outbox(coalesce(processed_at, dead_at))
+  where processed_at is not null or dead_at is not null;
+
+alter table public.notification_outbox enable row level security;
+
+alter table public.notifications add column if not exists outbox_id uuid unique;
+
+-- Delete up to p_batch_size processed or dead outbox rows older than the retention window;
+-- returns how many went. The caller repeats until fewer than a batch remain.
+create or replace function public.prune_notification_outbox(p_retention_days int, p_batch_size int default 5000)
+returns int
+language plpgsql
+security definer
+as $$
+declare
+  v_deleted int;
+begin
+  delete from public.notification_outbox
+  where id in (
+    select id from public.notification_outbox
+    where (processed_at is not null or dead_at is not null)
+      and coalesce(processed_at, dead_at) < now() - make_interval(days => p_retention_days)
+    limit p_batch_size
+  );
+  get diagnostics v_deleted = row_count;
+  return v_deleted;
+end;
+$$;
+
+create or replace function public.enqueue_application_event()
+returns trigger
+language plpgsql
+security definer
+as $$
+begin
+  -- Only candidate self-applications notify; recruiters attaching candidates to their own jobs don't.
+  if auth.uid() is not null and auth.uid() <> new.candidate_id then
+    return new;
+  end if;
+  insert into public.notification_outbox (event_type, payload)
+  values (
+    'new_application',
+    jsonb_build_object('job_id', new.job_id, 'candidate_id', new.candidate_id, 'application_id', new.id)
+  );
+  return new;
+end;
+$$;
+
+drop trigger if exists trg_applications_outbox on public.applications;
+create trigger trg_applications_outbox
+  after insert on public.applications
+  for each row execute function public.enqueue_application_event();
+
+-- Full-text candidate search. candidates.search_tsv combines skills, headline, summary,
+-- location and the latest CV text; triggers keep it current as profiles and CVs change.
+alter table public.candidates add column if not exists search_tsv tsvector;
+create index if not exists idx_candidates_search_tsv on public.candidates using gin(search_tsv);
+create index if not exists idx_candidate_cvs_candidate_created on public.candidate_cvs(candidate_id, created_at desc);
+
+create or replace function public.build_candidate_tsv(
+  p_id uuid, p_headline text, p_summary text, p_location text, p_skills text[]
+)
+returns tsvector
+language sql
+stable
+as $$
+  select setweight(to_tsvector('english', coalesce(array_to_string(p_skills, ' '), '')), 'A')
+      || setweight(to_tsvector('english', coalesce(p_headline, '')), 'A')
+      || setweight(to_tsvector('english', coalesce(p_summary, '')), 'B')
+      || setweight(to_tsvector('simple', coalesce(p_location, '')), 'C')
+      || setweight(to_tsvector('english', coalesce((
+           select left(cv.parsed_text, 100000)
+           from public.candidate_cvs cv
+           where cv.candidate_id = p_id
+           order by cv.created_at desc
+           limit 1
+         ), '')), 'D');
+$$;
+
+create or replace function public.candidates_search_tsv_trigger()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.search_tsv := public.build_candidate_tsv(new.id, new.headline, new.summary, new.location, new.skills);
+  return new;
+end;
+$$;
+
+drop trigger if exists trg_candidates_search_tsv on public.candidates;
+create trigger trg_candidates_search_tsv
+  before insert or update of headline, summary, location, skills on public.candidates
+  for each row execute function public.candidates_search_tsv_trigger();
+
+create or replace function public.candidate_cvs_search_tsv_trigger()
+returns trigger
+language plpgsql
+security definer
+as $$
+begin
+  update public.candidates c
+  set search_tsv = public.build_candidate_tsv(c.id, c.headline, c.summary, c.location, c.skills)
+  where c.id = new.candidate_id;
+  return null;
+end;
+$$;
+
+drop trigger if exists trg_candidate_cvs_search_tsv on public.candidate_cvs;
+create trigger trg_candidate_cvs_search_tsv
+  after insert or update of parsed_text on public.candidate_cvs
+  for each row execute function public.candidate_cvs_search_tsv_trigger();
+
+update public.candidates c
+set search_tsv = public.build_candidate_tsv(c.id, c.headline, c.summary, c.location, c.skills)
+where c.search_tsv is null;
+
+-- Candidate rows are self-read under RLS, so the search runs as definer and checks the caller role.
+create or replace function public.search_candidates(
+  p_query text default '',
+  p_location text default null,
+  p_skills text[] default null,
+  p_remote_pref text default null,
+  p_limit int default 20,
+  p_offset int default 0
+)
+returns table (
+  id uuid, headline text, location text, remote_pref text, summary text,
+  skills text[], links text[], rank real
+)
+language sql
+stable
+security definer
+as $$
+  select c.id, c.headline, c.location, c.remote_pref, c.summary, c.skills, c.links,
+         case when q.query is null then 0::real else ts_rank_cd(c.search_tsv, q.query) end as rank
+  from public.candidates c
+  cross join (
+    select case when coalesce(trim(p_query), '') = '' then null
+                else websearch_to_tsquery('english', p_query) end as query
+  ) q
+  where coalesce(auth.jwt() ->> 'role', 'service_role') in ('recruiter', 'admin', 'service_role')
+    and (q.query is null or c.search_tsv @@ q.query)
+    and (p_location is null or c.location ilike '%' || p_location || '%')
+    and (p_remote_pref is null or c.remote_pref = p_remote_pref)
+    and (
+      p_skills is null
+      or (select array_agg(lower(s)) from unnest(c.skills) s) @> (select array_agg(lower(s)) from unnest(p_skills) s)
+    )
+  order by rank desc, c.id
+  limit least(p_limit, 100)
+  offset p_offset;
+$$;
+
+-- Stored responses for requests sent with an Idempotency-Key header (service client only).
+create table if not exists public.idempotency_keys (
+  key text primary key,
+  response jsonb not null,
+  created_at timestamptz default now(),
+  expires_at timestamptz not null
+);
+
+alter table public.idempotency_keys add column if not exists request_hash text;
+
+create index if not exists idx_idempotency_keys_expires_at on public.idempotency_keys(expires_at);
+
+alter table public.idempotency_keys enable row level security;
+
+-- Platform counters for the admin overview: users per role, open jobs and scoring runs per month
+-- (bucket 'YYYY-MM', UTC, counted from match_history further down). Triggers keep them current on
+-- every write, so platform_overview() is a handful of primary-key lookups however large the
+-- tables get.
+create table if not exists public.platform_stats (
+  metric text not null,
+  bucket text not null default '',
+  value bigint not null default 0,
+  primary key (metric, bucket)
+);
+
+alter table public.platform_stats enable row level security;
+
+create or replace function public.bump_platform_stat(p_metric text, p_bucket text, p_delta bigint)
+returns void
+language sql
+security definer
+as $$
+  insert into public.platform_stats as ps (metric, bucket, value)
+  values (p_metric, coalesce(p_bucket, ''), greatest(p_delta, 0))
+  on conflict (metric, bucket) do update set value = greatest(ps.value + p_delta, 0);
+$$;
+
+create or replace function public.track_platform_stats()
+returns trigger
+language plpgsql
+security definer
+as $$
+begin
+  if tg_table_name = 'users' then
+    if tg_op in ('UPDATE', 'DELETE') then
+      perform public.bump_platform_stat('users_by_role', old.role, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+      perform public.bump_platform_stat('users_by_role', new.role, 1);
+    end if;
+  elsif tg_table_name = 'jobs' then
+    if tg_op in ('UPDATE', 'DELETE') and old.status = 'open' then
+      perform public.bump_platform_stat('open_jobs', '', -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') and new.status = 'open' then
+      perform public.bump_platform_stat('open_jobs', '', 1);
+    end if;
+  elsif tg_table_name = 'match_history' then
+    if tg_op = 'DELETE' then
+      perform public.bump_platform_stat('matches_by_month', to_char(old.created_at at time zone 'utc', 'YYYY-MM'), -1);
+    else
+      perform public.bump_platform_stat('matches_by_month', to_char(new.created_at at time zone 'utc', 'YYYY-MM'), 1);
+    end if;
+  end if;
+  return null;
+end;
+$$;
+
+-- Updates get their own triggers with a WHEN clause: "update of role" fires whenever role is in
+-- the SET list, which every profile upsert does, and each firing would take the counter row lock.
+drop trigger if exists trg_users_platform_stats on public.users;
+create trigger trg_users_platform_stats
+  after insert or delete on public.users
+  for each row execute function public.track_platform_stats();
+
+drop trigger if exists trg_users_platform_stats_update on public.users;
+create trigger trg_users_platform_stats_update
+  after update of role on public.users
+  for each row when (old.role is distinct from new.role)
+  execute function public.track_platform_stats();
+
+drop trigger if exists trg_jobs_platform_stats on public.jobs;
+create trigger trg_jobs_platform_stats
+  after insert or delete on public.jobs
+  for each row execute function public.track_platform_stats();
+
+drop trigger if exists trg_jobs_platform_stats_update on public.jobs;
+create trigger trg_jobs_platform_stats_update
+  after update of status on public.jobs
+  for each row when (old.status is distinct from new.status)
+  execute function public.track_platform_stats();
+
+-- Matches are counted from match_history now (its trigger is created with that table).
+drop trigger if exists trg_matches_platform_stats on public.matches;
+
+-- Recompute every counter from the base tables. Run once after applying this file (at the end of
+-- the match_history section) and whenever drift is suspected, e.g. nightly via pg_cron:
+-- select public.refresh_platform_stats();
+create or replace function public.refresh_platform_stats()
+returns void
+language plpgsql
+security definer
+as $$
+begin
+  lock table public.platform_stats in exclusive mode;
+  delete from public.platform_stats;
+  insert into public.platform_stats (metric, bucket, value)
+  select 'users_by_role', coalesce(role, ''), count(*) from public.users group by role
+  union all
+  select 'open_jobs', '', count(*) from public.jobs where status = 'open'
+  union all
+  select 'matches_by_month', to_char(created_at at time zone 'utc', 'YYYY-MM'), count(*)
+  from public.match_history group by 2;
+end;
+$$;
+
+create or replace function public.platform_overview()
+returns jsonb
+language sql
+stable
+security definer
+as $$
+  select jsonb_build_object(
+    'users', coalesce(
+      (select jsonb_object_agg(bucket, value) from public.platform_stats where metric = 'users_by_role'),
+      '{}'::jsonb
+    ),
+    'open_jobs', coalesce(
+      (select value from public.platform_stats where metric = 'open_jobs' and bucket = ''), 0
+    ),
+    'matches_this_month', coalesce(
+      (select value from public.platform_stats
+       where metric = 'matches_by_month' and bucket = to_char(now() at time zone 'utc', 'YYYY-MM')), 0
+    )
+  )
+  where coalesce(auth.jwt() ->> 'role', 'service_role') in ('admin', 'service_role');
+$$;
+
+-- Admin bulk status changes (POST /admin/users/bulk-status, /admin/posts/bulk-moderate). Rows
+-- already in p_status are skipped and null filters don't apply; each returns how many rows it
+-- changed, so the API gets the count without the rows.
+create or replace function public.admin_set_user_status(
+  p_status text,
+  p_ids uuid[] default null,
+  p_role text default null,
+  p_current_status text default null,
+  p_created_after timestamptz default null,
+  p_created_before timestamptz default null,
+  p_exclude_id uuid default null
+)
+returns int
+language plpgsql
+as $$
+declare
+  v_updated int;
+begin
+  if coalesce(auth.jwt() ->> 'role', 'service_role') not in ('admin', 'service_role') then
+    raise exception 'admin only' using errcode = '42501';
+  end if;
+  update public.users u
+  set status = p_status
+  where u.status is distinct from p_status
+    and (p_ids is null or u.id = any(p_ids))
+    and (p_role is null or u.role = p_role)
+    and (p_current_status is null or u.status = p_current_status)
+    and (p_created_after is null or u.created_at >= p_created_after)
+    and (p_created_before is null or u.created_at < p_created_before)
+    and (p_exclude_id is null or u.id <> p_exclude_id);
+  get diagnostics v_updated = row_count;
+  return v_updated;
+end;
+$$;
+
+create or replace function public.admin_set_post_status(
+  p_status text,
+  p_ids uuid[] default null,
+  p_candidate_id uuid default null,
+  p_current_status text default null,
+  p_visibility text default null,
+  p_body_contains text default null,
+  p_created_after timestamptz default null,
+  p_created_before timestamptz default null
+)
+returns int
+language plpgsql
+as $$
+declare
+  v_updated int;
+begin
+  if coalesce(auth.jwt() ->> 'role', 'service_role') not in ('admin', 'service_role') then
+    raise exception 'admin only' using errcode = '42501';
+  end if;
+  update public.posts p
+  set status = p_status
+  where p.status is distinct from p_status
+    and (p_ids is null or p.id = any(p_ids))
+    and (p_candidate_id is null or p.candidate_id = p_candidate_id)
+    and (p_current_status is null or p.status = p_current_status)
+    and (p_visibility is null or p.visibility = p_visibility)
+    and (p_body_contains is null or p.body ilike '%' || p_body_contains || '%')
+    and (p_created_after is null or p.created_at >= p_created_after)
+    and (p_created_before is null or p.created_at < p_created_before);
+  get diagnostics v_updated = row_count;
+  return v_updated;
+end;
+$$;
+
+-- Matches keep only the latest score per (job, candidate); every scoring run is also appended to
+-- match_history without the rationale text, and that history is pruned to a retention window by
+-- prune_match_history() (called in batches by the API's MatchHistoryPruner).
+alter table public.matches add column if not exists updated_at timestamptz default now();
+
+create table if not exists public.match_history (
+  id bigint generated always as identity primary key,
+  job_id uuid,
+  candidate_id uuid,
+  score numeric,
+  matched_skills text[],
+  missing_skills text[],
+  source text,
+  created_at timestamptz not null default now()
+);
+
+create index if not exists idx_match_history_created_at on public.match_history(created_at);
+create index if not exists idx_match_history_pair on public.match_history(job_id, candidate_id, created_at desc);
+
+alter table public.match_history enable row level security;
+-- Same scope as matches: a recruiter sees history for their own jobs only; admins see all.
+drop policy if exists "match_history recruiter read" on public.match_history;
+create policy "match_history recruiter read" on public.match_history
+  for select using (exists(select 1 from public.jobs j where j.id = match_history.job_id and j.recruiter_id = auth.uid()));
+create policy if not exists "match_history admin read" on public.match_history
+  for select using ((auth.jwt() ->> 'role') = 'admin');
+
+drop trigger if exists trg_match_history_platform_stats on public.match_history;
+create trigger trg_match_history_platform_stats
+  after insert or delete on public.match_history
+  for each row execute function public.track_platform_stats();
+
+-- Collapse existing duplicates into history before the unique index goes on: all but the newest
+-- row per pair are copied to match_history and deleted.
+with ranked as (
+  select id, row_number() over (partition by job_id, candidate_id order by created_at desc, id) as rn
+  from public.matches
+), moved as (
+  delete from public.matches m
+  using ranked r
+  where m.id = r.id and r.rn > 1
+  returning m.job_id, m.candidate_id, m.score, m.matched_skills, m.missing_skills, m.source, m.created_at
+)
+insert into public.match_history (job_id, candidate_id, score, matched_skills, missing_skills, source, created_at)
+select job_id, candidate_id, score, matched_skills, missing_skills, source, created_at from moved;
+
+create unique index if not exists idx_matches_job_candidate on public.matches(job_id, candidate_id);
+
+create or replace function public.record_match_history()
+returns trigger
+language plpgsql
+security definer
+as $$
+begin
+  insert into public.match_history (job_id, candidate_id, score, matched_skills, missing_skills, source)
+  values (new.job_id, new.candidate_id, new.score, new.matched_skills, new.missing_skills, new.source);
+  return null;
+end;
+$$;
+
+drop trigger if exists trg_matches_history on public.matches;
+create trigger trg_matches_history
+  after insert or update of score, matched_skills, missing_skills, updated_at on public.matches
+  for each row execute function public.record_match_history();
+
+-- Seed history with the surviving latest rows (the duplicates were moved above), then recount.
+insert into public.match_history (job_id, candidate_id, score, matched_skills, missing_skills, source, created_at)
+select m.job_id, m.candidate_id, m.score, m.matched_skills, m.missing_skills, m.source, m.created_at
+from public.matches m
+where not exists (
+  select 1 from public.match_history h
+  where h.job_id = m.job_id and h.candidate_id = m.candidate_id and h.created_at = m.created_at
+);
+
+select public.refresh_platform_stats();
+
+-- Delete up to p_batch_size history rows older than the retention window; returns how many went.
+-- Small batches keep each transaction short; the caller repeats until fewer than a batch remain.
+create or replace function public.prune_match_history(p_retention_days int, p_batch_size int default 5000)
+returns int
+language plpgsql
+security definer
+as $$
+declare
+  v_deleted int;
+begin
+  delete from public.match_history
+  where id in (
+    select id from public.match_history
+    where created_at < now() - make_interval(days => p_retention_days)
+    order by created_at
+    limit p_batch_size
+  );
+  get diagnostics v_deleted = row_count;
+  return v_deleted;
+end;
+$$;
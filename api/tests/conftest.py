@@ -0,0 +1,46 @@
+# api\tests\conftest.py
+"""
+One in-memory PostgREST (bench/fake_postgrest.py) serves the whole session. SUPABASE_URL points
+at it before any app module reads settings, and every test starts with empty tables.
+"""
+import os
+
+import pytest
+
+from bench.fake_postgrest import FakePostgrest, ServerThread
+
+_db = FakePostgrest()
+_server = ServerThread(_db.app).__enter__()
+
+os.environ.update(
+    {
+        "APP_ENV": "local",
+        "SUPABASE_URL": _server.url,
+        # supabase-py only checks that keys look like JWTs; the stand-in ignores them.
+        "SUPABASE_SERVICE_KEY": "test.service.key",
+        "SUPABASE_ANON_KEY": "test.anon.key",
+        "SCORER_BACKEND": "fake",
+        "FAKE_SCORER_LATENCY_MS": "0",
+        "WARM_UP_ON_STARTUP": "false",
+        "OUTBOX_DISPATCHER_ENABLED": "false",
+        "MATCH_HISTORY_PRUNE_INTERVAL_SECONDS": "0",
+    }
+)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _fake_postgrest_server():
+    yield
+    _server.__exit__(None, None, None)
+
+
+@pytest.fixture
+def db() -> FakePostgrest:
+    _db.tables.clear()
+    _db.rpcs.clear()
+    return _db
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
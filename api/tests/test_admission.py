@@ -0,0 +1,206 @@
+# api\tests\test_admission.py
+import asyncio
+import uuid
+
+import pytest
+
+from app.config import Settings, get_settings
+from app.dependencies import supabase_service_client
+from app.routers import recruiter
+from app.schemas import AuthUser
+from app.services import matching
+from app.services.admission import AdmissionController, FairQueue, RateLimited, TokenBucket
+from app.services.matching import MatchingService
+from app.services.scorers import FakeLLMScorer, get_scorer_backend
+
+pytestmark = pytest.mark.anyio
+
+
+def _controller(**overrides) -> AdmissionController:
+    values = {
+        "llm_user_burst": 10,
+        "llm_user_rate_per_minute": 20,
+        "llm_global_burst": 60,
+        "llm_global_rate_per_minute": 300,
+        "llm_queue_timeout_seconds": 0.2,
+        **overrides,
+    }
+    return AdmissionController(Settings(**values))
+
+
+def test_token_bucket_take_and_refund():
+    bucket = TokenBucket(rate_per_second=1.0, burst=2)
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() > 0
+    bucket.refund()
+    assert bucket.take() == 0
+
+
+def test_token_bucket_debt_needs_a_full_bucket_and_goes_negative():
+    bucket = TokenBucket(rate_per_second=1.0, burst=10)
+    assert bucket.take(30) > 0
+    assert bucket.take(30, allow_debt=True) == 0
+    assert bucket.tokens == pytest.approx(-20, abs=0.1)
+    assert bucket.take(1) == pytest.approx(21, abs=0.1)
+
+
+def test_user_bucket_limits_one_user_only():
+    controller = _controller(llm_user_burst=2)
+    controller._take_tokens("a")
+    controller._take_tokens("a")
+    with pytest.raises(RateLimited):
+        controller._take_tokens("a")
+    controller._take_tokens("b")
+
+
+def test_global_miss_refunds_the_user_token():
+    controller = _controller(llm_global_burst=1, llm_global_rate_per_minute=0.001)
+    controller._take_tokens("a")
+    with pytest.raises(RateLimited):
+        controller._take_tokens("b")
+    assert controller._users["b"].tokens == pytest.approx(10, abs=0.01)
+
+
+def test_batch_reservation_only_puts_the_callers_bucket_in_debt():
+    controller = _controller()
+    controller.reserve("recruiter", 50)
+    assert controller._users["recruiter"].tokens == pytest.approx(-40, abs=0.1)
+    assert controller._global.tokens == pytest.approx(60, abs=0.1)
+    # Everyone else is unaffected; the batch owner waits out their own debt.
+    controller._take_tokens("other")
+    with pytest.raises(RateLimited) as exc_info:
+        controller.reserve("recruiter", 5)
+    assert exc_info.value.retry_after > 100
+
+
+def test_refund_returns_unused_reservation():
+    controller = _controller()
+    controller.reserve("u", 5)
+    controller.refund("u", 3)
+    assert controller._users["u"].tokens == pytest.approx(8, abs=0.1)
+
+
+async def test_prepaid_call_waits_for_a_global_token():
+    controller = _controller(llm_global_burst=1, llm_global_rate_per_minute=600)  # 10 tokens/s
+    controller._global.take()
+    started = asyncio.get_running_loop().time()
+    async with controller.admit("u", "recruiter", prepaid=True):
+        pass
+    assert asyncio.get_running_loop().time() - started >= 0.05
+    assert "u" not in controller._users
+
+
+async def test_prepaid_call_gives_up_after_the_queue_timeout():
+    controller = _controller(llm_global_burst=1, llm_global_rate_per_minute=1)
+    controller._global.take()
+    with pytest.raises(RateLimited):
+        async with controller.admit("u", "recruiter", prepaid=True):
+            pass
+
+
+async def test_disabled_controller_admits_everything():
+    controller = _controller(llm_admission_enabled=False, llm_user_burst=0)
+    controller.reserve("u", 100)
+    async with controller.admit("u", "candidate"):
+        pass
+
+
+async def test_fair_queue_serves_heavier_weight_first():
+    queue = FairQueue(slots=1, max_waiting=10)
+    await queue.acquire("holder", 1.0, timeout=1)
+    order = []
+
+    async def waiter(key, weight):
+        await queue.acquire(key, weight, timeout=1)
+        order.append(key)
+        queue.release()
+
+    tasks = [asyncio.ensure_future(waiter("candidate", 1.0)), asyncio.ensure_future(waiter("admin", 4.0))]
+    await asyncio.sleep(0.01)
+    queue.release()
+    await asyncio.gather(*tasks)
+    assert order == ["admin", "candidate"]
+
+
+async def test_fair_queue_rejects_when_full():
+    queue = FairQueue(slots=1, max_waiting=1)
+    await queue.acquire("a", 1.0, timeout=1)
+    pending = asyncio.ensure_future(queue.acquire("b", 1.0, timeout=1))
+    await asyncio.sleep(0)
+    with pytest.raises(RateLimited):
+        await queue.acquire("c", 1.0, timeout=1)
+    queue.release()
+    await pending
+
+
+@pytest.fixture
+def flaky_scorer(monkeypatch):
+    """FakeLLMScorer whose first two replies fail validation."""
+    calls = {"n": 0}
+    original = FakeLLMScorer._generate
+
+    def generate(self, prompt, schema):
+        calls["n"] += 1
+        return "not json" if calls["n"] <= 2 else original(self, prompt, schema)
+
+    monkeypatch.setattr(FakeLLMScorer, "_generate", generate)
+    monkeypatch.setattr(get_scorer_backend(get_settings()), "reply_retries", 2)
+    return calls
+
+
+async def test_reply_retries_inside_a_batch_leave_prepaid_tokens_alone(monkeypatch, flaky_scorer):
+    controller = _controller()
+    monkeypatch.setattr(matching, "get_admission_controller", lambda: controller)
+    service = MatchingService(get_settings(), None, AuthUser(user_id="r1", role="recruiter"))
+    service.reserve(2)
+    await service.score_candidate_for_job({"title": "Data"}, {"cv_text": "python sql"})
+    assert flaky_scorer["n"] == 3
+    # The first call used one prepaid token; its two retries were billed on top.
+    assert service._prepaid == 1
+    assert controller._users["r1"].tokens == pytest.approx(6, abs=0.1)
+    await service.score_candidate_for_job({"title": "Data"}, {"cv_text": "python sql"})
+    assert service._prepaid == 0
+    service.release_reservation()
+    assert controller._users["r1"].tokens == pytest.approx(6, abs=0.1)
+
+
+async def test_retries_outside_a_batch_are_admitted_like_new_calls(monkeypatch, flaky_scorer):
+    controller = _controller(llm_user_burst=2)
+    monkeypatch.setattr(matching, "get_admission_controller", lambda: controller)
+    service = MatchingService(get_settings(), None, AuthUser(user_id="c1", role="candidate"))
+    with pytest.raises(RateLimited):
+        await service.score_candidate_for_job({"title": "Data"}, {"cv_text": "python sql"})
+    assert flaky_scorer["n"] == 2
+
+
+async def test_score_all_caps_the_batch_and_refreshes_best_fit(db, monkeypatch):
+    controller = _controller()
+    monkeypatch.setattr(matching, "get_admission_controller", lambda: controller)
+    monkeypatch.setattr(recruiter, "get_settings", lambda: Settings(llm_batch_max_calls=2))
+    job_id = str(uuid.uuid4())
+    db.insert_rows("jobs", [{"id": job_id, "title": "Data engineer", "skills": [{"skill": "python"}]}])
+    candidates = [str(uuid.uuid4()) for _ in range(3)]
+    db.insert_rows("candidates", [{"id": c, "headline": "Engineer"} for c in candidates])
+    db.insert_rows(
+        "applications",
+        [
+            {"job_id": job_id, "candidate_id": candidates[0], "last_scored_at": "2026-01-01T00:00:00"},
+            {"job_id": job_id, "candidate_id": candidates[1]},
+            {"job_id": job_id, "candidate_id": candidates[2]},
+        ],
+    )
+
+    result = await recruiter.score_all_applications_for_job(
+        job_id,
+        response=recruiter.Response(),
+        user=AuthUser(user_id="dev-recruiter", role="recruiter"),
+        client=supabase_service_client(get_settings()),
+        idempotency_key=None,
+    )
+
+    assert result["scored"] == 2 and result["remaining"] == 1
+    scored = {a["candidate_id"] for a in db.tables["applications"] if a.get("match_score") is not None}
+    assert scored == set(candidates[1:])  # never-scored applications go first
+    assert result["best_fit_id"] in {a["id"] for a in db.tables["applications"] if a.get("best_fit")}
+    assert controller._users["dev-recruiter"].tokens == pytest.approx(8, abs=0.1)
@@ -0,0 +1,102 @@
+# api\tests\test_compression.py
+import gzip
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from app.config import Settings
+from app.middleware.compression import CompressionMiddleware
+
+pytestmark = pytest.mark.anyio
+
+BIG = {"items": [{"id": i, "name": f"candidate {i}"} for i in range(200)]}
+
+
+def _app(**overrides) -> CompressionMiddleware:
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return JSONResponse(BIG)
+
+    @app.get("/small")
+    async def small():
+        return JSONResponse({"ok": True})
+
+    @app.get("/stream")
+    async def stream():
+        async def rows():
+            for i in range(50):
+                yield json.dumps({"row": i, "pad": "x" * 100}) + "\n"
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    async def events():
+        return StreamingResponse(iter(["data: " + "x" * 2000 + "\n\n"]), media_type="text/event-stream")
+
+    @app.get("/encoded")
+    async def encoded():
+        return PlainTextResponse("x" * 2000, headers={"Content-Encoding": "identity"})
+
+    return CompressionMiddleware(app, Settings(compression_min_size=512, **overrides))
+
+
+async def _get(path: str, accept: str = "gzip", **overrides) -> httpx.Response:
+    transport = httpx.ASGITransport(app=_app(**overrides))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers={"Accept-Encoding": accept})
+
+
+async def test_large_json_is_gzipped():
+    response = await _get("/big")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == BIG
+
+
+async def test_brotli_is_preferred_when_installed():
+    pytest.importorskip("brotli")
+    response = await _get("/big", accept="gzip, br")
+    assert response.headers["content-encoding"] == "br"
+
+
+async def test_small_response_is_sent_as_is():
+    response = await _get("/small")
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+
+
+async def test_client_without_gzip_gets_identity():
+    response = await _get("/big", accept="identity")
+    assert "content-encoding" not in response.headers
+    assert response.json() == BIG
+
+
+async def test_q_zero_disables_an_encoding():
+    response = await _get("/big", accept="gzip;q=0")
+    assert "content-encoding" not in response.headers
+
+
+async def test_streamed_body_is_compressed_chunk_by_chunk():
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    assert response.headers["content-encoding"] == "gzip"
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert [json.loads(line)["row"] for line in lines] == list(range(50))
+
+
+async def test_event_streams_are_never_compressed():
+    response = await _get("/events", compression_content_types=["text/event-stream", "application/json"])
+    assert "content-encoding" not in response.headers
+
+
+async def test_already_encoded_response_is_left_alone():
+    response = await _get("/encoded", compression_content_types=["text/plain"])
+    assert response.headers["content-encoding"] == "identity"
+    assert response.text == "x" * 2000
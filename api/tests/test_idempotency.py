@@ -0,0 +1,105 @@
+# api\tests\test_idempotency.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.config import get_settings
+from app.services.idempotency import IdempotencyStore
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def store(db) -> IdempotencyStore:
+    return IdempotencyStore(get_settings())
+
+
+def _counter():
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"n": len(calls)}
+
+    return fn, calls
+
+
+async def test_without_key_always_runs(store):
+    fn, calls = _counter()
+    await store.run(None, "apply:j1", "u1", fn, Response(), payload={"cv_id": "a"})
+    await store.run(None, "apply:j1", "u1", fn, Response(), payload={"cv_id": "a"})
+    assert len(calls) == 2
+
+
+async def test_same_key_and_payload_replays(store, db):
+    fn, calls = _counter()
+    first = await store.run("k", "apply:j1", "u1", fn, Response(), payload={"cv_id": "a"})
+    response = Response()
+    second = await store.run("k", "apply:j1", "u1", fn, response, payload={"cv_id": "a"})
+    assert first == second == {"n": 1}
+    assert len(calls) == 1
+    assert response.headers["Idempotent-Replayed"] == "true"
+    (row,) = db.tables["idempotency_keys"]
+    assert row["key"] == "u1:apply:j1:k"
+    assert row["request_hash"] == IdempotencyStore.fingerprint({"cv_id": "a"})
+
+
+async def test_replays_from_the_table_after_a_restart(store):
+    fn, calls = _counter()
+    await store.run("k", "apply:j1", "u1", fn, Response(), payload={"cv_id": "a"})
+    restarted = IdempotencyStore(get_settings())
+    assert await restarted.run("k", "apply:j1", "u1", fn, Response(), payload={"cv_id": "a"}) == {"n": 1}
+    assert len(calls) == 1
+
+
+async def test_key_reused_with_a_different_payload_is_rejected(store):
+    fn, calls = _counter()
+    await store.run("k", "attach:j1", "u1", fn, Response(), payload={"candidate_id": "a"})
+    with pytest.raises(HTTPException) as exc_info:
+        await store.run("k", "attach:j1", "u1", fn, Response(), payload={"candidate_id": "b"})
+    assert exc_info.value.status_code == 422
+    assert len(calls) == 1
+
+
+async def test_fingerprint_ignores_key_order():
+    assert IdempotencyStore.fingerprint({"a": 1, "b": 2}) == IdempotencyStore.fingerprint({"b": 2, "a": 1})
+    assert IdempotencyStore.fingerprint({"a": 1}) != IdempotencyStore.fingerprint({"a": 2})
+
+
+async def test_keys_are_scoped_per_user_and_endpoint(store):
+    fn, calls = _counter()
+    await store.run("k", "apply:j1", "u1", fn, Response())
+    await store.run("k", "apply:j1", "u2", fn, Response())
+    await store.run("k", "apply:j2", "u1", fn, Response())
+    assert len(calls) == 3
+
+
+async def test_concurrent_retries_share_one_run(store):
+    fn, calls = _counter()
+    results = await asyncio.gather(*(store.run("k", "apply:j1", "u1", fn, Response()) for _ in range(4)))
+    assert results == [{"n": 1}] * 4
+    assert len(calls) == 1
+
+
+async def test_failures_are_not_stored(store):
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("db down")
+        return {"ok": True}
+
+    with pytest.raises(RuntimeError):
+        await store.run("k", "apply:j1", "u1", flaky, Response())
+    assert await store.run("k", "apply:j1", "u1", flaky, Response()) == {"ok": True}
+    assert len(attempts) == 2
+
+
+async def test_expired_rows_are_purged_on_save(store, db):
+    db.insert_rows("idempotency_keys", [{"key": "old", "response": {}, "expires_at": "2000-01-01T00:00:00"}])
+    fn, _ = _counter()
+    await store.run("k", "apply:j1", "u1", fn, Response())
+    assert [r["key"] for r in db.tables["idempotency_keys"]] == ["u1:apply:j1:k"]
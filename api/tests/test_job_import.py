@@ -0,0 +1,132 @@
+# api\tests\test_job_import.py
+import io
+import json
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.config import get_settings
+from app.dependencies import supabase_service_client
+from app.services.job_import import ImportFormatError, JobImporter, detect_format, iter_rows
+
+
+def _csv(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode("utf-8"))
+
+
+def _jsonl(*rows) -> io.BytesIO:
+    lines = [r if isinstance(r, str) else json.dumps(r) for r in rows]
+    return io.BytesIO("\n".join(lines).encode("utf-8"))
+
+
+def _importer(client, **kwargs) -> JobImporter:
+    return JobImporter(client, recruiter_id="r1", batch_size=kwargs.pop("batch_size", 2), max_rows=1000, **kwargs)
+
+
+@pytest.fixture
+def client(db):
+    return supabase_service_client(get_settings())
+
+
+def test_detect_format():
+    assert detect_format("jobs.csv", None) == "csv"
+    assert detect_format("jobs.ndjson", None) == "jsonl"
+    assert detect_format(None, "application/x-ndjson") == "jsonl"
+    with pytest.raises(ImportFormatError):
+        detect_format("jobs.xlsx", "application/octet-stream")
+
+
+def test_csv_rows_are_validated_and_inserted_in_batches(db, client):
+    data = _csv(
+        "\ufefftitle,location,skills,salary_min,status\n"
+        "Data engineer,Lahore,Python; SQL,100,open\n"
+        "Backend dev,,Go|Postgres,,\n"
+        "Designer,Remote,,,\n"
+    )
+    result = _importer(client).run(iter_rows(data, "csv"))
+    assert result == {"inserted": 3, "failed": 0, "errors": []}
+    jobs = {j["title"]: j for j in db.tables["jobs"]}
+    assert [s["skill"] for s in jobs["Data engineer"]["skills"]] == ["Python", "SQL"]
+    assert [s["skill"] for s in jobs["Backend dev"]["skills"]] == ["Go", "Postgres"]
+    # Blank cells fall back to JobCreate defaults rather than failing on "".
+    assert jobs["Backend dev"]["location"] is None and jobs["Backend dev"]["status"] == "open"
+    assert all(j["recruiter_id"] == "r1" for j in db.tables["jobs"])
+
+
+def test_bad_rows_are_reported_with_their_line_numbers(db, client):
+    data = _jsonl(
+        {"title": "Good one"},
+        "{not json",
+        '["a list"]',
+        {"title": "Bad salary", "salary_min": "lots"},
+        {"location": "No title"},
+        {"title": "Good two", "skills": ["Python"]},
+    )
+    result = _importer(client).run(iter_rows(data, "jsonl"))
+    assert result["inserted"] == 2
+    assert result["failed"] == 4
+    assert [e["row"] for e in result["errors"]] == [2, 3, 4, 5]
+    assert result["errors"][0]["error"].startswith("Invalid JSON")
+    assert result["errors"][1]["error"] == "Expected a JSON object"
+    assert "salary_min" in result["errors"][2]["error"]
+    assert "title" in result["errors"][3]["error"]
+    assert sorted(j["title"] for j in db.tables["jobs"]) == ["Good one", "Good two"]
+
+
+def test_blank_jsonl_lines_are_skipped(db, client):
+    data = io.BytesIO(b'{"title": "A"}\n\n   \n{"title": "B"}\n')
+    assert _importer(client).run(iter_rows(data, "jsonl"))["inserted"] == 2
+
+
+def test_row_limit_stops_the_import(db, client):
+    data = _jsonl(*({"title": f"Job {i}"} for i in range(5)))
+    importer = JobImporter(client, recruiter_id=None, batch_size=10, max_rows=3)
+    result = importer.run(iter_rows(data, "jsonl"))
+    assert result["inserted"] == 3
+    assert result["failed"] == 1
+    assert "Row limit of 3" in result["errors"][0]["error"]
+
+
+class _RejectingClient:
+    """Stands in for the database rejecting one row: any insert containing it fails."""
+
+    def __init__(self, bad_title: str):
+        self.bad_title = bad_title
+        self.inserted = []
+        self.calls = 0
+
+    def table(self, name):
+        return self
+
+    def insert(self, rows, returning=None):
+        self.calls += 1
+        self._pending = rows
+        return self
+
+    def execute(self):
+        if any(r["title"] == self.bad_title for r in self._pending):
+            raise APIError({"message": "violates check constraint", "code": "23514"})
+        self.inserted.extend(self._pending)
+
+
+def test_a_rejected_batch_is_retried_row_by_row():
+    client = _RejectingClient("Broken")
+    data = _jsonl({"title": "A"}, {"title": "Broken"}, {"title": "C"}, {"title": "D"})
+    result = _importer(client, batch_size=3).run(iter_rows(data, "jsonl"))
+    assert result["inserted"] == 3
+    assert result["errors"] == [{"row": 2, "error": "violates check constraint"}]
+    assert [r["title"] for r in client.inserted] == ["A", "C", "D"]
+    # One failed batch of three, three single-row retries, then the last batch.
+    assert client.calls == 5
+
+
+def test_skills_are_guessed_from_the_description_when_missing(db, client):
+    def extract(text):
+        return {"title": "Guessed title", "skills": ["python", "sql"]}
+
+    data = _jsonl({"description": "We need Python and SQL"}, {"title": "Kept", "description": "x"})
+    result = _importer(client, extract_skills=extract).run(iter_rows(data, "jsonl"))
+    assert result["inserted"] == 2
+    jobs = {j["title"]: j for j in db.tables["jobs"]}
+    assert [s["skill"] for s in jobs["Guessed title"]["skills"]] == ["python", "sql"]
+    assert [s["skill"] for s in jobs["Kept"]["skills"]] == ["python", "sql"]
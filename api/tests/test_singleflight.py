@@ -0,0 +1,69 @@
+# api\tests\test_singleflight.py
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_run():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+    assert results == [1] * 5
+    assert calls == 1
+    assert flight.in_flight() == 0
+
+
+async def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def work(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    assert await asyncio.gather(flight.do("a", lambda: work(1)), flight.do("b", lambda: work(2))) == [1, 2]
+
+
+async def test_error_reaches_every_waiter_and_is_not_cached():
+    flight = SingleFlight()
+    attempts = 0
+
+    async def fail():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert attempts == 1
+    with pytest.raises(ValueError):
+        await flight.do("k", fail)
+    assert attempts == 2
+
+
+async def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight()
+    done = asyncio.Event()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        done.set()
+        return "ok"
+
+    first = asyncio.ensure_future(flight.do("k", work))
+    second = asyncio.ensure_future(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "ok"
+    assert done.is_set()
@@ -0,0 +1,63 @@
+# api\tests\test_vector_index.py
+import numpy as np
+import pytest
+
+from app.services.vector_index import VectorIndex
+
+DIM = 32
+
+
+def _unit(rng, n):
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def vectors():
+    return _unit(np.random.default_rng(1), 400)
+
+
+def _near(vector, rng, noise=0.05):
+    nudged = vector + noise * rng.standard_normal(DIM).astype(np.float32)
+    return nudged / np.linalg.norm(nudged)
+
+
+def test_exact_query_ranks_by_cosine(vectors):
+    index = VectorIndex(DIM)
+    index.build([f"c{i}" for i in range(len(vectors))], vectors)
+    hits = index.query(vectors[7], k=5)
+    assert hits[0] == ("c7", pytest.approx(1.0, abs=1e-5))
+    expected = np.argsort(-(vectors @ vectors[7]))[:5]
+    assert [item_id for item_id, _ in hits] == [f"c{i}" for i in expected]
+
+
+def test_lsh_finds_near_neighbours(vectors):
+    rng = np.random.default_rng(2)
+    index = VectorIndex(DIM, exact_threshold=10)
+    index.build([f"c{i}" for i in range(len(vectors))], vectors)
+    found = sum(index.query(_near(vectors[i], rng), k=1)[0][0] == f"c{i}" for i in range(50))
+    assert found >= 48
+
+
+def test_exclude_skips_ids_but_still_returns_k(vectors):
+    index = VectorIndex(DIM)
+    index.build([f"c{i}" for i in range(len(vectors))], vectors)
+    hits = index.query(vectors[3], k=3, exclude={"c3"})
+    assert len(hits) == 3 and "c3" not in {item_id for item_id, _ in hits}
+
+
+def test_upsert_and_remove_keep_the_index_consistent(vectors):
+    index = VectorIndex(DIM, exact_threshold=10)
+    for i, vector in enumerate(vectors[:50]):
+        index.upsert(f"c{i}", vector)
+    assert len(index) == 50
+    index.upsert("c5", vectors[100])  # moved: found by its new vector only
+    assert index.query(vectors[100], k=1)[0][0] == "c5"
+    index.remove("c0")  # the last row moves into the hole
+    assert "c0" not in index and len(index) == 49
+    assert index.query(vectors[49], k=1)[0][0] == "c49"
+    assert all(item_id != "c0" for item_id, _ in index.query(vectors[0], k=10))
+
+
+def test_empty_index_returns_nothing():
+    assert VectorIndex(DIM).query(np.ones(DIM, dtype=np.float32), k=3) == []